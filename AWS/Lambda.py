@@ -8,12 +8,19 @@ import json
 import toml
 import base64
 import shutil
+import hashlib
+import stat
 
 from typing import Optional, Iterable, Tuple, Dict, Union
 
 PRE_PACKAGED_MODULES = ["boto3", "botocore", "jmespath", "python-dateutil", "urllib3",
                         "s3transfer", "Jinja2", "MarkupSafe", "wheel", "six"]
 
+# Every entry of the package is given this timestamp, so that identical contents always give an identical zip
+ZIP_TIMESTAMP = (1980, 1, 1, 0, 0, 0)
+EXCLUDED_DIRS = ["__pycache__"]
+EXCLUDED_EXTENSIONS = [".pyc"]
+
 
 def publish(lambda_name: str,
             handler: str,
@@ -28,6 +35,7 @@ def publish(lambda_name: str,
             publish_after: bool = True,
             dry_run: bool = False,
             delete_lock: bool = False,
+            force: bool = False,
             aws_client_kwargs: Optional[dict] = None,
             skip_dependencies: bool = False,
             skip_package_upload: bool = False,
@@ -45,6 +53,7 @@ def publish(lambda_name: str,
                                  requirements_file=requirements_file,
                                  cwd=None,
                                  delete_lock=delete_lock,
+                                 force=force,
                                  logger=logger)
 
         if local_libs is not None and len(local_libs) > 0:
@@ -72,6 +81,7 @@ def publish(lambda_name: str,
                      publish_after=publish_after,
                      dry_run=dry_run,
                      skip_package_upload=skip_package_upload,
+                     force=force,
                      cwd=None,
                      client_kwargs=aws_client_kwargs,
                      logger=logger)
@@ -83,10 +93,21 @@ def publish(lambda_name: str,
 def package_dependencies(build_dir: str, requirements_file: str,
                          cwd: Optional[str] = None,
                          delete_lock: bool = False,
+                         force: bool = False,
                          logger: LogMethod = LogMethod.null):
     if cwd:
         os.chdir(cwd)
 
+    # Locking and installing are slow, so they are skipped if the locked dependencies are the same as last time
+    stamp_file = _dependencies_stamp_file(build_dir)
+    if not force and os.path.isdir(build_dir) and os.path.exists(stamp_file):
+        dependencies_hash = _dependencies_hash()
+        with open(stamp_file, "r", encoding="utf-8") as f:
+            if dependencies_hash is not None and f.read().strip() == dependencies_hash:
+                logger("Dependencies unchanged.  Skipping install.", heading="Lambda", level=LogLevel.VERBOSE,
+                       log_depth=1)
+                return
+
     try:
         os.mkdir(build_dir)
     except OSError:
@@ -111,10 +132,36 @@ def package_dependencies(build_dir: str, requirements_file: str,
                 else:
                     os.remove(abs_path)
 
+    dependencies_hash = _dependencies_hash()
+    if dependencies_hash is not None:
+        with open(stamp_file, "w", encoding="utf-8") as f:
+            f.write(dependencies_hash)
+
     if delete_lock and os.path.exists("Pipfile.lock"):
         os.remove("Pipfile.lock")
 
 
+def _dependencies_hash() -> Optional[str]:
+    """
+    :return: A hash of the Pipfile and its lock file, or None if there is no lock file to say exactly which
+    dependencies would be installed.
+    """
+    if not os.path.exists("Pipfile.lock"):
+        return None
+    sha = hashlib.sha256()
+    for path in ["Pipfile", "Pipfile.lock"]:
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                sha.update(f.read())
+    sha.update(json.dumps(PRE_PACKAGED_MODULES).encode("utf-8"))
+    return sha.hexdigest()
+
+
+def _dependencies_stamp_file(build_dir: str) -> str:
+    # Kept beside the build directory rather than inside it, so that it isn't packaged
+    return build_dir.rstrip("/" + os.path.sep) + ".sha256"
+
+
 #
 
 
@@ -151,10 +198,45 @@ def zip_everything(package_file: str, build_dir: str, src_dir: str,
 
 
 def _add_dir_to_zip(zf: zipfile.ZipFile, directory: str):
+    """
+    Adds the directory's files in sorted order, with fixed timestamps and permissions, so that the zip depends only
+    on the files' names and contents.  Compiled bytecode is left out, since it embeds the sources' timestamps.
+    """
+    entries = []
     for root, dirs, files in os.walk(directory):
+        dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS]
         relative_root = root[len(directory):].strip(os.path.sep)
         for name in files:
-            zf.write(os.path.join(root, name), arcname=os.path.join(relative_root, name))
+            if not any(name.endswith(ext) for ext in EXCLUDED_EXTENSIONS):
+                entries.append((os.path.join(relative_root, name).replace(os.path.sep, "/"), os.path.join(root, name)))
+
+    for arcname, path in sorted(entries):
+        info = zipfile.ZipInfo(arcname, date_time=ZIP_TIMESTAMP)
+        info.external_attr = (stat.S_IFREG | (0o755 if os.access(path, os.X_OK) else 0o644)) << 16
+        with open(path, "rb") as f:
+            zf.writestr(info, f.read())
+
+
+def package_hash(package_file: str) -> str:
+    """
+    :return: The SHA-256 of the package, base64-encoded, as Lambda reports it in a function's CodeSha256.
+    """
+    sha = hashlib.sha256()
+    with open(package_file, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(chunk)
+    return base64.b64encode(sha.digest()).decode("ascii")
+
+
+def package_key(lambda_name: str, code_bucket_path: str, code_sha256: Optional[str]) -> str:
+    """
+    :return: The S3 key to store the package under, which is named by its hash if known, so that a package that
+    has already been uploaded is found there again.
+    """
+    zip_name = lambda_name + ".zip"
+    if code_sha256 is not None:
+        zip_name = lambda_name + "/" + base64.b64decode(code_sha256).hex() + ".zip"
+    return (code_bucket_path.rstrip("/") + "/" + zip_name) if code_bucket_path else zip_name
 
 
 #
@@ -170,6 +252,7 @@ def upload_to_lambda(lambda_name: str,
                      publish_after: bool = True,
                      dry_run: bool = False,
                      skip_package_upload: bool = False,
+                     force: bool = False,
                      cwd: Optional[str] = None,
                      client_kwargs: Optional[dict] = None,
                      logger: LogMethod = LogMethod.null):
@@ -185,26 +268,38 @@ def upload_to_lambda(lambda_name: str,
 
     #
 
-    zip_name = lambda_name + ".zip"
-    s3_key = (code_bucket_path.rstrip("/") + "/" + zip_name) if code_bucket_path else zip_name
-
-    if not skip_package_upload:
-        logger("Uploading package", heading="Lambda", level=LogLevel.VERBOSE, log_depth=1)
-
-        S3.upload(filename=package_file,
-                  bucket=code_bucket,
-                  bucket_key=s3_key,
-                  client_kwargs=client_kwargs,
-                  logger=logger)
-
-    #
-
-    logger("Updating function", heading="Lambda", level=LogLevel.VERBOSE, log_depth=1)
-    response = lamb.update_function_code(FunctionName=lambda_name,
-                                         S3Bucket=code_bucket,
-                                         S3Key=s3_key,
-                                         Publish=publish_after,
-                                         DryRun=dry_run)
+    # Only a package built by this run is known to be what gets deployed.  Otherwise the package is expected to
+    # have been uploaded already, under the plain key, and any local zip may be stale.
+    code_sha256 = package_hash(package_file) if not skip_package_upload and os.path.exists(package_file) else None
+    s3_key = package_key(lambda_name, code_bucket_path, code_sha256)
+
+    if not force and code_sha256 is not None and code_sha256 == info.get("CodeSha256"):
+        logger("Package unchanged from the deployed code.  Skipping upload and code update.", heading="Lambda",
+               level=LogLevel.INFO, log_depth=1)
+    else:
+        if not skip_package_upload:
+            if not force and code_sha256 is not None and S3.exists(bucket=code_bucket,
+                                                                   bucket_key=s3_key,
+                                                                   client_kwargs=client_kwargs):
+                logger("Package already uploaded.  Skipping upload.", heading="Lambda", level=LogLevel.VERBOSE,
+                       log_depth=1)
+            else:
+                logger("Uploading package", heading="Lambda", level=LogLevel.VERBOSE, log_depth=1)
+
+                S3.upload(filename=package_file,
+                          bucket=code_bucket,
+                          bucket_key=s3_key,
+                          client_kwargs=client_kwargs,
+                          logger=logger)
+
+        #
+
+        logger("Updating function", heading="Lambda", level=LogLevel.VERBOSE, log_depth=1)
+        response = lamb.update_function_code(FunctionName=lambda_name,
+                                             S3Bucket=code_bucket,
+                                             S3Key=s3_key,
+                                             Publish=publish_after,
+                                             DryRun=dry_run)
 
     #
 
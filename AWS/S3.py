@@ -4,6 +4,7 @@ from Errors.AWSError import AWSError
 
 import boto3
 import os
+from botocore.exceptions import ClientError
 from typing import Optional
 
 
@@ -34,5 +35,21 @@ def upload(filename: str,
         raise AWSError("Failed to upload file to S3", e)
 
 
+def exists(bucket: str,
+           bucket_key: str,
+           client_kwargs: Optional[dict] = None) -> bool:
+
+    try:
+        s3 = boto3.client('s3', **_client_kwargs(client_kwargs))
+        s3.head_object(Bucket=bucket, Key=bucket_key)
+        return True
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return False
+        raise AWSError("Failed to check for file in S3", e)
+    except Exception as e:
+        raise AWSError("Failed to check for file in S3", e)
+
+
 def _client_kwargs(client_kwargs: Optional[dict]) -> dict:
     return client_kwargs if client_kwargs is not None else dict()
@@ -0,0 +1,290 @@
+from Games.Mezzonic import Board, MezzonicGame, CrossFormation
+from Games.Mezzonic.MezzonicGame import SIZE_LIMIT
+from Games.Mezzonic.LinearSystem import LinearSystem
+from Games.Mezzonic.SolutionTable import TABLE_DIR_VARIABLE
+from PathFinding import SearchStats
+from Errors import ExecutionError, ErrorType
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import resource
+import statistics
+import tempfile
+import multiprocessing
+from typing import List, Tuple, Dict, Optional
+
+# Every algorithm, and every mode of the exhaustive algorithm, as (name, args)
+CONFIGS: List[Tuple[str, dict]] = [
+    ("basic", {}),
+    ("lookahead", {}),
+    ("orderless", {}),
+    ("orderless_lookahead", {}),
+    ("exhaustive", {"mode": "breadth_first"}),
+    ("exhaustive", {"mode": "sorted_breadth_first"}),
+    ("exhaustive", {"mode": "mixed"}),
+    ("exhaustive", {"mode": "depth_first"}),
+    ("exhaustive", {"mode": "iterative_deepening"}),
+    ("exhaustive", {"mode": "meet_in_the_middle"}),
+    ("linear", {}),
+    ("light_chasing", {}),
+    ("portfolio", {})
+]
+
+
+def load_from_cli():
+    args = sys.argv[1:]
+
+    parser = argparse.ArgumentParser(description="Benchmark every Mezzonic algorithm on seeded, solvable boards of "
+                                                 "each size, bucketed by the fewest presses needed to solve them.")
+    parser.add_argument("--sizes", type=str, default=f"3-{min(SIZE_LIMIT)}", dest="SIZES",
+                        help="The square board sizes to run, as a range (eg. '3-6') or a list (eg. '3,5').")
+    parser.add_argument("--presses", type=str, default="2,4,6,8,10,12", dest="PRESSES",
+                        help="The press counts to bucket boards by.")
+    parser.add_argument("--boards", type=int, default=3, dest="BOARDS",
+                        help="The number of boards in each bucket.")
+    parser.add_argument("--configs", type=str, default=None, dest="CONFIGS",
+                        help="Only run these configs (eg. 'orderless,exhaustive:mixed').  Defaults to all of them.")
+    parser.add_argument("--timeout", type=float, default=10, dest="TIMEOUT",
+                        help="The seconds to allow each solve.")
+    parser.add_argument("--seed", type=int, default=0, dest="SEED")
+    parser.add_argument("--use-table", action="store_true", dest="USE_TABLE",
+                        help="Let algorithms use a precomputed solution table, if one exists.")
+    parser.add_argument("--output", type=str, default=None, dest="OUTPUT",
+                        help="The file to write the JSON results to.")
+    parser.add_argument("--compare", type=str, nargs=2, default=None, dest="COMPARE", metavar=("OLD", "NEW"),
+                        help="Compare two results files instead of running, and exit with status 1 on regressions.")
+    parser.add_argument("--threshold", type=float, default=0.25, dest="THRESHOLD",
+                        help="The fraction by which a solve must slow down to count as a regression.")
+    parser.add_argument("--min-seconds", type=float, default=0.01, dest="MIN_SECONDS",
+                        help="Slowdowns smaller than this many seconds are ignored as noise.")
+
+    options = parser.parse_args(args)
+
+    if options.COMPARE:
+        old, new = options.COMPARE
+        regressions = compare(_read(old), _read(new), options.THRESHOLD, options.MIN_SECONDS)
+        sys.exit(1 if regressions else 0)
+
+    results = run(options)
+    print_summary(results)
+    if options.OUTPUT:
+        with open(options.OUTPUT, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote results to {options.OUTPUT}")
+
+
+#
+
+
+def config_name(algorithm: str, args: dict) -> str:
+    return f"{algorithm}:{args['mode']}" if "mode" in args else algorithm
+
+
+def generate_boards(size: int, presses: List[int], count: int, seed: int) -> Dict[int, List[str]]:
+    """
+    Generates solvable boards by pressing random squares of an empty board, keeping only those whose fewest-press
+    solution needs exactly the press count of their bucket.
+
+    :return: The boards of each bucket, mapped by press count.
+    """
+    system = LinearSystem.get((size, size), CrossFormation)
+    squares = size * size
+    boards: Dict[int, List[str]] = dict()
+    for k in presses:
+        if k > squares:
+            continue
+        rng = random.Random(f"{seed}:{size}:{k}")
+        found: List[str] = []
+        for _ in range(count * 1000):
+            if len(found) == count:
+                break
+            board = Board.from_mask((size, size), 0)
+            for pos in rng.sample([(r, c) for r in range(size) for c in range(size)], k):
+                board = board.flip_formation(pos, CrossFormation)
+            if str(board) not in found and bin(system.solve(board.mask)).count("1") == k:
+                found.append(str(board))
+        if found:
+            boards[k] = found
+    return boards
+
+
+def _peak_rss_kb() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _solve(algorithm_name: str, args: dict, board_str: str, connection):
+    algorithm_type = next(a for a in MezzonicGame.supported_algorithms() if a.name() == algorithm_name)
+    baseline = _peak_rss_kb()
+    start = time.perf_counter()
+    try:
+        algorithm = algorithm_type(**args)
+        algorithm.stats = SearchStats(enabled=True)
+        board = Board.parse(board_str)
+        start = time.perf_counter()
+        solution = algorithm.solve(board)
+        elapsed = time.perf_counter() - start
+        result = {"status": "ok", "moves": len(solution) - 1}
+        if "portfolio" in algorithm.stats.notes:
+            result["winner"] = algorithm.stats.notes["portfolio"]["winner"]
+    except ExecutionError as e:
+        elapsed = time.perf_counter() - start
+        result = {"status": "no_path" if e.type == ErrorType.NO_PATH_FOUND else "error", "message": e.message}
+    except Exception as e:
+        elapsed = time.perf_counter() - start
+        result = {"status": "error", "message": str(e)}
+    # Algorithms that don't search (eg. the linear algebra solver) expand no nodes
+    stats = algorithm.stats if result["status"] != "error" and algorithm.stats.generated else None
+    connection.send({**result,
+                     "seconds": round(elapsed, 6),
+                     "nodes": stats.expanded if stats is not None else None,
+                     "generated": stats.generated if stats is not None else None,
+                     "peak_frontier": stats.peak_frontier if stats is not None else None,
+                     "peak_kb": _peak_rss_kb() - baseline})
+    connection.close()
+
+
+def solve_with_timeout(algorithm: str, args: dict, board: str, timeout: float) -> dict:
+    # Each solve runs in its own process, so that it can be stopped, and so that its memory is measured alone
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_solve, args=(algorithm, args, board, sender))
+    process.start()
+    sender.close()
+    if receiver.poll(timeout):
+        result = receiver.recv()
+        process.join()
+        return result
+    process.kill()
+    process.join()
+    return {"status": "timeout", "seconds": timeout}
+
+
+def run(options: argparse.Namespace) -> dict:
+    sizes = _parse_range(options.SIZES)
+    presses = _parse_range(options.PRESSES)
+    configs = CONFIGS
+    if options.CONFIGS:
+        wanted = options.CONFIGS.split(",")
+        configs = [(a, args) for a, args in CONFIGS if config_name(a, args) in wanted or a in wanted]
+
+    if not options.USE_TABLE:
+        # Point the solvers at an empty directory, so that they have to search
+        os.environ[TABLE_DIR_VARIABLE] = tempfile.mkdtemp()
+
+    results = []
+    for size in sizes:
+        if size > min(SIZE_LIMIT):
+            continue
+        boards = generate_boards(size, presses, options.BOARDS, options.SEED)
+        for algorithm, args in configs:
+            name = config_name(algorithm, args)
+            timed_out = False
+            for k, bucket in sorted(boards.items()):
+                for board in bucket:
+                    # Boards needing more presses are harder, so stop once a bucket has timed out
+                    result = {"status": "skipped"} if timed_out \
+                        else solve_with_timeout(algorithm, args, board, options.TIMEOUT)
+                    timed_out = timed_out or result["status"] == "timeout"
+                    results.append({"config": name, "algorithm": algorithm, "args": args,
+                                    "size": size, "presses": k, "board": board, **result})
+                    print(f"{name:<35} {size}x{size} {k:>3} presses  {result['status']:<8} "
+                          f"{result.get('seconds', '')}", flush=True)
+
+    return {
+        "meta": {
+            "seed": options.SEED,
+            "sizes": sizes,
+            "presses": presses,
+            "boards": options.BOARDS,
+            "timeout": options.TIMEOUT,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S")
+        },
+        "results": results
+    }
+
+
+#
+
+
+def print_summary(results: dict):
+    groups: Dict[Tuple[str, int, int], List[dict]] = dict()
+    for r in results["results"]:
+        groups.setdefault((r["config"], r["size"], r["presses"]), []).append(r)
+
+    print(f"\n{'config':<35} {'size':>5} {'presses':>7} {'solved':>7} {'median s':>10} {'max s':>10} "
+          f"{'median nodes':>13} {'peak KB':>9}")
+    for (config, size, presses), group in sorted(groups.items()):
+        solved = [r for r in group if r["status"] == "ok"]
+        times = [r["seconds"] for r in solved]
+        nodes = [r["nodes"] for r in solved if r.get("nodes") is not None]
+        peaks = [r["peak_kb"] for r in solved]
+        print(f"{config:<35} {f'{size}x{size}':>5} {presses:>7} {f'{len(solved)}/{len(group)}':>7} "
+              f"{_format(statistics.median(times) if times else None):>10} {_format(max(times) if times else None):>10} "
+              f"{_format(statistics.median(nodes) if nodes else None, '.0f'):>13} "
+              f"{_format(max(peaks) if peaks else None, 'd'):>9}")
+
+
+def compare(old: dict, new: dict, threshold: float, min_seconds: float) -> List[str]:
+    """
+    Compares the results of two runs, board by board, and prints every regression:  a board that is no longer
+    solved, is solved with more moves, or is solved more slowly by more than the threshold.
+
+    :return: A description of each regression.
+    """
+    def _key(r: dict) -> Tuple[str, int, int, str]:
+        return r["config"], r["size"], r["presses"], r["board"]
+
+    old_results = {_key(r): r for r in old["results"]}
+    regressions: List[str] = []
+    improvements = 0
+    for r in new["results"]:
+        before = old_results.get(_key(r))
+        if before is None or before["status"] == "skipped" or r["status"] == "skipped":
+            continue
+        label = f"{r['config']} {r['size']}x{r['size']} ({r['presses']} presses) {r['board']}"
+        if before["status"] == "ok" and r["status"] != "ok":
+            regressions.append(f"{label}: was solved, now {r['status']}")
+        elif before["status"] == "ok" and r["moves"] > before["moves"]:
+            regressions.append(f"{label}: {before['moves']} -> {r['moves']} moves")
+        elif before["status"] == "ok" and r["seconds"] - before["seconds"] > max(min_seconds,
+                                                                                 threshold * before["seconds"]):
+            regressions.append(f"{label}: {before['seconds']:.4f}s -> {r['seconds']:.4f}s")
+        elif before["status"] != "ok" and r["status"] == "ok" or \
+                (r["status"] == "ok" and before["seconds"] - r["seconds"] > max(min_seconds,
+                                                                                threshold * before["seconds"])):
+            improvements += 1
+
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    print(f"{len(regressions)} regressions, {improvements} improvements")
+    return regressions
+
+
+#
+
+
+def _parse_range(s: str) -> List[int]:
+    if "-" in s:
+        low, high = s.split("-")
+        return list(range(int(low), int(high) + 1))
+    return [int(v) for v in s.split(",")]
+
+
+def _format(value: Optional[float], spec: str = ".4f") -> str:
+    return "-" if value is None else format(value, spec)
+
+
+def _read(path: str) -> dict:
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    load_from_cli()
@@ -0,0 +1,88 @@
+import sys
+import os
+import json
+import time
+import random
+import argparse
+import resource
+import subprocess
+
+DEFAULT_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src")
+
+
+def load_from_cli():
+    args = sys.argv[1:]
+
+    parser = argparse.ArgumentParser(description="Measure the peak memory (RSS) of solving a hard Mezzonic board with "
+                                                 "a path-finding algorithm.  Each source tree is measured in a fresh "
+                                                 "process, so that two trees (eg. before and after a change) can be "
+                                                 "compared side by side.")
+    parser.add_argument("--source", type=str, action="append", default=None, dest="SOURCES",
+                        help="A 'src' directory to measure.  May be given more than once.  Defaults to this repo's.")
+    parser.add_argument("--algorithm", type=str, default="orderless", dest="ALGORITHM")
+    parser.add_argument("--board", type=str, default=None, dest="BOARD",
+                        help="The board to solve.  Defaults to a seeded scramble of an empty 5x5 board.")
+    parser.add_argument("--presses", type=int, default=11, dest="PRESSES",
+                        help="The number of distinct squares pressed to scramble the default board.")
+    parser.add_argument("--seed", type=int, default=0, dest="SEED")
+    parser.add_argument("--child", action="store_true", dest="CHILD", help=argparse.SUPPRESS)
+
+    options = parser.parse_args(args)
+
+    if options.BOARD is None:
+        options.BOARD = scramble(options.PRESSES, options.SEED)
+
+    if options.CHILD:
+        print(json.dumps(measure(options)))
+    else:
+        compare(options)
+
+
+def scramble(presses: int, seed: int, size: int = 5) -> str:
+    rows = [[0] * size for _ in range(size)]
+    for row, col in random.Random(seed).sample([(r, c) for r in range(size) for c in range(size)], presses):
+        for r, c in ((row, col), (row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+            if 0 <= r < size and 0 <= c < size:
+                rows[r][c] ^= 1
+    return "|".join("".join(str(v) for v in row) for row in rows)
+
+
+def peak_rss_kb() -> int:
+    # ru_maxrss is in kilobytes on Linux, but in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def measure(options: argparse.Namespace) -> dict:
+    from Games.Mezzonic import Board, MezzonicGame
+
+    algorithm = next(a for a in MezzonicGame.supported_algorithms() if a.name() == options.ALGORITHM)()
+    board = Board.parse(options.BOARD)
+    baseline = peak_rss_kb()
+
+    start = time.perf_counter()
+    solution = algorithm.solve(board)
+    elapsed = time.perf_counter() - start
+
+    return {"moves": len(solution) - 1,
+            "seconds": round(elapsed, 3),
+            "baseline_kb": baseline,
+            "peak_kb": peak_rss_kb()}
+
+
+def compare(options: argparse.Namespace):
+    sources = options.SOURCES if options.SOURCES else [DEFAULT_SOURCE]
+    print(f"Solving {options.BOARD} with '{options.ALGORITHM}'")
+    print(f"{'source':<40} {'moves':>5} {'seconds':>8} {'baseline KB':>12} {'peak KB':>10} {'search KB':>10}")
+    for source in sources:
+        env = dict(os.environ, PYTHONPATH=os.path.abspath(source))
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child",
+                                 "--algorithm", options.ALGORITHM, "--board", options.BOARD],
+                                env=env, check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{source:<40} {result['moves']:>5} {result['seconds']:>8} {result['baseline_kb']:>12} "
+              f"{result['peak_kb']:>10} {result['peak_kb'] - result['baseline_kb']:>10}")
+
+
+if __name__ == "__main__":
+    load_from_cli()
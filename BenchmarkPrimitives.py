@@ -0,0 +1,185 @@
+from Games.Mezzonic import Board, CrossFormation
+from Games.Game import Conditions
+from Lambda import Wrapper, LambdaArguments
+from PathFinding import Solution
+from Utilty import IterableUtils
+
+import gc
+import sys
+import json
+import time
+import random
+import itertools
+import argparse
+import tracemalloc
+from typing import Callable, List, Tuple, Dict, Any
+
+# The number of operations to keep the results of when counting allocations
+ALLOCATION_OPS = 1000
+
+BOARD = "11100|01001|10011|01011|01111"
+EVENT = {
+    "queryStringParameters": {"board": BOARD, "algorithm": "exhaustive", "game": "mezzonic"},
+    "headers": {"Accept": "application/json", "Content-Type": "application/json"},
+    "body": json.dumps({"mode": "mixed", "limit": 5})
+}
+
+
+def load_from_cli():
+    args = sys.argv[1:]
+
+    parser = argparse.ArgumentParser(description="Microbenchmark the primitives that dominate solver profiles, "
+                                                 "reporting the time and allocations of each operation.")
+    parser.add_argument("--filter", type=str, default=None, dest="FILTER",
+                        help="Only run benchmarks whose name contains this.")
+    parser.add_argument("--repeat", type=int, default=5, dest="REPEAT",
+                        help="The number of timing runs per benchmark, of which the fastest is reported.")
+    parser.add_argument("--min-time", type=float, default=0.2, dest="MIN_TIME",
+                        help="The minimum seconds of each timing run.")
+    parser.add_argument("--output", type=str, default=None, dest="OUTPUT",
+                        help="The file to write the JSON results to.")
+    parser.add_argument("--compare", type=str, nargs=2, default=None, dest="COMPARE", metavar=("OLD", "NEW"),
+                        help="Compare two results files instead of running.")
+
+    options = parser.parse_args(args)
+
+    if options.COMPARE:
+        old, new = options.COMPARE
+        compare(_read(old), _read(new))
+        return
+
+    results = run(options)
+    if options.OUTPUT:
+        with open(options.OUTPUT, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote results to {options.OUTPUT}")
+
+
+#
+
+
+def benchmarks() -> List[Tuple[str, Callable[[], Any]]]:
+    """
+    Builds the operation to benchmark for each primitive.  Any setup happens here, outside of the operations.
+    """
+    board = Board.parse(BOARD)
+    other = Board.parse(BOARD)
+    solution = Solution.follow(board, [t for _, t in list(board.get_adjacent_states())[:8]])
+    conditions = Conditions("exhaustive", {"mode": "mixed", "limit": 5}, board)
+    rng = random.Random(0)
+    items = sorted(rng.randrange(1 << 30) for _ in range(1 << 20))
+    targets = [rng.randrange(1 << 30) for _ in range(1024)]
+    target_iter = itertools.cycle(targets)
+
+    def wrapper_round_trip() -> dict:
+        with Wrapper(EVENT, {}) as w:
+            w.add_cors_header()
+            w.set_result(solution)
+        return w.result
+
+    return [
+        ("Board.parse", lambda: Board.parse(BOARD)),
+        ("Board.flip_formation", lambda: board.flip_formation((2, 2), CrossFormation)),
+        ("Board.score", lambda: board.score),
+        ("Board.__hash__", lambda: hash(board)),
+        ("Board.__eq__", lambda: board == other),
+        ("Board.interesting_coordinates", lambda: list(board.interesting_coordinates())),
+        ("CrossFormation.get_positions", lambda: list(CrossFormation.get_positions((2, 2)))),
+        ("IterableUtils.binary_search_by (2^20 items)",
+         lambda: IterableUtils.binary_search_by(items, next(target_iter), key=lambda x: x)),
+        ("Solution.to_json (8 steps)", lambda: solution.to_json()),
+        ("Conditions.__hash__", lambda: hash(conditions)),
+        ("LambdaArguments.parse_event", lambda: LambdaArguments.parse_event(EVENT)),
+        ("Wrapper round trip", wrapper_round_trip)
+    ]
+
+
+def time_op(op: Callable[[], Any], repeat: int, min_time: float) -> float:
+    """
+    :return: The fastest time per operation of any run, in nanoseconds.
+    """
+    number = 1
+    while True:
+        elapsed = _time_loop(op, number)
+        if elapsed >= min_time / 10:
+            break
+        number *= 10
+    number = max(number, int(number * (min_time / elapsed)))
+
+    best = elapsed / number
+    for _ in range(repeat):
+        best = min(best, _time_loop(op, number) / number)
+    return best * 1e9
+
+
+def _time_loop(op: Callable[[], Any], number: int) -> float:
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(number):
+            op()
+        return time.perf_counter() - start
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def count_allocations(op: Callable[[], Any]) -> Dict[str, float]:
+    """
+    Counts the memory blocks (objects, and their buffers) each operation leaves allocated, by keeping the results
+    of many operations alive, and the peak memory used while a single operation runs.
+    """
+    op()
+    gc.collect()
+    results = [None] * ALLOCATION_OPS
+    before = sys.getallocatedblocks()
+    for i in range(ALLOCATION_OPS):
+        results[i] = op()
+    blocks = (sys.getallocatedblocks() - before) / ALLOCATION_OPS
+    del results
+
+    # Tracing is started afresh for the operation, so its peak is the operation's alone (reset_peak() needs 3.9)
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        op()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"blocks_per_op": round(blocks, 2), "peak_bytes_per_op": peak - start}
+
+
+def run(options: argparse.Namespace) -> dict:
+    results = []
+    print(f"{'benchmark':<45} {'ns/op':>12} {'blocks/op':>10} {'peak B/op':>10}")
+    for name, op in benchmarks():
+        if options.FILTER and options.FILTER not in name:
+            continue
+        ns = time_op(op, options.REPEAT, options.MIN_TIME)
+        allocations = count_allocations(op)
+        results.append({"name": name, "ns_per_op": round(ns, 1), **allocations})
+        print(f"{name:<45} {ns:>12.1f} {allocations['blocks_per_op']:>10} {allocations['peak_bytes_per_op']:>10}",
+              flush=True)
+    return {"python": sys.version.split()[0], "results": results}
+
+
+def compare(old: dict, new: dict):
+    before = {r["name"]: r for r in old["results"]}
+    print(f"{'benchmark':<45} {'old ns/op':>12} {'new ns/op':>12} {'change':>8} {'old blocks':>10} {'new blocks':>10}")
+    for r in new["results"]:
+        b = before.get(r["name"])
+        if b is None:
+            continue
+        change = (r["ns_per_op"] - b["ns_per_op"]) / b["ns_per_op"] * 100
+        print(f"{r['name']:<45} {b['ns_per_op']:>12.1f} {r['ns_per_op']:>12.1f} {change:>+7.1f}% "
+              f"{b['blocks_per_op']:>10} {r['blocks_per_op']:>10}")
+
+
+def _read(path: str) -> dict:
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    load_from_cli()
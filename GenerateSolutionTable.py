@@ -0,0 +1,33 @@
+from Games.Mezzonic.SolutionTable import SolutionTable
+from Interfaces import LogMethod
+
+import sys
+import argparse
+
+
+def load_from_cli():
+    args = sys.argv[1:]
+
+    parser = argparse.ArgumentParser(description="Generate the complete Mezzonic solution table for a board size.")
+    parser.add_argument("--height", type=int, default=5, dest="HEIGHT")
+    parser.add_argument("--width", type=int, default=5, dest="WIDTH")
+    parser.add_argument("--output", type=str, default=None, dest="OUTPUT",
+                        help="The file to write the table to.  Defaults to where the solver looks for it.")
+    parser.add_argument("--processes", type=int, default=None, dest="PROCESSES",
+                        help="The number of processes to use.  Defaults to the number of CPUs.")
+
+    options = parser.parse_args(args)
+
+    generate(options)
+
+
+def generate(options: argparse.Namespace):
+    size = (options.HEIGHT, options.WIDTH)
+    SolutionTable.generate(path=options.OUTPUT if options.OUTPUT else SolutionTable.default_path(size),
+                           size=size,
+                           processes=options.PROCESSES,
+                           logger=LogMethod.printer())
+
+
+if __name__ == "__main__":
+    load_from_cli()
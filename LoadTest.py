@@ -0,0 +1,277 @@
+from BenchmarkAlgorithms import generate_boards, config_name, _format
+import Main
+
+import io
+import sys
+import json
+import math
+import time
+import uuid
+import random
+import argparse
+import threading
+import contextlib
+import http.client
+from urllib.parse import urlsplit, urlencode
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Any
+
+DEFAULT_CONFIGS = "linear,orderless_lookahead,exhaustive:mixed"
+
+
+def load_from_cli():
+    args = sys.argv[1:]
+
+    parser = argparse.ArgumentParser(description="Replay a corpus of solve requests at a given concurrency and rate, "
+                                                 "and report the throughput, latency, cache hit ratio and error rate "
+                                                 "of each algorithm.")
+    parser.add_argument("--corpus", type=str, default=None, dest="CORPUS",
+                        help="A JSON file of requests to replay, each an object with a 'board', an 'algorithm', and "
+                             "optionally its 'args' and any other 'query' parameters.  Defaults to seeded 5x5 boards "
+                             "solved by each of --configs.")
+    parser.add_argument("--configs", type=str, default=DEFAULT_CONFIGS, dest="CONFIGS",
+                        help="The algorithms of the default corpus (eg. 'orderless,exhaustive:mixed').")
+    parser.add_argument("--boards", type=int, default=10, dest="BOARDS",
+                        help="The number of boards of each press count in the default corpus.")
+    parser.add_argument("--seed", type=int, default=0, dest="SEED")
+    parser.add_argument("--url", type=str, default=None, dest="URL",
+                        help="The endpoint to send requests to (eg. 'http://127.0.0.1:8080/solve').  Defaults to "
+                             "calling Main.main() in this process.")
+    parser.add_argument("--requests", type=int, default=None, dest="REQUESTS",
+                        help="The number of requests to send, cycling through the corpus in a shuffled order.  "
+                             "Defaults to the size of the corpus.")
+    parser.add_argument("--concurrency", type=int, default=4, dest="CONCURRENCY",
+                        help="The number of requests in flight at once.")
+    parser.add_argument("--rate", type=float, default=None, dest="RATE",
+                        help="The requests per second to start.  Defaults to starting each request as soon as "
+                             "there is room for it.")
+    parser.add_argument("--timeout", type=float, default=30, dest="TIMEOUT",
+                        help="The seconds each request may take.")
+    parser.add_argument("--output", type=str, default=None, dest="OUTPUT",
+                        help="The file to write the JSON report to.")
+
+    options = parser.parse_args(args)
+
+    corpus = load_corpus(options.CORPUS) if options.CORPUS else \
+        default_corpus(options.CONFIGS, options.BOARDS, options.SEED)
+    target = HTTPTarget(options.URL, options.TIMEOUT) if options.URL else LocalTarget(options.TIMEOUT)
+
+    schedule = [corpus[i % len(corpus)] for i in range(options.REQUESTS or len(corpus))]
+    random.Random(options.SEED).shuffle(schedule)
+
+    results = run(target, schedule, options.CONCURRENCY, options.RATE)
+    report = summarize(results["requests"], results["seconds"])
+    print_report(report, results["seconds"])
+    if options.OUTPUT:
+        with open(options.OUTPUT, "w") as f:
+            json.dump({"target": options.URL or "local", "concurrency": options.CONCURRENCY, "rate": options.RATE,
+                       "seconds": results["seconds"], "report": report}, f, indent=2)
+        print(f"Wrote report to {options.OUTPUT}")
+
+
+#
+
+
+def load_corpus(path: str) -> List[dict]:
+    with open(path, "r") as f:
+        corpus = json.load(f)
+    if not isinstance(corpus, list) or not corpus:
+        raise ValueError("Corpus must be a non-empty JSON array of requests.")
+    for item in corpus:
+        if "board" not in item or "algorithm" not in item:
+            raise ValueError(f"Corpus request is missing a board or algorithm:  {item}")
+    return corpus
+
+
+def default_corpus(configs: str, boards: int, seed: int) -> List[dict]:
+    """
+    Builds a corpus of seeded, solvable 5x5 boards needing between 2 and 10 presses, each solved by every config.
+    """
+    corpus = []
+    for config in configs.split(","):
+        algorithm, _, mode = config.partition(":")
+        for board_list in generate_boards(5, [2, 4, 6, 8, 10], boards, seed).values():
+            corpus.extend({"board": board, "algorithm": algorithm, "args": {"mode": mode} if mode else {}}
+                          for board in board_list)
+    return corpus
+
+
+def to_event(item: dict) -> dict:
+    return {
+        "httpMethod": "POST",
+        "path": "/solve",
+        "pathParameters": {},
+        "queryStringParameters": {"game": item.get("game", "mezzonic"), "board": item["board"],
+                                  "algorithm": item["algorithm"], **item.get("query", dict())},
+        "headers": {"Content-Type": "application/json"},
+        "body": json.dumps(item.get("args", dict()))
+    }
+
+
+class LocalContext:
+    """
+    Stands in for the Lambda context, with a timeout counted from when the request starts.
+    """
+
+    function_name = "protolock-load-test"
+
+    def __init__(self, timeout: float):
+        self.aws_request_id = str(uuid.uuid4())
+        self._deadline = time.monotonic() + timeout
+
+    def get_remaining_time_in_millis(self) -> int:
+        return max(0, int((self._deadline - time.monotonic()) * 1000))
+
+
+class LocalTarget:
+    """
+    Sends requests to Main.main() in this process, sharing its results cache.
+    """
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+
+    def send(self, event: dict) -> Dict[str, Any]:
+        result = Main.main(event, LocalContext(self.timeout))
+        return {"status": result["statusCode"], "source": result["headers"].get("X-Solution-Source")}
+
+
+class HTTPTarget:
+    """
+    Sends requests to an HTTP endpoint, such as Server.py, keeping one connection open per thread.
+    """
+
+    def __init__(self, url: str, timeout: float):
+        self.url = urlsplit(url)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def send(self, event: dict) -> Dict[str, Any]:
+        path = f"{self.url.path or '/'}?{urlencode(event['queryStringParameters'])}"
+        for attempt in range(2):
+            connection = self._connection()
+            try:
+                connection.request(event["httpMethod"], path, body=event["body"], headers=event["headers"])
+                response = connection.getresponse()
+                response.read()
+                return {"status": response.status, "source": response.getheader("X-Solution-Source")}
+            except (ConnectionError, http.client.HTTPException):
+                # The server may have closed a kept-alive connection, so retry once on a new one
+                connection.close()
+                self._local.connection = None
+                if attempt == 1:
+                    raise
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if getattr(self._local, "connection", None) is None:
+            connection_type = http.client.HTTPSConnection if self.url.scheme == "https" else http.client.HTTPConnection
+            self._local.connection = connection_type(self.url.hostname, self.url.port, timeout=self.timeout)
+        return self._local.connection
+
+
+#
+
+
+def run(target, schedule: List[dict], concurrency: int, rate: Optional[float]) -> dict:
+    """
+    Sends every request of the schedule, with at most the given number in flight at once.  With a rate, request i
+    is due i / rate seconds after the start, and its latency counts from when it was due rather than from when it
+    was sent, so that time spent waiting for a free slot behind slow requests is not hidden.
+    """
+    results: List[Optional[dict]] = [None] * len(schedule)
+    events = [to_event(item) for item in schedule]
+    next_index = iter(range(len(schedule)))
+    lock = threading.Lock()
+    start = time.perf_counter()
+
+    def _worker():
+        while True:
+            with lock:
+                i = next(next_index, None)
+            if i is None:
+                return
+            due = start + i / rate if rate else time.perf_counter()
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                outcome = target.send(events[i])
+            except Exception as e:
+                outcome = {"status": None, "source": None, "exception": repr(e)}
+            outcome["latency"] = time.perf_counter() - due
+            outcome["config"] = config_name(schedule[i]["algorithm"], schedule[i].get("args", dict()))
+            results[i] = outcome
+
+    # The in-process target logs every request, which would drown out the report
+    quiet = contextlib.redirect_stdout(io.StringIO()) if isinstance(target, LocalTarget) else \
+        contextlib.nullcontext()
+    with quiet, ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(_worker) for _ in range(concurrency)]:
+            future.result()
+
+    return {"seconds": time.perf_counter() - start, "requests": results}
+
+
+def summarize(results: List[dict], seconds: float) -> Dict[str, dict]:
+    groups: Dict[str, List[dict]] = {"all": results}
+    for r in results:
+        groups.setdefault(r["config"], []).append(r)
+
+    report = dict()
+    for config, group in groups.items():
+        latencies = sorted(r["latency"] for r in group)
+        succeeded = [r for r in group if _succeeded(r)]
+        sources: Dict[str, int] = dict()
+        for r in succeeded:
+            sources[r["source"] or "unknown"] = sources.get(r["source"] or "unknown", 0) + 1
+        report[config] = {
+            "requests": len(group),
+            "throughput": round(len(group) / seconds, 3),
+            "p50_ms": round(_percentile(latencies, 50) * 1000, 3),
+            "p95_ms": round(_percentile(latencies, 95) * 1000, 3),
+            "p99_ms": round(_percentile(latencies, 99) * 1000, 3),
+            "cache_hit_ratio": round(sources.get("cache", 0) / len(succeeded), 4) if succeeded else None,
+            "error_rate": round(1 - len(succeeded) / len(group), 4),
+            "sources": sources,
+            "errors": _count(str(r["status"] or r["exception"]) for r in group if not _succeeded(r))
+        }
+    return report
+
+
+def print_report(report: Dict[str, dict], seconds: float):
+    print(f"{report['all']['requests']} requests in {seconds:.2f}s")
+    print(f"\n{'config':<35} {'requests':>8} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'cache hit':>9} {'errors':>7}")
+    for config, r in sorted(report.items(), key=lambda item: (item[0] == "all", item[0])):
+        print(f"{config:<35} {r['requests']:>8} {r['throughput']:>8.2f} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} "
+              f"{r['p99_ms']:>9.1f} {_format(r['cache_hit_ratio'], '.1%'):>9} {r['error_rate']:>7.1%}")
+    errors = report["all"]["errors"]
+    if errors:
+        print(f"\nErrors:  {', '.join(f'{e} x{n}' for e, n in sorted(errors.items()))}")
+
+
+#
+
+
+def _succeeded(result: dict) -> bool:
+    return result["status"] is not None and result["status"] < 400
+
+
+def _percentile(values: List[float], p: float) -> float:
+    """
+    :return: The nearest-rank percentile of the given sorted values.
+    """
+    if not values:
+        return math.nan
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def _count(values) -> Dict[str, int]:
+    counts: Dict[str, int] = dict()
+    for v in values:
+        counts[v] = counts.get(v, 0) + 1
+    return counts
+
+
+if __name__ == "__main__":
+    load_from_cli()
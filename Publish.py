@@ -29,6 +29,9 @@ def load_from_cli():
     parser.add_argument("--skip-package-upload", action="store_true", dest="SKIP_UPLOAD")
     parser.add_argument("--cwd", type=str, default="./", dest="CWD")
     parser.add_argument("--skip-dependencies", "-s", action="store_true", dest="SKIP_DEPENDENCIES")
+    parser.add_argument("--force", action="store_true", dest="FORCE",
+                        help="Reinstall dependencies, upload the package and update the function's code even if "
+                             "nothing has changed.")
 
     options = parser.parse_args(args)
 
@@ -50,6 +53,7 @@ def publish(options: argparse.Namespace):
                    publish_after=not options.NO_PUBLISH and not options.DRY_RUN,
                    dry_run=options.DRY_RUN,
                    delete_lock=options.DELETE_LOCK,
+                   force=options.FORCE,
                    skip_dependencies=options.SKIP_DEPENDENCIES,
                    skip_package_upload=options.SKIP_UPLOAD,
                    local_libs=options.LOCAL_LIBS if hasattr(options, "LOCAL_LIBS") else dict(),
@@ -0,0 +1,227 @@
+from Games import Game
+from PathFinding import Solution, SearchBudget, SearchStats
+from Errors import ExecutionError, ErrorType
+from ResultsCache import RESULTS_CACHE
+import Main
+
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qsl
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, Future
+from typing import Optional, Tuple, Dict, Set
+
+# The largest request body accepted, in bytes
+MAX_BODY_BYTES = 1024 * 1024
+
+
+def load_from_cli():
+    args = sys.argv[1:]
+
+    parser = argparse.ArgumentParser(description="Serve the solver over HTTP as a long-lived process, translating "
+                                                 "each request into the API Gateway event that Main.main() takes.")
+    parser.add_argument("--host", type=str, default="127.0.0.1", dest="HOST")
+    parser.add_argument("--port", type=int, default=8080, dest="PORT")
+    parser.add_argument("--workers", type=int, default=None, dest="WORKERS",
+                        help="The number of processes to run algorithms in.  Defaults to the number of CPUs.")
+    parser.add_argument("--queue", type=int, default=64, dest="QUEUE",
+                        help="The number of requests that may wait for a worker before requests are turned away "
+                             "with 503.")
+    parser.add_argument("--timeout", type=float, default=30, dest="TIMEOUT",
+                        help="The seconds each request may take, which bounds its search budget like a Lambda "
+                             "timeout.")
+
+    options = parser.parse_args(args)
+
+    asyncio.run(SolveServer(options.WORKERS, options.QUEUE, options.TIMEOUT).serve(options.HOST, options.PORT))
+
+
+#
+
+
+class SolveServer:
+    """
+    An HTTP server for the solver.  Connections are handled with asyncio, and each request is handled by
+    Main.main() on a thread of its own, which runs any algorithm in a pool of worker processes.  Everything else,
+    including the results cache, stays in this process, so the cache is shared by every request and stays warm.
+
+    At most 'workers' + 'queue' requests are handled at once.  Requests beyond that are answered straight away
+    with a 503, rather than queueing without bound.
+    """
+
+    def __init__(self, workers: Optional[int], queue: int, timeout: float):
+        self.timeout = timeout
+        self._processes = ProcessPoolExecutor(max_workers=workers)
+        self._capacity = self._processes._max_workers + queue
+        self._threads = ThreadPoolExecutor(max_workers=self._capacity)
+        self._in_flight = 0
+        # Work submitted to either pool and not yet finished, to be cancelled on shutdown
+        self._pending: Set[Future] = set()
+        self.handled = 0
+        self.rejected = 0
+
+    async def serve(self, host: str, port: int):
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        print(f"Serving on http://{host}:{port} with {self._processes._max_workers} workers "
+              f"and room for {self._capacity} requests at once")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            # shutdown() can only cancel queued work itself from Python 3.9
+            for future in list(self._pending):
+                future.cancel()
+            self._threads.shutdown(wait=False)
+            self._processes.shutdown(wait=False)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            keep_alive = True
+            while keep_alive:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+
+                status, response_headers, response_body = await self._respond(method, target, headers, body)
+                _write_response(writer, status, response_headers, response_body, keep_alive)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except _BadRequest as e:
+            _write_response(writer, 400, {"Content-Type": "application/json"},
+                            json.dumps(ExecutionError(ErrorType.BAD_REQUEST, str(e)).to_json()), False)
+        finally:
+            writer.close()
+
+    async def _respond(self, method: str, target: str, headers: Dict[str, str], body: str) \
+            -> Tuple[int, Dict[str, str], str]:
+        url = urlsplit(target)
+        if url.path == "/health":
+            return 200, {"Content-Type": "application/json"}, json.dumps(self.health())
+
+        if self._in_flight >= self._capacity:
+            self.rejected += 1
+            error = ExecutionError(ErrorType.SERVER_BUSY, "Too many requests in progress, try again later.",
+                                   {"capacity": self._capacity})
+            return error.http_status_code, {"Content-Type": "application/json", "Retry-After": "1"}, \
+                json.dumps(error.to_json())
+
+        event = {
+            "httpMethod": method,
+            "path": url.path,
+            "pathParameters": {},
+            "queryStringParameters": dict(parse_qsl(url.query)),
+            "headers": headers,
+            "body": body if body else None
+        }
+        context = _ServerContext(self.timeout)
+
+        self._in_flight += 1
+        try:
+            future = self._submit(self._threads, Main.main, event, context, solver=self._solve)
+            result = await asyncio.wrap_future(future)
+        finally:
+            self._in_flight -= 1
+            self.handled += 1
+        return result["statusCode"], result["headers"], result.get("body", "")
+
+    def _solve(self, game: Game, budget: Optional[SearchBudget]) -> Solution:
+        # Runs on a request's thread, which waits for a worker process to run the algorithm
+        solution, stats = self._submit(self._processes, _solve_in_worker, game, budget).result()
+        game.algorithm.stats.merge(stats.to_json())
+        game.algorithm.stats.phases.update(stats.phases)
+        game.algorithm.stats.notes.update(stats.notes)
+        return solution
+
+    def _submit(self, executor, fn, *args, **kwargs) -> Future:
+        future = executor.submit(fn, *args, **kwargs)
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        return future
+
+    def health(self) -> dict:
+        return {
+            "in_flight": self._in_flight,
+            "capacity": self._capacity,
+            "handled": self.handled,
+            "rejected": self.rejected,
+            "cache": RESULTS_CACHE.stats()
+        }
+
+
+def _solve_in_worker(game: Game, budget: Optional[SearchBudget]) -> Tuple[Solution, SearchStats]:
+    solution = game.solve(budget)
+    return solution, game.algorithm.stats
+
+
+class _ServerContext:
+    """
+    Stands in for the Lambda context, so that searches are budgeted by the request's timeout.
+    """
+
+    function_name = "protolock-server"
+
+    def __init__(self, timeout: float):
+        self.aws_request_id = str(uuid.uuid4())
+        self._deadline = time.monotonic() + timeout
+
+    def get_remaining_time_in_millis(self) -> int:
+        return max(0, int((self._deadline - time.monotonic()) * 1000))
+
+
+class _BadRequest(Exception):
+    pass
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], str]]:
+    """
+    Reads one HTTP/1.1 request from the connection.
+
+    :return: The method, target, headers (with lowercase names) and body of the request, or None if the
+    connection was closed before another request began.
+    """
+    line = await reader.readline()
+    if not line:
+        return None
+    parts = line.decode("latin-1").split()
+    if len(parts) != 3:
+        raise _BadRequest("Malformed request line.")
+    method, target, _ = parts
+
+    headers: Dict[str, str] = dict()
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        raise _BadRequest("Chunked request bodies are not supported.")
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise _BadRequest("Invalid Content-Length.")
+    if length < 0 or length > MAX_BODY_BYTES:
+        raise _BadRequest("Request body too large.")
+    body = (await reader.readexactly(length)).decode("utf-8") if length else ""
+    return method, target, headers, body
+
+
+def _write_response(writer: asyncio.StreamWriter, status: int, headers: Dict[str, str], body: str,
+                    keep_alive: bool):
+    data = body.encode("utf-8")
+    lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"] + \
+            [f"{name}: {value}" for name, value in headers.items()] + \
+            [f"Content-Length: {len(data)}", f"Connection: {'keep-alive' if keep_alive else 'close'}", "", ""]
+    writer.write("\r\n".join(lines).encode("latin-1") + data)
+
+
+if __name__ == "__main__":
+    load_from_cli()
@@ -39,6 +39,13 @@ class ExecutionErrorTemplate_Missing(ExecutionErrorTemplate, ABC):
         return 404
 
 
+class ExecutionErrorTemplate_Unavailable(ExecutionErrorTemplate, ABC):
+
+    @classmethod
+    def http_status_code(cls) -> int:
+        return 503
+
+
 #
 
 
@@ -63,6 +70,28 @@ class ExecutionError_NoPathFound(ExecutionErrorTemplate_Missing):
         return 101
 
 
+class ExecutionError_BudgetExceeded(ExecutionErrorTemplate_Unavailable):
+
+    @classmethod
+    def description(cls) -> str:
+        return "BUDGET EXCEEDED"
+
+    @classmethod
+    def code(cls) -> int:
+        return 102
+
+
+class ExecutionError_ServerBusy(ExecutionErrorTemplate_Unavailable):
+
+    @classmethod
+    def description(cls) -> str:
+        return "SERVER BUSY"
+
+    @classmethod
+    def code(cls) -> int:
+        return 103
+
+
 class ExecutionError_Unknown(ExecutionErrorTemplate_Internal):
     @classmethod
     def description(cls) -> str:
@@ -89,3 +118,5 @@ class ErrorType(Enum):
     UNKNOWN_ERROR = ExecutionError_Unknown
     BAD_REQUEST = ExecutionError_BadRequest
     NO_PATH_FOUND = ExecutionError_NoPathFound
+    BUDGET_EXCEEDED = ExecutionError_BudgetExceeded
+    SERVER_BUSY = ExecutionError_ServerBusy
@@ -22,6 +22,10 @@ class ExecutionError(Exception, JSONable):
     def __repr__(self) -> str:
         return str(self)
 
+    def __reduce__(self):
+        # Exceptions are pickled from their args, which aren't set here, so that they can cross process boundaries
+        return ExecutionError, (self.type, self.message, self.details)
+
     @property
     def http_status_code(self) -> int:
         return self.type.value.http_status_code()
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from PathFinding import PathFindingState, StateTransition, Solution, Algorithm, ComparableStateTransition
+from PathFinding import PathFindingState, StateTransition, Solution, Algorithm, ComparableStateTransition, \
+    StateSymmetry, SearchBudget
 from Lambda import LambdaArguments
 from Errors import ExecutionError, ErrorType
 from Interfaces import Comparable, ComparableType
@@ -18,6 +19,8 @@ T = TypeVar('T')
 
 class GameState(PathFindingState, ABC, Generic[TState, TTransition]):
 
+    __slots__ = ()
+
     @classmethod
     @abstractmethod
     def parse(cls, s: str) -> TState: ...
@@ -25,13 +28,25 @@ class GameState(PathFindingState, ABC, Generic[TState, TTransition]):
     @abstractmethod
     def render(self) -> str: ...
 
+    def canonical(self) -> Tuple[TState, Optional[StateSymmetry]]:
+        """
+        Maps this state onto the representative of all states equivalent to it under the game's symmetries, so
+        that equivalent states can share results.
+
+        :return: The representative state, and the symmetry that maps this state onto it (None if it is this state).
+        """
+        return self, None
+
 
 class GameTransition(StateTransition, ABC, Generic[T]):
-    ...
+
+    __slots__ = ()
 
 
 class ComparableGameTransition(ComparableStateTransition, ABC, Generic[ComparableType]):
 
+    __slots__ = ()
+
     @property
     def value(self) -> ComparableType:
         return self._value
@@ -62,15 +77,42 @@ class Game(ABC, Generic[TGameState, TGameTransition]):
     @abstractmethod
     def supported_algorithms(cls) -> List[Type[Algorithm]]: ...
 
-    def solve(self) -> Solution:
+    def solve(self, budget: Optional[SearchBudget] = None) -> Solution:
         print(f"Running algorithm '{self.algorithm.name()}' "
               f"(aka. {self.algorithm.__class__.__name__}) with args "
               f"{json.dumps(self.algorithm.kwargs)}...")
-        return self.algorithm.solve(self.initial_state)
+        return self.algorithm.solve(self.initial_state, budget)
+
+    def fallback_algorithm(self) -> Optional[Algorithm]:
+        """
+        Gets an algorithm that is guaranteed to finish quickly, to use when the requested algorithm runs out of
+        budget.
+
+        :return: The algorithm, or None if the game has none.
+        """
+        return None
+
+    def precomputed_solution(self) -> Optional[Solution]:
+        """
+        Gets a solution for the initial state without running the algorithm, if one is readily available.
+
+        :return: The solution, or None if the algorithm must be run.
+        """
+        return None
 
     def conditions(self) -> Conditions:
         return Conditions(self.algorithm.name(), self.algorithm.kwargs, self.initial_state)
 
+    def canonical_conditions(self) -> Tuple[Conditions, Optional[StateSymmetry]]:
+        """
+        Gets the conditions of this game with the initial state replaced by its canonical form (see
+        GameState.canonical()), which are shared by every game equivalent to this one.
+
+        :return: The canonical conditions, and the symmetry that maps the initial state onto the canonical one.
+        """
+        state, symmetry = self.initial_state.canonical()
+        return Conditions(self.algorithm.name(), self.algorithm.kwargs, state), symmetry
+
     @classmethod
     def _identify_algorithm(cls, algo_name: str) -> Type[Algorithm]:
         for algo_type in cls.supported_algorithms():
@@ -96,9 +138,15 @@ class Conditions:
 
     def __init__(self, algorithm: str, args: dict, state: GameState):
         self.algorithm = algorithm
-        self.args = tuple(sorted(args.items(), key=lambda t: t[0]))
+        self.args = tuple(sorted(((k, _freeze(v)) for k, v in args.items()), key=lambda t: t[0]))
         self.state = state
 
+    def get_arg(self, key: str, default=None):
+        return next((v for k, v in self.args if k == key), default)
+
+    def without_arg(self, key: str) -> Conditions:
+        return Conditions(self.algorithm, {k: v for k, v in self.args if k != key}, self.state)
+
     @property
     def signature(self) -> Tuple:
         return self.algorithm, self.args, self.state
@@ -108,3 +156,12 @@ class Conditions:
 
     def __hash__(self) -> int:
         return hash(self.signature)
+
+
+def _freeze(value):
+    # Algorithm arguments may contain lists and objects (eg. the members of a portfolio), which must be hashable
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
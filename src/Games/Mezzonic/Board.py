@@ -2,42 +2,63 @@ from __future__ import annotations
 
 from Games.Mezzonic.Square import Square
 from Games.Mezzonic.Formation import Formation, PointFormation, CrossFormation
+from Games.Mezzonic.Symmetry import BoardSymmetry
 from Games.Game import GameState, GameTransition, ComparableGameTransition
+from PathFinding import Successor
+from Utilty import BitUtils
 
 from typing import List, Collection, Union, Tuple, Dict, Iterable, Type, Optional
+import base64
 
 
 class Board(GameState):
+    """
+    The state of a Mezzonic board.  The squares are packed into a single integer mask, where bit
+    (row * width + col) is set if the square at (row, col) is ON.  This makes applying a formation a single XOR
+    against a precomputed formation mask (see Formation.get_masks()), and makes scoring, comparison and hashing
+    operate on a single integer.
+    """
 
-    def __init__(self, size: Tuple[int, int], values: Dict[Tuple[int, int], Square.Value]):
+    __slots__ = ("_height", "_width", "_mask")
+
+    # The (bit index, transition) of every move, in the order of coordinates(), per board size
+    _move_cache: Dict[Tuple[int, int], Tuple[Tuple[int, BoardTransition], ...]] = dict()
+
+    def __init__(self, size: Tuple[int, int], values: Optional[Dict[Tuple[int, int], Square.Value]] = None,
+                 mask: int = 0):
         self._height, self._width = size
-        self._board: Tuple[Tuple[Square]] = \
-            tuple(tuple(Square(values[(row, col)] if (row, col) in values else Square.Value.OFF)
-                        for col in range(self._width)) for row in range(self._height))
-        self._hash_cache: Optional[int] = None
+        if values:
+            for (row, col), value in values.items():
+                if value == Square.Value.ON and 0 <= row < self._height and 0 <= col < self._width:
+                    mask |= 1 << (row * self._width + col)
+        self._mask = mask
+
+    @classmethod
+    def from_mask(cls, size: Tuple[int, int], mask: int) -> Board:
+        return Board(size, mask=mask)
 
     def __eq__(self, other: Board) -> bool:
-        return isinstance(other, Board) and \
-               all(all(self._board[row][col] == other._board[row][col]
-                       for col in range(self.width))
-                   for row in range(self.height))
+        return isinstance(other, Board) and self._mask == other._mask and \
+               self._width == other._width and self._height == other._height
 
     def __hash__(self) -> int:
-        if self._hash_cache is None:
-            self._hash_cache = hash(self._board)
-        return self._hash_cache
+        return hash((self._mask, self._height, self._width))
 
     def __str__(self) -> str:
-        return "|".join("".join("0" if s.value == Square.Value.OFF else "1"
-                                for s in row)
-                        for row in self._board)
+        return "|".join("".join("1" if self.is_on(row, col) else "0"
+                                for col in range(self.width))
+                        for row in range(self.height))
 
     def __repr__(self) -> str:
         return str(self)
 
     @property
     def score(self) -> int:
-        return sum(1 for row, col in self.coordinates() if self._board[row][col].value == Square.Value.ON)
+        return BitUtils.popcount(self._mask)
+
+    @property
+    def mask(self) -> int:
+        return self._mask
 
     @property
     def width(self) -> int:
@@ -47,74 +68,177 @@ class Board(GameState):
     def height(self) -> int:
         return self._height
 
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self._height, self._width
+
+    def is_on(self, row: int, col: int) -> bool:
+        return (self._mask >> (row * self._width + col)) & 1 == 1
+
     def get_square(self, row: int, col: int) -> Optional[Square]:
-        return self._board[row][col] if 0 <= row < self.height and 0 <= col < self.width else None
+        if not (0 <= row < self.height and 0 <= col < self.width):
+            return None
+        return Square(Square.Value.ON if self.is_on(row, col) else Square.Value.OFF)
 
     def coordinates(self) -> Iterable[Tuple[int, int]]:
         yield from ((row, col) for col in range(self.width) for row in range(self.height))
 
     def interesting_coordinates(self) -> Iterable[Tuple[int, int]]:
+        masks = CrossFormation.get_masks(self.size)
         yield from ((row, col) for row, col in self.coordinates()
-                    if any(self._board[r][c].value == Square.Value.ON
-                           for r, c in CrossFormation.get_positions((row, col))
-                           if 0 <= r < self.height and 0 <= c < self.width))
+                    if masks[row * self._width + col] & self._mask)
         # yield from self.coordinates()
 
     def render(self) -> str:
         return "\n".join(
-            " ".join(str(self._board[row][col]) for col in range(self.width)) for row in range(self.height))
-
-    def _to_value_map(self) -> Dict[Tuple[int, int], Square.Value]:
-        return {(row, col): self._board[row][col].value for row, col in self.coordinates()}
+            " ".join("#" if self.is_on(row, col) else "-" for col in range(self.width)) for row in range(self.height))
 
     def set_values(self, pos: Tuple[int, int], value: Square.Value) -> Board:
         row, col = pos
-        value_map = self._to_value_map()
-        if 0 <= row < self.height and 0 <= col < self.width:
-            value_map[(row, col)] = value
-        return Board((self.height, self.width), value_map)
+        if not (0 <= row < self.height and 0 <= col < self.width):
+            return Board(self.size, mask=self._mask)
+        bit = 1 << (row * self._width + col)
+        return Board(self.size, mask=(self._mask | bit) if value == Square.Value.ON else (self._mask & ~bit))
 
     def flip_values(self, *pos: Tuple[int, int]) -> Board:
-        value_map = self._to_value_map()
-        for p in pos:
-            row, col = p
-            if 0 <= row < self.height and 0 <= col < self.width:
-                value_map[(row, col)] = self._board[row][col].flipped()
-        return Board((self.height, self.width), value_map)
+        return Board(self.size, mask=self._mask ^ self._positions_mask(pos))
 
     def flip_formation(self, pos: Tuple[int, int], formation: Type[Formation]) -> Board:
-        return self.flip_values(*formation.get_positions(pos))
+        return Board(self.size, mask=self._mask ^ formation.get_mask(pos, self.size))
+
+    def flip_mask(self, mask: int) -> Board:
+        return Board(self.size, mask=self._mask ^ mask)
 
     def get_adjacent_states(self) -> Iterable[Tuple[Board, BoardTransition]]:
-        yield from ((self.transition(transition), transition)
-                    for transition in (BoardTransition(pos) for pos in self.coordinates()))
+        masks = CrossFormation.get_masks(self.size)
+        yield from ((Board(self.size, mask=self._mask ^ masks[index]), transition)
+                    for index, transition in self._moves())
+
+    def canonical(self) -> Tuple[Board, Optional[BoardSymmetry]]:
+        mask, symmetry = BoardSymmetry.canonical(self.size, self._mask)
+        if symmetry.is_identity:
+            return self, None
+        return Board(self.size, mask=mask), symmetry
+
+    def state_key(self) -> int:
+        # Boards of a single search all have the same size
+        return self._mask
+
+    def state_from_key(self, key: int) -> Board:
+        return Board(self.size, mask=key)
+
+    def transitions(self) -> Iterable[BoardTransition]:
+        yield from (transition for _, transition in self._moves())
+
+    def key_after(self, transition: BoardTransition) -> int:
+        return self._mask ^ CrossFormation.get_mask(transition.value, self.size)
+
+    def score_after(self, transition: BoardTransition) -> int:
+        return BitUtils.popcount(self._mask ^ CrossFormation.get_mask(transition.value, self.size))
+
+    def score_deltas(self) -> Iterable[Tuple[BoardTransition, int]]:
+        # Each move adds the squares of its formation that are OFF, and removes those that are ON
+        masks = CrossFormation.get_masks(self.size)
+        score = self.score
+        for index, transition in self._moves():
+            formation_mask = masks[index]
+            yield transition, \
+                score + BitUtils.popcount(formation_mask) - 2 * BitUtils.popcount(formation_mask & self._mask)
+
+    def get_successors(self) -> Iterable[Successor]:
+        # A successor's mask is both its key and, counted, its score, so no boards are built to find either
+        masks = CrossFormation.get_masks(self.size)
+        for index, transition in self._moves():
+            mask = self._mask ^ masks[index]
+            yield Successor(self, transition, BitUtils.popcount(mask), mask)
 
     def is_goal(self) -> bool:
-        return self.score == 0
+        return self._mask == 0
 
     def transition(self, transition: BoardTransition) -> Board:
         return self.flip_formation(transition.value, CrossFormation)
 
+    def positions(self, mask: int) -> Iterable[Tuple[int, int]]:
+        """
+        Converts a mask over the squares of this board into the (row, col) positions of its set bits, in row-major
+        order.
+        """
+        yield from (divmod(i, self._width) for i in BitUtils.iterate_bits(mask))
+
+    def _moves(self) -> Tuple[Tuple[int, BoardTransition], ...]:
+        moves = Board._move_cache.get(self.size)
+        if moves is None:
+            moves = Board._move_cache[self.size] = tuple((row * self._width + col, BoardTransition((row, col)))
+                                                         for row, col in self.coordinates())
+        return moves
+
+    def _positions_mask(self, positions: Iterable[Tuple[int, int]]) -> int:
+        mask = 0
+        for row, col in positions:
+            if 0 <= row < self.height and 0 <= col < self.width:
+                mask |= 1 << (row * self._width + col)
+        return mask
+
     @classmethod
     def parse(cls, s: str) -> Board:
         rows = s.split("|")
         if len(rows) == 0 or any(len(r) != len(rows[0]) for r in rows[1:]):
             raise Exception("Invalid board definition, could not parse.")
-        return Board((len(rows), len(rows[0])), {
-            (r, c): Square.Value(int(rows[r][c]))
-            for r in range(len(rows)) for c in range(len(rows[0]))
-        })
+        width = len(rows[0])
+        mask = 0
+        for r, row in enumerate(rows):
+            for c, ch in enumerate(row):
+                if Square.Value(int(ch)) == Square.Value.ON:
+                    mask |= 1 << (r * width + c)
+        return Board((len(rows), width), mask=mask)
 
     def to_json(self) -> dict:
         return {
             "size": {"width": self.width, "height": self.height},
-            "squares": [[self._board[r][c].value.value
+            "squares": [[(self._mask >> (r * self._width + c)) & 1
                          for c in range(self.width)]
                         for r in range(self.height)]
         }
 
+    def to_compact_json(self, packed: bool = False) -> dict:
+        # Either the same string that parse() reads, or the mask as little-endian base64
+        return {
+            "size": {"width": self.width, "height": self.height},
+            **({"mask": self._encode_mask(self._mask)} if packed else {"board": str(self)})
+        }
+
+    def pack_transitions(self, transitions: Iterable[BoardTransition]) -> str:
+        # Moves can be made in any order, and pressing a square twice undoes it, so only which squares are
+        # pressed an odd number of times matters
+        pressed = 0
+        for transition in transitions:
+            row, col = transition.value
+            pressed ^= 1 << (row * self._width + col)
+        return self._encode_mask(pressed)
+
+    def _encode_mask(self, mask: int) -> str:
+        return base64.b64encode(mask.to_bytes((self._height * self._width + 7) // 8, "little")).decode("ascii")
+
 
 class BoardTransition(ComparableGameTransition[Tuple[int, int]]):
+    """
+    A press of the square at (row, col).  Transitions are immutable, so there is only ever one BoardTransition per
+    position, shared by boards of every size.
+    """
+
+    __slots__ = ()
+
+    _instances: Dict[Tuple[int, int], BoardTransition] = dict()
+
+    def __new__(cls, value: Tuple[int, int]) -> BoardTransition:
+        instance = cls._instances.get(value)
+        if instance is None:
+            instance = cls._instances[value] = super(BoardTransition, cls).__new__(cls)
+            instance._value = value
+        return instance
+
+    def __getnewargs__(self) -> Tuple[Tuple[int, int]]:
+        return self._value,
 
     @property
     def value(self) -> Tuple[int, int]:
@@ -122,3 +246,6 @@ class BoardTransition(ComparableGameTransition[Tuple[int, int]]):
 
     def to_json(self) -> dict:
         return {"row": self.value[0], "col": self.value[1]}
+
+    def to_compact_json(self) -> List[int]:
+        return list(self.value)
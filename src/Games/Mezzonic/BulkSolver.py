@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from Games.Mezzonic.Board import Board
+from Games.Mezzonic.Formation import Formation, CrossFormation
+from Games.Mezzonic.LinearSystem import LinearSystem
+
+from typing import Tuple, Type, Iterable, List, Sequence
+
+import numpy as np
+
+_BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+class BulkSolver:
+    """
+    Solves large arrays of Mezzonic boards of a single size at once, for offline analysis and for pre-warming caches.
+    Boards are given as a NumPy array of masks (see Board.mask), and the GF(2) solve of LinearSystem is applied to the
+    whole array with vectorized bitwise operations.
+
+    Since both the solution and the solvability check are linear in the board, each is computed as an XOR of
+    per-byte lookup tables:  one table gather per byte of the board mask, rather than one operation per square.
+
+    This requires NumPy, which is not part of the deployed Lambda package.  Nothing on the request path imports
+    this module.
+    """
+
+    def __init__(self, size: Tuple[int, int] = (5, 5),
+                 formation: Type[Formation] = CrossFormation,
+                 minimize: bool = True):
+        self.size = size
+        self.system = LinearSystem.get(size, formation)
+        bits = self.system.cell_count
+        if bits > 64:
+            raise ValueError(f"Cannot bulk solve boards of {bits} squares.")
+
+        self.dtype = np.uint32 if bits <= 32 else np.uint64
+        self._byte_count = (bits + 7) // 8
+        self._solution_tables = self._byte_tables(self.system.particular_solutions)
+        self._syndrome_tables = self._byte_tables(tuple(
+            sum(1 << i for i, check in enumerate(self.system.consistency_checks) if (check >> k) & 1)
+            for k in range(bits)))
+
+        self._null_space: List[int] = [0]
+        if minimize and self.system.nullity <= LinearSystem.MAX_NULLITY_SEARCH:
+            for vector in self.system.null_basis:
+                self._null_space += [v ^ vector for v in self._null_space]
+
+    def _byte_tables(self, unit_values: Sequence[int]) -> List[np.ndarray]:
+        # Table j maps each value of byte j of a board to the XOR of the values of its set bits
+        tables = []
+        for j in range(self._byte_count):
+            table = [0] * 256
+            for value in range(1, 256):
+                k = (value & -value).bit_length() - 1
+                bit = 8 * j + k
+                table[value] = table[value & (value - 1)] ^ (unit_values[bit] if bit < len(unit_values) else 0)
+            tables.append(np.array(table, dtype=np.uint64).astype(self.dtype))
+        return tables
+
+    def _apply_tables(self, boards: np.ndarray, tables: List[np.ndarray]) -> np.ndarray:
+        result = np.zeros(boards.shape, dtype=self.dtype)
+        for j, table in enumerate(tables):
+            result ^= table[(boards >> (8 * j)) & 0xFF]
+        return result
+
+    def popcount(self, values: np.ndarray) -> np.ndarray:
+        counts = np.zeros(values.shape, dtype=np.uint8)
+        for j in range(self._byte_count):
+            counts += _BYTE_POPCOUNT[(values >> (8 * j)) & 0xFF]
+        return counts
+
+    def solve(self, boards: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Solves every board in the given array.
+
+        :param boards: An array of board masks, of an unsigned integer type.
+        :return: A tuple of two arrays of the same shape as the given boards: the mask of squares to press for each
+        board (zero where unsolvable), and whether each board is solvable.
+        """
+        boards = np.asarray(boards)
+        if boards.dtype.kind != "u":
+            raise TypeError(f"Boards must be an array of unsigned integers, not {boards.dtype}.")
+        boards = boards.astype(self.dtype, copy=False)
+
+        solvable = self._apply_tables(boards, self._syndrome_tables) == 0
+        moves = self._apply_tables(boards, self._solution_tables)
+
+        if len(self._null_space) > 1:
+            best_counts = self.popcount(moves)
+            particular = moves
+            for vector in self._null_space[1:]:
+                candidate = particular ^ self.dtype(vector)
+                counts = self.popcount(candidate)
+                better = counts < best_counts
+                moves = np.where(better, candidate, moves)
+                best_counts = np.where(better, counts, best_counts)
+
+        moves[~solvable] = 0
+        return moves, solvable
+
+    def pack(self, boards: Iterable[Board]) -> np.ndarray:
+        return np.fromiter((b.mask for b in boards), dtype=self.dtype)
+
+    def unpack(self, masks: np.ndarray) -> List[Board]:
+        return [Board.from_mask(self.size, int(m)) for m in masks]
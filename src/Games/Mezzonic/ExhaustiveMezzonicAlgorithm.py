@@ -1,12 +1,17 @@
 from Interfaces import ComparableType
-from PathFinding import Algorithm, PathFindingState, StateTransition, Solution
+from PathFinding import Algorithm, PathFindingState, StateTransition, Solution, SearchStats, SearchBudget
 from Games.Mezzonic.Board import BoardTransition, Board
 from Games.Mezzonic.Formation import CrossFormation
 from Games.Mezzonic.Square import Square
+from Games.Mezzonic.SolutionTable import SolutionTable
+from Games.Mezzonic.Symmetry import BoardSymmetry
+from Games.Mezzonic.LinearSystem import LinearSystem
 from Errors import ExecutionError, ErrorType
-from Utilty import IterableUtils
+from Utilty import BitUtils, ProcessUtils
+from Utilty.Frontier import Frontier, BucketFrontier
 
-from typing import Set, Tuple, Iterable, List, Dict, Optional, Collection, Type
+from typing import Set, Tuple, Iterable, List, Dict, Optional, Collection, Type, FrozenSet, Any
+from multiprocessing.connection import Connection
 from abc import ABC, abstractmethod
 
 
@@ -28,38 +33,72 @@ class ExhaustiveMezzonicAlgorithm(Algorithm):
     transitions.  If no solution is found, it moves back to level 1 of this tree and does the same thing again.
     Since the algorithm prevents inspecting the same collection of transitions more than once (and thus excludes them
     from being ranked more than once), eventually this will explore all combinations.
+    - iterative_deepening:  A depth-first search over combinations in a fixed order, repeated with one more move
+    allowed each time.  Uses memory proportional only to the number of moves, and finds the combination with
+    the fewest moves.
+    - meet_in_the_middle:  Splits the squares into two halves, finds the effect of every combination of moves within
+    each half, and joins the two on the board.  This is guaranteed to find the combination with the fewest moves,
+    and is far faster than the other modes for solutions with many moves, but is only supported for boards of
+    up to 36 squares.
+
+    The mixed, depth_first and iterative_deepening modes can also split their search across several worker
+    processes, given by 'workers' (see _ParallelSearchMode.solve_parallel()).
+
+    If a precomputed SolutionTable exists for the board's size, it is consulted instead of searching, regardless
+    of mode.  Otherwise, every mode stops once the search budget runs out, reporting the combination of moves found
+    that left the fewest squares ON.
     """
 
-    def __init__(self, limit: int = 0, mode: str = "breadth_first", **kwargs):
-        super(ExhaustiveMezzonicAlgorithm, self).__init__(limit=limit, mode=mode, **kwargs)
+    def __init__(self, limit: int = 0, mode: str = "breadth_first", workers: int = 1, **kwargs):
+        super(ExhaustiveMezzonicAlgorithm, self).__init__(limit=limit, mode=mode,
+                                                          **({"workers": workers} if workers != 1 else {}), **kwargs)
         self.limit = limit
         if mode not in MODES:
             raise ExecutionError(ErrorType.BAD_REQUEST, f"Invalid mode '{mode}'.",
                                  {"given": {"mode": mode}, "allowed": list(MODES.keys())})
-        self.mode = MODES[mode](self.limit)
+        if workers < 1 or (workers > 1 and not issubclass(MODES[mode], _ParallelSearchMode)):
+            raise ExecutionError(ErrorType.BAD_REQUEST, f"Invalid number of workers for mode '{mode}'.",
+                                 {"given": {"workers": workers},
+                                  "parallel_modes": [m for m, t in MODES.items()
+                                                     if issubclass(t, _ParallelSearchMode)]})
+        if workers > ProcessUtils.MAX_WORKERS:
+            raise ExecutionError(ErrorType.BAD_REQUEST, "Too many workers.",
+                                 {"given": {"workers": workers}, "max_workers": ProcessUtils.MAX_WORKERS})
+        self.mode = MODES[mode](self.limit, workers)
 
     @classmethod
     def name(cls) -> str:
         return "exhaustive"
 
-    def solve(self, initial_state: Board) -> Solution:
-
-        solution = self.mode.solve(initial_state)
+    @property
+    def complete(self) -> bool:
+        return self.mode.COMPLETE
+
+    def solve(self, initial_state: Board, budget: Optional[SearchBudget] = None) -> Solution:
+        self.mode.stats = self.stats
+
+        with self.stats.phase("table"):
+            table = SolutionTable.get(initial_state.size)
+            if table is not None:
+                moves = table.lookup(initial_state)
+                solution = tuple(initial_state.positions(moves)) if moves is not None else None
+                if solution is not None and 0 < self.limit < len(solution):
+                    solution = None
+
+        if table is None:
+            with self.stats.phase("search"):
+                budget = budget if budget is not None else SearchBudget()
+                if isinstance(self.mode, _ParallelSearchMode) and self.mode.workers > 1:
+                    solution = self.mode.solve_parallel(initial_state, budget)
+                else:
+                    solution = self.mode.solve(initial_state, budget)
 
         if solution is None:
             if self.limit > 0:
                 raise ExecutionError(ErrorType.NO_PATH_FOUND, f"Unable to find path of length <= {self.limit}.")
             raise ExecutionError(ErrorType.NO_PATH_FOUND, f"No path exists.")
 
-        def _follow_path() -> Iterable[Tuple[Board, Optional[BoardTransition]]]:
-            current = initial_state
-            yield current, None
-            for move in solution:
-                current = current.flip_formation(move, formation=CrossFormation)
-                yield current, BoardTransition(move)
-
-        return Solution(_follow_path())
-
+        return Solution.follow(initial_state, (BoardTransition(move) for move in solution))
 
 #
 
@@ -69,8 +108,18 @@ class ExhaustiveMezzonicAlgorithm(Algorithm):
 
 class _SearchMode(ABC):
 
-    def __init__(self, limit: int):
+    # Whether the mode searches every combination of moves up to the size of the one it finds, so that it only
+    # reports no solution when there is none
+    COMPLETE = False
+
+    def __init__(self, limit: int, workers: int = 1):
         self.limit = limit
+        self.workers = workers
+        self.stats = SearchStats()
+        self._width = 0
+        self._symmetries: Tuple[BoardSymmetry, ...] = tuple()
+        # Moves that may not be made, since they are fixed as not pressed in the subtree being searched
+        self._excluded: FrozenSet[Tuple[int, int]] = frozenset()
 
     @classmethod
     @abstractmethod
@@ -78,88 +127,287 @@ class _SearchMode(ABC):
         ...
 
     @abstractmethod
-    def solve(self, board: Board) -> Optional[Collection[Tuple[int, int]]]:
+    def solve(self, board: Board, budget: SearchBudget) -> Optional[Collection[Tuple[int, int]]]:
+        """
+        :return: The moves that solve the board, or None if there are none (within the limit).
+        :raises ExecutionError: If the budget runs out before the search ends.
+        """
         ...
 
+    @staticmethod
+    def _out_of_budget(board: Board, budget: SearchBudget, best: Tuple[int, Collection[Tuple[int, int]]]) \
+            -> ExecutionError:
+        """
+        Creates the error to raise when the budget runs out, including the best combination of moves found so far,
+        given as its score and its moves.
+        """
+        score, moves = best
+        return budget.error(Solution.follow(board, (BoardTransition(move) for move in sorted(moves))), score)
+
+    def _prepare_symmetries(self, board: Board):
+        # If the board maps onto itself under some symmetry, then so do the combinations of moves that solve it,
+        # and a combination and its mapped equivalent lead to the same outcome
+        self._width = board.width
+        self._symmetries = BoardSymmetry.stabilizer(board.size, board.mask)[1:]
+
+    def _combination_key(self, history: Collection[Tuple[int, int]]) -> int:
+        """
+        Gets a key identifying the given combination of moves, which is shared by all combinations that are
+        equivalent to it under the symmetries of the board being solved (see _prepare_symmetries()).
+        """
+        mask = 0
+        for row, col in history:
+            mask |= 1 << (row * self._width + col)
+        key = mask
+        for symmetry in self._symmetries:
+            key = min(key, symmetry.apply_mask(mask))
+        return key
+
     def _generate_open_list(self, board: Board, history: Collection[Tuple[int, int]]):
         open_list: List[Tuple[Tuple[int, int], int]] = []
-        for row, col in board.coordinates():
-            if (row, col) in history:
+        masks = CrossFormation.get_masks(board.size)
+        for transition, score in board.score_deltas():
+            row, col = transition.value
+            # Moves that don't turn off any squares are never useful
+            if (row, col) in history or not masks[row * board.width + col] & board.mask or \
+                    (self._excluded and (row, col) in self._excluded):
                 continue
-            adjacent_squares = [s for s in (board.get_square(r, c)
-                                            for r, c in CrossFormation.get_positions((row, col)))
-                                if s is not None]
-            adjacent_count = sum(1 for s in adjacent_squares if s.value == Square.Value.ON)
-            if adjacent_count == 0:
-                continue
-            score = board.score + len(adjacent_squares) - (2 * adjacent_count)
-            i = IterableUtils.binary_search_by(open_list, score, key=lambda o: o[1])
-            if i < 0:
-                i = ~i
-            open_list.insert(i, ((row, col), score))
+            open_list.append(((row, col), score))
+        # Moves with equal scores are ranked with the last found first
+        open_list.reverse()
+        open_list.sort(key=lambda o: o[1])
         return open_list
 
 
+class _ParallelSearchMode(_SearchMode, ABC):
+    """
+    A mode that can split its search across worker processes (see solve_parallel()).  Searching on its own is the
+    same as searching the one subtree that fixes no squares.
+    """
+
+    # The number of subtrees to split the search into for each worker, so that uneven subtrees even out
+    SUBTREES_PER_WORKER = 4
+    # The size of solution shared by a worker that hasn't found one
+    NOT_FOUND = 2 ** 31 - 1
+
+    def solve(self, board: Board, budget: SearchBudget) -> Optional[Collection[Tuple[int, int]]]:
+        return self._solve_subtrees(board, budget, 0, [0])
+
+    def solve_parallel(self, board: Board, budget: SearchBudget) -> Optional[Collection[Tuple[int, int]]]:
+        """
+        Splits the combinations of moves into disjoint subtrees, by fixing which of the first k squares are pressed
+        and which are not, and deals the subtrees out in turn to worker processes (see _solve_subtrees()).
+
+        When a worker finds a solution, it shares its size with every other worker, and they each stop as soon as
+        they can no longer find a smaller one (see _stop_bound()), which they check along with their budgets.
+        Each worker has its own copy of the budget, so a node limit applies to each worker separately.
+
+        :return: The smallest solution found by any worker, or None if none of them found one.
+        """
+        squares = board.width * board.height
+        fixed = min(squares, (self.SUBTREES_PER_WORKER * self.workers - 1).bit_length())
+        context = ProcessUtils.fork_context()
+        found = context.RawArray('i', [self.NOT_FOUND] * self.workers)
+
+        workers: List[Tuple[Connection, Any]] = []
+        outcomes: List[tuple] = []
+        try:
+            for index in range(self.workers):
+                receiver, sender = context.Pipe(duplex=False)
+                process = context.Process(target=self._run_worker, daemon=True,
+                                          args=(board, budget, fixed, range(index, 1 << fixed, self.workers),
+                                                found, index, sender))
+                process.start()
+                sender.close()
+                workers.append((receiver, process))
+
+            for receiver, process in workers:
+                try:
+                    outcome, stats = receiver.recv()
+                    self.stats.merge(stats)
+                except EOFError:
+                    outcome = ("error", ErrorType.INTERNAL.name, "Search worker exited unexpectedly.", None)
+                outcomes.append(outcome)
+                process.join()
+        finally:
+            for receiver, process in workers:
+                if process.is_alive():
+                    process.kill()
+                    process.join()
+                receiver.close()
+
+        solutions = [outcome[1] for outcome in outcomes if outcome[0] == "ok"]
+        if solutions:
+            return min(solutions, key=len)
+
+        errors = [ExecutionError(ErrorType[t], message, details) for status, t, message, details in outcomes
+                  if status == "error"]
+        if errors:
+            # Report the partial path that got closest to the goal, if any worker ran out of budget
+            partial = [e for e in errors if e.type == ErrorType.BUDGET_EXCEEDED and "partial" in e.details]
+            raise min(partial, key=lambda e: e.details["partial"]["score"]) if partial else errors[0]
+        return None
+
+    def _run_worker(self, board: Board, budget: SearchBudget, fixed: int, prefixes: Iterable[int],
+                    found: Any, index: int, connection: Connection):
+        budget.cancel_when(lambda: min(found) <= self._stop_bound())
+        try:
+            solution = self._solve_subtrees(board, budget, fixed, prefixes)
+            if solution is not None:
+                found[index] = len(solution)
+                outcome = ("ok", tuple(solution))
+            else:
+                outcome = ("none",)
+        except Exception as e:
+            if budget.exceeded == SearchBudget.CANCELLED:
+                outcome = ("none",)
+            else:
+                error = e if isinstance(e, ExecutionError) else ExecutionError.wrap(e)
+                outcome = ("error", error.type.name, error.message, error.details)
+        try:
+            connection.send((outcome, self.stats.to_json()))
+        finally:
+            connection.close()
+
+    @abstractmethod
+    def _solve_subtrees(self, board: Board, budget: SearchBudget, fixed: int, prefixes: Iterable[int]) \
+            -> Optional[Collection[Tuple[int, int]]]:
+        """
+        Searches the subtrees of combinations of moves in which the squares at the first 'fixed' indexes are pressed
+        exactly when their bit is set in the subtree's prefix.
+
+        :return: The first solution found, or None.
+        """
+        ...
+
+    def _stop_bound(self) -> int:
+        """
+        Gets the largest solution size which, once found by another worker, means this worker can stop.  By
+        default, any solution found stops every worker.
+        """
+        return self.NOT_FOUND - 1
+
+
 class _BreadthFirstMode(_SearchMode):
 
+    COMPLETE = True
+
     @classmethod
     def name(cls) -> str:
         return "breadth_first"
 
-    def solve(self, board: Board) -> Optional[Collection[Tuple[int, int]]]:
-        queue: List[Tuple[Board, Tuple[Tuple[int, int], ...], int]] = [(board, tuple(), 0)]
-        visited: Set[Tuple[Tuple[int, int], ...]] = set()
+    def solve(self, board: Board, budget: SearchBudget) -> Optional[Collection[Tuple[int, int]]]:
+        # Only successors are checked for the goal below
+        if board.mask == 0:
+            return tuple()
 
-        while len(queue) > 0:
-            current, history, score = queue.pop(0)
+        stats = self.stats
+        counting = stats.enabled
+        queue = self._create_queue()
+        queue.push((board, tuple()), 0)
+        visited: Set[int] = set()
+        best: Tuple[int, Collection[Tuple[int, int]]] = (board.score, tuple())
+        self._prepare_symmetries(board)
 
-            if len(history) > self.limit:
-                continue
+        try:
+            while queue:
+                current, history = queue.pop()
 
-            open_list = self._generate_open_list(current, history)
+                if len(history) >= self.limit > 0:
+                    continue
 
-            for move, score in open_list:
-                new_history = tuple(sorted(history + (move,)))
-                if score == 0:
-                    return new_history
+                if budget.spend():
+                    raise self._out_of_budget(board, budget, best)
 
-                if new_history in visited:
-                    continue
+                open_list = self._generate_open_list(current, history)
+                if counting:
+                    stats.expanded += 1
+                    stats.generated += len(open_list)
 
-                self._add_to_queue(queue, board.flip_formation(move, formation=CrossFormation), new_history, score)
+                for move, score in open_list:
+                    new_history = tuple(sorted(history + (move,)))
+                    if score == 0:
+                        return new_history
 
-    def _add_to_queue(self, queue: List[Tuple[Board, Tuple[Tuple[int, int], ...], int]],
-                      board: Board, history: Tuple[Tuple[int, int], ...], score: int):
-        queue.append((board, history, score))
+                    key = self._combination_key(new_history)
+                    if key in visited:
+                        if counting:
+                            stats.skipped += 1
+                        continue
+                    visited.add(key)
+                    if score < best[0]:
+                        best = (score, new_history)
+
+                    queue.push((current.flip_formation(move, formation=CrossFormation), new_history),
+                               self._get_priority(new_history, score))
+
+                if counting:
+                    stats.observe_frontier(len(queue))
+        finally:
+            stats.peak_visited = len(visited)
+
+    def _create_queue(self) -> Frontier[Tuple[Board, Tuple[Tuple[int, int], ...]], int]:
+        return BucketFrontier()
+
+    def _get_priority(self, history: Tuple[Tuple[int, int], ...], score: int) -> int:
+        return len(history)
 
 
 class _SortedBreadthFirstMode(_BreadthFirstMode):
 
+    # Finds a solution, but not always the smallest
+    COMPLETE = False
+
     @classmethod
     def name(cls) -> str:
         return "sorted_breadth_first"
 
-    def _add_to_queue(self, queue: List[Tuple[Board, Tuple[Tuple[int, int], ...], int]], board: Board,
-                      history: Tuple[Tuple[int, int], ...], score: int):
-        total_score = score + len(history)
-        i = IterableUtils.binary_search_by(queue, total_score, key=lambda q: q[2])
-        if i < 0:
-            i = ~i
-        queue.insert(i, (board, history, total_score))
+    def _create_queue(self) -> Frontier[Tuple[Board, Tuple[Tuple[int, int], ...]], int]:
+        # Equal scores favour the most recently found combination
+        return BucketFrontier(lifo=True)
 
+    def _get_priority(self, history: Tuple[Tuple[int, int], ...], score: int) -> int:
+        return score + len(history)
 
-class _MixedMode(_SearchMode):
 
-    def __init__(self, limit: int):
-        super(_MixedMode, self).__init__(limit)
-        self._visited: Dict[Tuple[Tuple[int, int], ...], Board] = dict()
+class _MixedMode(_ParallelSearchMode):
+
+    def __init__(self, limit: int, workers: int = 1):
+        super(_MixedMode, self).__init__(limit, workers)
+        self._visited: Dict[int, Board] = dict()
+        self._budget = SearchBudget()
+        self._best: Tuple[int, Collection[Tuple[int, int]]] = (0, tuple())
 
     @classmethod
     def name(cls) -> str:
         return "mixed"
 
-    def solve(self, board: Board) -> Optional[Collection[Tuple[int, int]]]:
-        return self._solve(board, set(), board.width * board.height)
+    def _solve_subtrees(self, board: Board, budget: SearchBudget, fixed: int, prefixes: Iterable[int]) \
+            -> Optional[Collection[Tuple[int, int]]]:
+        self._prepare_symmetries(board)
+        self._budget = budget
+        self._best = (board.score, tuple())
+        squares = board.width * board.height
+        fixed_moves = tuple(board.positions((1 << fixed) - 1))
+        try:
+            for prefix in prefixes:
+                history = {fixed_moves[i] for i in BitUtils.iterate_bits(prefix)}
+                self._excluded = frozenset(fixed_moves) - history
+                start = board
+                for move in history:
+                    start = start.flip_formation(move, formation=CrossFormation)
+                if start.mask == 0:
+                    return history
+
+                solution = self._solve(start, history, squares)
+                if solution is not None:
+                    return solution
+            return None
+        except _OutOfBudget:
+            raise self._out_of_budget(board, budget, self._best) from None
+        finally:
+            self._excluded = frozenset()
+            self.stats.peak_visited = len(self._visited)
 
     def _initiate_solve_recursion(self, board: Board, history: Set[Tuple[int, int]]) \
             -> Optional[Collection[Tuple[int, int]]]:
@@ -170,7 +418,15 @@ class _MixedMode(_SearchMode):
         if len(history) >= self.limit > 0:
             return None
 
+        if self._budget.spend():
+            raise _OutOfBudget()
+
         open_list = self._generate_open_list(board, history)
+        if self.stats.enabled:
+            self.stats.expanded += 1
+            self.stats.generated += len(open_list)
+            # The search is depth-first, so its frontier is the path down to this board
+            self.stats.observe_frontier(len(history))
 
         for i, (move, score) in enumerate(open_list):
             if i > narrowness:
@@ -179,12 +435,16 @@ class _MixedMode(_SearchMode):
             if score == 0:
                 return new_history
 
-            sorted_history = tuple(sorted(new_history))
-            if sorted_history in self._visited:
+            key = self._combination_key(new_history)
+            if key in self._visited:
+                if self.stats.enabled:
+                    self.stats.skipped += 1
                 continue
 
             new_board = board.flip_formation(move, formation=CrossFormation)
-            self._visited[sorted_history] = new_board
+            self._visited[key] = new_board
+            if score < self._best[0]:
+                self._best = (score, new_history)
 
             solution = self._initiate_solve_recursion(new_board, new_history)
 
@@ -205,9 +465,194 @@ class _DepthFirstMode(_MixedMode):
         return self._solve(board, history, board.width * board.height)
 
 
+class _IterativeDeepeningMode(_ParallelSearchMode):
+    """
+    An IDA*-style depth-first search.  Combinations are only ever built by adding moves in increasing order of their
+    square's index, so each combination is explored exactly once without needing a visited table, and memory use is
+    proportional to the depth.  The search is repeated with the allowed number of moves deepened by one each time,
+    so the first combination found has the fewest moves.
+
+    A branch is pruned once the moves left can't possibly clear the squares still ON, since each move turns off at
+    most as many squares as its formation covers, or once some square still ON can only be flipped by moves before
+    the current one.
+
+    When run in parallel, each worker deepens its own subtrees, and stops once another worker has found a solution
+    no larger than the depth it has reached, so the smallest solution is still the one found.
+    """
+
+    COMPLETE = True
+
+    @classmethod
+    def name(cls) -> str:
+        return "iterative_deepening"
+
+    def _solve_subtrees(self, board: Board, budget: SearchBudget, fixed: int, prefixes: Iterable[int]) \
+            -> Optional[Collection[Tuple[int, int]]]:
+        if not LinearSystem.get(board.size, CrossFormation).is_solvable(board.mask):
+            return None
+        self._budget = budget
+        self._best = (board.score, 0)
+        self._bound = 0
+
+        masks = CrossFormation.get_masks(board.size)
+        squares = len(masks)
+        self._masks = masks
+        self._max_effect = max(BitUtils.popcount(m) for m in masks)
+
+        # settled[i] contains the squares that no move at index i or later can flip
+        last_move = [0] * squares
+        for i, mask in enumerate(masks):
+            for square in BitUtils.iterate_bits(mask):
+                last_move[square] = max(last_move[square], i)
+        self._settled = [sum(1 << square for square in range(squares) if last_move[square] < i)
+                         for i in range(squares + 1)]
+
+        # The board as left by pressing the squares of each prefix
+        starts = dict()
+        for prefix in prefixes:
+            start = board.mask
+            for i in BitUtils.iterate_bits(prefix):
+                start ^= masks[i]
+            starts[prefix] = start
+
+        max_depth = self.limit if self.limit > 0 else squares
+        try:
+            for bound in range(max_depth + 1):
+                self._bound = bound
+                for prefix, start in starts.items():
+                    pressed = BitUtils.popcount(prefix)
+                    if pressed > bound:
+                        continue
+                    solution = self._search(start, fixed, prefix, bound - pressed)
+                    if solution is not None:
+                        return tuple(board.positions(solution))
+        except _OutOfBudget:
+            score, combination = self._best
+            raise self._out_of_budget(board, budget, (score, tuple(board.positions(combination)))) from None
+        return None
+
+    def _stop_bound(self) -> int:
+        # Solutions larger than the depth being searched could still be beaten by this worker
+        return self._bound
+
+    def _search(self, board_mask: int, start: int, combination: int, remaining: int) -> Optional[int]:
+        if board_mask == 0:
+            return combination
+        on = BitUtils.popcount(board_mask)
+        if -(-on // self._max_effect) > remaining:
+            return None
+        if board_mask & self._settled[start]:
+            return None
+
+        if self._budget.spend():
+            raise _OutOfBudget()
+        if on < self._best[0]:
+            self._best = (on, combination)
+
+        if self.stats.enabled:
+            self.stats.expanded += 1
+            self.stats.generated += len(self._masks) - start
+            self.stats.observe_frontier(BitUtils.popcount(combination))
+        for i in range(start, len(self._masks)):
+            solution = self._search(board_mask ^ self._masks[i], i + 1, combination | (1 << i), remaining - 1)
+            if solution is not None:
+                return solution
+        return None
+
+
+class _MeetInTheMiddleMode(_SearchMode):
+    """
+    Splits the squares into two halves, and finds the effect on the board of every combination of moves within
+    each half.  The effects of the first half are stored in a table (which only depends on the board size, so is
+    re-used), and each effect of the second half is joined against it on the board mask.  This is about 2 * 2^(n/2)
+    combinations rather than 2^n, and gives the combination with the fewest moves.
+    """
+
+    COMPLETE = True
+    MAX_SQUARES = 36
+
+    _tables: Dict[Tuple[int, int], Dict[int, int]] = dict()
+
+    @classmethod
+    def name(cls) -> str:
+        return "meet_in_the_middle"
+
+    def solve(self, board: Board, budget: SearchBudget) -> Optional[Collection[Tuple[int, int]]]:
+        squares = board.width * board.height
+        if squares > self.MAX_SQUARES:
+            raise ExecutionError(ErrorType.BAD_REQUEST, f"Board is too large for mode '{self.name()}'.",
+                                 {"given": {"squares": squares}, "limit": self.MAX_SQUARES})
+
+        masks = CrossFormation.get_masks(board.size)
+        split = squares // 2
+        with self.stats.phase("first_half"):
+            first_half = self._get_table(board.size, split)
+        if self.stats.enabled:
+            self.stats.peak_visited = len(first_half)
+            self.stats.expanded = 1 << (squares - split)
+            self.stats.generated = self.stats.expanded
+
+        # The join is bounded and has no partial results, so the budget is only checked before starting it
+        if budget.spend(1 << (squares - split)):
+            raise budget.error()
+
+        best: Optional[int] = None
+        best_count = squares + 1
+        for combination, effect in _combinations(masks[split:], offset=split):
+            other = first_half.get(board.mask ^ effect)
+            if other is None:
+                continue
+            count = BitUtils.popcount(combination) + BitUtils.popcount(other)
+            if count < best_count:
+                best, best_count = combination | other, count
+
+        if best is None or best_count > self.limit > 0:
+            return None
+        return tuple(board.positions(best))
+
+    @classmethod
+    def _get_table(cls, size: Tuple[int, int], split: int) -> Dict[int, int]:
+        # Maps the effect of each combination of moves in the first half to the smallest combination with that effect
+        table = cls._tables.get(size)
+        if table is None:
+            table = dict()
+            for combination, effect in _combinations(CrossFormation.get_masks(size)[:split]):
+                existing = table.get(effect)
+                if existing is None or BitUtils.popcount(combination) < BitUtils.popcount(existing):
+                    table[effect] = combination
+            cls._tables[size] = table
+        return table
+
+
+class _OutOfBudget(Exception):
+    """
+    Unwinds a recursive search once its budget runs out, to where the error can be built from its best result.
+    """
+    pass
+
+
+def _combinations(masks: Collection[int], offset: int = 0) -> Iterable[Tuple[int, int]]:
+    """
+    Iterates through every combination of the given formation masks in Gray code order, so that each step only
+    adds or removes one move.
+
+    :param masks: The formation masks of the moves to combine.
+    :param offset: The index of the first move's square, used to position the bits of the combinations.
+    :return: Each combination of moves (as a mask of squares), paired with its combined effect on the board.
+    """
+    combination, effect = 0, 0
+    yield combination, effect
+    for i in range(1, 1 << len(masks)):
+        k = (i & -i).bit_length() - 1
+        combination ^= 1 << (k + offset)
+        effect ^= masks[k]
+        yield combination, effect
+
+
 #
 
 
 MODES: Dict[str, Type[_SearchMode]] = {
-    m.name(): m for m in [_BreadthFirstMode, _SortedBreadthFirstMode, _MixedMode, _DepthFirstMode]
+    m.name(): m for m in [_BreadthFirstMode, _SortedBreadthFirstMode, _MixedMode, _DepthFirstMode,
+                          _IterativeDeepeningMode, _MeetInTheMiddleMode]
 }
@@ -1,15 +1,63 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import List, Tuple, Dict, Union, Optional, Iterable, Collection
+from typing import List, Tuple, Dict, Union, Optional, Iterable, Collection, Type
 
 
 class Formation(ABC):
 
+    _mask_cache: Dict[Tuple[Type[Formation], int, int], Tuple[int, ...]] = dict()
+
     @classmethod
     @abstractmethod
     def get_positions(cls, pos: Tuple[int, int]) -> Iterable[Tuple[int, int]]: ...
 
+    @classmethod
+    def get_masks(cls, size: Tuple[int, int]) -> Tuple[int, ...]:
+        """
+        Gets the bit masks of the squares affected by this formation when applied at each position of a board
+        of the given size.  Bit (row * width + col) of a mask corresponds to the square at (row, col), and
+        the returned masks are indexed in the same way.  Positions of the formation that fall outside of the
+        board are excluded.
+
+        Masks are computed once per formation and board size, and then re-used.
+
+        :param size: The (height, width) of the board.
+        :return: A tuple containing one mask per position on the board.
+        """
+        key = (cls, size[0], size[1])
+        masks = Formation._mask_cache.get(key)
+        if masks is None:
+            height, width = size
+            masks = tuple(cls._build_mask((row, col), size) for row in range(height) for col in range(width))
+            Formation._mask_cache[key] = masks
+        return masks
+
+    @classmethod
+    def get_mask(cls, pos: Tuple[int, int], size: Tuple[int, int]) -> int:
+        """
+        Gets the bit mask of the squares affected by this formation when applied at the given position
+        of a board of the given size.  See get_masks().
+
+        :param pos: The (row, col) position the formation is applied at.
+        :param size: The (height, width) of the board.
+        :return: The bit mask of affected squares.
+        """
+        row, col = pos
+        height, width = size
+        if 0 <= row < height and 0 <= col < width:
+            return cls.get_masks(size)[row * width + col]
+        return cls._build_mask(pos, size)
+
+    @classmethod
+    def _build_mask(cls, pos: Tuple[int, int], size: Tuple[int, int]) -> int:
+        height, width = size
+        mask = 0
+        for r, c in cls.get_positions(pos):
+            if 0 <= r < height and 0 <= c < width:
+                mask |= 1 << (r * width + c)
+        return mask
+
 
 class CrossFormation(Formation):
 
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from PathFinding import Algorithm, Solution, SearchBudget
+from Games.Mezzonic.Board import BoardTransition, Board
+from Errors import ExecutionError, ErrorType
+from Utilty import BitUtils
+
+from typing import Tuple, Dict, List, Optional
+
+
+class LightChasingMezzonicAlgorithm(Algorithm):
+    """
+    The classic "light chasing" method.  Working down the board one row at a time, every square below an ON square
+    is pressed, which clears the row above it.  This leaves only the bottom row with any squares ON.
+
+    Chasing is linear, so the bottom row left over by chasing a board with some presses in the top row is the bottom
+    row left over by chasing it without them, XORed with the bottom row left over by chasing an empty board with
+    those same presses.  A table mapping each possible leftover bottom row to the top row presses that cause it is
+    built once per board size, and then tells us which top row presses clear the board.  If the leftover bottom row
+    is not in the table, the board can't be solved.
+
+    Every board is solved in O(height * width) operations on whole rows, however scrambled it is.  When several top
+    rows clear the board, the one giving the fewest presses overall is used, unless 'minimize' is False.
+    """
+
+    _tables: Dict[Tuple[int, int], Dict[int, List[int]]] = dict()
+
+    def __init__(self, minimize: bool = True, **kwargs):
+        super(LightChasingMezzonicAlgorithm, self).__init__(minimize=minimize, **kwargs)
+        self.minimize = minimize
+
+    @classmethod
+    def name(cls) -> str:
+        return "light_chasing"
+
+    @property
+    def complete(self) -> bool:
+        return True
+
+    def solve(self, initial_state: Board, budget: Optional[SearchBudget] = None) -> Solution:
+        height, width = initial_state.size
+        full = (1 << width) - 1
+        rows = [(initial_state.mask >> (row * width)) & full for row in range(height)]
+
+        _, leftover = _chase(rows, width, 0)
+        top_rows = self._get_table(initial_state.size).get(leftover)
+        if top_rows is None:
+            raise ExecutionError(ErrorType.NO_PATH_FOUND, f"No path exists.")
+
+        best = None
+        for top in (top_rows if self.minimize else top_rows[:1]):
+            presses, _ = _chase(rows, width, top)
+            count = sum(BitUtils.popcount(p) for p in presses)
+            if best is None or count < best[0]:
+                best = (count, presses)
+
+        return Solution.follow(initial_state, (BoardTransition((row, col))
+                                               for row, presses in enumerate(best[1])
+                                               for col in BitUtils.iterate_bits(presses)))
+
+    @classmethod
+    def _get_table(cls, size: Tuple[int, int]) -> Dict[int, List[int]]:
+        table = cls._tables.get(size)
+        if table is None:
+            height, width = size
+            empty = [0] * height
+            table = dict()
+            # Top rows are tried in order of how many presses they have
+            for top in sorted(range(1 << width), key=BitUtils.popcount):
+                _, leftover = _chase(empty, width, top)
+                table.setdefault(leftover, []).append(top)
+            cls._tables[size] = table
+        return table
+
+
+def _chase(rows: List[int], width: int, top: int) -> Tuple[List[int], int]:
+    """
+    Presses the given squares of the top row, and then chases the ON squares of each row down into the row below.
+
+    :param rows: The board, as one mask per row.
+    :param width: The width of the board.
+    :param top: The squares to press in the top row.
+    :return: The squares pressed in each row, and the squares left ON in the bottom row.
+    """
+    full = (1 << width) - 1
+    rows = list(rows)
+    presses = [0] * len(rows)
+    press = top
+    for row in range(len(rows)):
+        if row > 0:
+            press = rows[row - 1]
+            rows[row - 1] = 0
+        presses[row] = press
+        rows[row] ^= press ^ ((press << 1) & full) ^ (press >> 1)
+        if row + 1 < len(rows):
+            rows[row + 1] ^= press
+    return presses, rows[-1]
@@ -0,0 +1,38 @@
+from PathFinding import Algorithm, Solution, SearchBudget
+from Games.Mezzonic.Board import BoardTransition, Board
+from Games.Mezzonic.Formation import CrossFormation
+from Games.Mezzonic.LinearSystem import LinearSystem
+from Errors import ExecutionError, ErrorType
+
+from typing import Optional
+
+
+class LinearMezzonicAlgorithm(Algorithm):
+    """
+    This algorithm does not search at all.  Since the order of moves doesn't matter and a repeated move cancels
+    itself out, the puzzle is a system of linear equations over GF(2), which is solved directly by Gaussian
+    elimination (see LinearSystem).  The elimination is done once per board size and re-used by every request,
+    so solving a board costs a single matrix-vector product.
+
+    If the board's solution is not unique, the solution with the fewest moves is returned.
+    """
+
+    def __init__(self, **kwargs):
+        super(LinearMezzonicAlgorithm, self).__init__(**kwargs)
+
+    @classmethod
+    def name(cls) -> str:
+        return "linear"
+
+    @property
+    def complete(self) -> bool:
+        return True
+
+    def solve(self, initial_state: Board, budget: Optional[SearchBudget] = None) -> Solution:
+        system = LinearSystem.get(initial_state.size, CrossFormation)
+        solution = system.solve(initial_state.mask)
+
+        if solution is None:
+            raise ExecutionError(ErrorType.NO_PATH_FOUND, f"No path exists.")
+
+        return Solution.follow(initial_state, (BoardTransition(pos) for pos in initial_state.positions(solution)))
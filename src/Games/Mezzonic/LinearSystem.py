@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from Games.Mezzonic.Formation import Formation, CrossFormation
+from Utilty import BitUtils
+
+from typing import Tuple, Dict, List, Optional, Type
+
+
+class LinearSystem:
+    """
+    Represents the system of linear equations over GF(2) that describes a Mezzonic board of a given size and
+    formation.  Pressing square j toggles exactly the squares in the formation mask of j, so a set of presses x
+    (bit j set if square j is pressed) clears board b exactly when A x = b, where column j of A is the formation
+    mask of square j.
+
+    The system is reduced once with Gaussian elimination over bit-packed rows, and the result is stored as
+    a pseudo-inverse:  one particular solution per board square, a list of consistency checks that a board must
+    satisfy in order to be solvable, and a basis of the null space (the sets of presses that have no effect).
+    Solving any board is then a single matrix-vector product, plus a walk over the null space in order to find
+    the solution with the fewest presses.
+
+    Use LinearSystem.get() to retrieve a system, which are computed once per process and re-used.
+    """
+
+    MAX_NULLITY_SEARCH = 16
+
+    _cache: Dict[Tuple[int, int, Type[Formation]], LinearSystem] = dict()
+
+    def __init__(self, size: Tuple[int, int], formation: Type[Formation] = CrossFormation):
+        self.height, self.width = size
+        self.formation = formation
+        n = self.height * self.width
+        self.cell_count = n
+
+        masks = formation.get_masks(size)
+        # Row i of A contains the presses that toggle square i
+        rows = [0] * n
+        for j, mask in enumerate(masks):
+            for i in BitUtils.iterate_bits(mask):
+                rows[i] |= 1 << j
+        # Row i of T tracks which original equations have been combined into row i
+        transforms = [1 << i for i in range(n)]
+
+        pivot_cols: List[int] = []
+        rank = 0
+        for col in range(n):
+            bit = 1 << col
+            pivot = next((r for r in range(rank, n) if rows[r] & bit), None)
+            if pivot is None:
+                continue
+            rows[rank], rows[pivot] = rows[pivot], rows[rank]
+            transforms[rank], transforms[pivot] = transforms[pivot], transforms[rank]
+            for r in range(n):
+                if r != rank and rows[r] & bit:
+                    rows[r] ^= rows[rank]
+                    transforms[r] ^= transforms[rank]
+            pivot_cols.append(col)
+            rank += 1
+
+        self.rank = rank
+
+        # The particular solution contributed by each individual ON square
+        self._particular: Tuple[int, ...] = tuple(
+            sum(1 << pivot_cols[i] for i in range(rank) if (transforms[i] >> k) & 1)
+            for k in range(n))
+
+        # Every zero row of the reduced matrix requires the board to have even parity under the tracked transform
+        self._consistency: Tuple[int, ...] = tuple(transforms[i] for i in range(rank, n))
+
+        # Each free column gives one basis vector of the null space
+        pivot_set = set(pivot_cols)
+        self._null_basis: Tuple[int, ...] = tuple(
+            (1 << f) | sum(1 << pivot_cols[i] for i in range(rank) if (rows[i] >> f) & 1)
+            for f in range(n) if f not in pivot_set)
+
+    @classmethod
+    def get(cls, size: Tuple[int, int], formation: Type[Formation] = CrossFormation) -> LinearSystem:
+        key = (size[0], size[1], formation)
+        system = cls._cache.get(key)
+        if system is None:
+            system = LinearSystem(size, formation)
+            cls._cache[key] = system
+        return system
+
+    @property
+    def nullity(self) -> int:
+        return len(self._null_basis)
+
+    @property
+    def null_basis(self) -> Tuple[int, ...]:
+        return self._null_basis
+
+    @property
+    def consistency_checks(self) -> Tuple[int, ...]:
+        return self._consistency
+
+    @property
+    def particular_solutions(self) -> Tuple[int, ...]:
+        return self._particular
+
+    def is_solvable(self, board_mask: int) -> bool:
+        return not any(BitUtils.popcount(check & board_mask) & 1 for check in self._consistency)
+
+    def solve(self, board_mask: int, minimize: bool = True) -> Optional[int]:
+        """
+        Finds a set of presses that clears the given board.
+
+        :param board_mask: The mask of ON squares of the board to solve.
+        :param minimize: If True (and the null space is small enough to enumerate), returns the solution with the
+        fewest presses.  Otherwise, returns any solution.
+        :return: The mask of squares to press, or None if the board cannot be solved.
+        """
+        if not self.is_solvable(board_mask):
+            return None
+
+        solution = 0
+        particular = self._particular
+        for k in BitUtils.iterate_bits(board_mask):
+            solution ^= particular[k]
+
+        if minimize and 0 < self.nullity <= LinearSystem.MAX_NULLITY_SEARCH:
+            solution = self._minimize(solution)
+        return solution
+
+    def _minimize(self, solution: int) -> int:
+        # Walk every combination of the null space basis in Gray code order, so each step is a single XOR
+        best, best_count = solution, BitUtils.popcount(solution)
+        current = solution
+        for i in range(1, 1 << self.nullity):
+            current ^= self._null_basis[(i & -i).bit_length() - 1]
+            count = BitUtils.popcount(current)
+            if count < best_count:
+                best, best_count = current, count
+        return best
@@ -3,11 +3,15 @@ from __future__ import annotations
 from Lambda import LambdaArguments
 from Games.Game import Game
 from Games.Mezzonic.Board import Board, BoardTransition
-from PathFinding import Algorithm, BasicAlgorithm, LookaheadAlgorithm, OrderlessAlgorithm, OrderlessLookaheadAlgorithm
+from PathFinding import Solution, Algorithm, BasicAlgorithm, LookaheadAlgorithm, OrderlessAlgorithm, OrderlessLookaheadAlgorithm
 from Games.Mezzonic.ExhaustiveMezzonicAlgorithm import ExhaustiveMezzonicAlgorithm
+from Games.Mezzonic.LinearMezzonicAlgorithm import LinearMezzonicAlgorithm
+from Games.Mezzonic.LightChasingMezzonicAlgorithm import LightChasingMezzonicAlgorithm
+from Games.Mezzonic.PortfolioMezzonicAlgorithm import PortfolioMezzonicAlgorithm
+from Games.Mezzonic.SolutionTable import SolutionTable
 from Errors import *
 
-from typing import List, Type
+from typing import List, Type, Optional
 import json
 
 SIZE_LIMIT = (10, 10)
@@ -44,7 +48,26 @@ class MezzonicGame(Game[Board, BoardTransition]):
         print(f"ALGORITHM: {self.algorithm.name()} ({self.algorithm.__class__.__name__}")
         print(f"ARGS: {json.dumps(self.algorithm.kwargs)}")
 
+    def precomputed_solution(self) -> Optional[Solution]:
+        table = SolutionTable.get(self.initial_state.size)
+        if table is None:
+            return None
+
+        moves = table.lookup(self.initial_state)
+        if moves is None:
+            raise ExecutionError(ErrorType.NO_PATH_FOUND, f"No path exists.")
+
+        solution = tuple(self.initial_state.positions(moves))
+        if 0 < self.algorithm.kwargs.get("limit", 0) < len(solution):
+            # Let the algorithm decide how to report a solution that is beyond its limit
+            return None
+        return Solution.follow(self.initial_state, (BoardTransition(pos) for pos in solution))
+
+    def fallback_algorithm(self) -> Optional[Algorithm]:
+        return LinearMezzonicAlgorithm()
+
     @classmethod
     def supported_algorithms(cls) -> List[Type[Algorithm]]:
         return [ExhaustiveMezzonicAlgorithm, OrderlessAlgorithm, OrderlessLookaheadAlgorithm,
-                BasicAlgorithm, LookaheadAlgorithm]
+                BasicAlgorithm, LookaheadAlgorithm, LinearMezzonicAlgorithm,
+                LightChasingMezzonicAlgorithm, PortfolioMezzonicAlgorithm]
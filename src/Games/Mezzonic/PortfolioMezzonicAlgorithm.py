@@ -0,0 +1,28 @@
+from PathFinding import Algorithm, PortfolioAlgorithm, BasicAlgorithm, LookaheadAlgorithm, OrderlessAlgorithm, \
+    OrderlessLookaheadAlgorithm
+from PathFinding.Algorithms.PortfolioAlgorithm import MemberSpec
+from Games.Mezzonic.ExhaustiveMezzonicAlgorithm import ExhaustiveMezzonicAlgorithm
+from Games.Mezzonic.LinearMezzonicAlgorithm import LinearMezzonicAlgorithm
+from Games.Mezzonic.LightChasingMezzonicAlgorithm import LightChasingMezzonicAlgorithm
+
+from typing import List, Type
+
+
+class PortfolioMezzonicAlgorithm(PortfolioAlgorithm):
+    """
+    Runs several Mezzonic algorithms at once (see PortfolioAlgorithm).  By default, these are the best of the
+    path-finding algorithms for lightly scrambled boards, alongside the exhaustive modes that do best on heavily
+    scrambled ones.
+    """
+
+    @classmethod
+    def member_types(cls) -> List[Type[Algorithm]]:
+        return [ExhaustiveMezzonicAlgorithm, OrderlessAlgorithm, OrderlessLookaheadAlgorithm,
+                BasicAlgorithm, LookaheadAlgorithm, LinearMezzonicAlgorithm,
+                LightChasingMezzonicAlgorithm]
+
+    @classmethod
+    def default_members(cls) -> List[MemberSpec]:
+        return ["orderless_lookahead",
+                {"algorithm": "exhaustive", "args": {"mode": "mixed"}},
+                {"algorithm": "exhaustive", "args": {"mode": "iterative_deepening"}}]
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+from Games.Mezzonic.Board import Board
+from Games.Mezzonic.Formation import CrossFormation
+from Games.Mezzonic.LinearSystem import LinearSystem
+from Interfaces import LogMethod, LogLevel
+from Utilty import BitUtils
+
+from typing import Tuple, Dict, Optional, List, Iterable
+import multiprocessing
+import mmap
+import os
+import struct
+
+TABLE_DIR_VARIABLE = "MEZZONIC_TABLE_DIR"
+DEFAULT_TABLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Tables")
+
+_MAGIC = b"MZST"
+_HEADER = struct.Struct("<4sBBBx")
+_CHUNK_BITS = 16
+
+
+class SolutionTable:
+    """
+    A complete table of the fewest-press solution to every board of a particular size, stored in a binary file that
+    is memory-mapped on first use.  This means a lookup is a single read from the page cache, without any
+    per-request memory cost.
+
+    The file consists of a small header followed by one entry per board, indexed by the board's mask.  Each entry is
+    the mask of squares to press, packed into exactly (height * width) bits.  If some boards cannot be solved, then
+    pressing every square is never the fewest-press solution to any board, so an entry with every bit set marks a
+    board that cannot be solved.
+
+    Tables are built offline with SolutionTable.generate() (see GenerateSolutionTable.py), and found at runtime in
+    the directory named by the MEZZONIC_TABLE_DIR environment variable, or in the "Tables" directory next to this
+    module otherwise.
+    """
+
+    _cache: Dict[Tuple[int, int], Optional[SolutionTable]] = dict()
+
+    def __init__(self, size: Tuple[int, int], data: mmap.mmap):
+        self.height, self.width = size
+        self._bits = self.height * self.width
+        self._entry_mask = (1 << self._bits) - 1
+        self._data = data
+        # When every board is solvable, the unique solution of some board may be to press every square
+        self._has_unsolvable = LinearSystem.get(size, CrossFormation).nullity > 0
+
+    @staticmethod
+    def file_name(size: Tuple[int, int]) -> str:
+        return f"mezzonic_{size[0]}x{size[1]}.bin"
+
+    @staticmethod
+    def default_path(size: Tuple[int, int]) -> str:
+        return os.path.join(os.environ.get(TABLE_DIR_VARIABLE, DEFAULT_TABLE_DIR), SolutionTable.file_name(size))
+
+    @classmethod
+    def get(cls, size: Tuple[int, int]) -> Optional[SolutionTable]:
+        """
+        Gets the solution table for boards of the given size, if one has been generated.  Tables are loaded
+        at most once per process.
+
+        :param size: The (height, width) of the board.
+        :return: The solution table, or None if no table exists for this size.
+        """
+        if size not in cls._cache:
+            cls._cache[size] = cls.load(cls.default_path(size))
+        return cls._cache[size]
+
+    @classmethod
+    def load(cls, path: str) -> Optional[SolutionTable]:
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, height, width, bits = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC or bits != height * width:
+            data.close()
+            return None
+        return SolutionTable((height, width), data)
+
+    def supports(self, board: Board) -> bool:
+        return board.height == self.height and board.width == self.width
+
+    def lookup(self, board: Board) -> Optional[int]:
+        """
+        Looks up the fewest-press solution of the given board.  The board must be of the size of this table.
+
+        :param board: The board to look up.
+        :return: The mask of squares to press, or None if the board cannot be solved.
+        """
+        bit = board.mask * self._bits
+        start = _HEADER.size + (bit >> 3)
+        entry = (int.from_bytes(self._data[start:start + 8], "little") >> (bit & 7)) & self._entry_mask
+        return None if entry == self._entry_mask and self._has_unsolvable else entry
+
+    #
+
+    @staticmethod
+    def generate(path: str,
+                 size: Tuple[int, int] = (5, 5),
+                 processes: Optional[int] = None,
+                 logger: LogMethod = LogMethod.null):
+        """
+        Builds the complete solution table for boards of the given size and writes it to the given path.
+        The boards are split into chunks that are solved in parallel across the given number of processes.
+
+        :param path: The file to write the table to.
+        :param size: The (height, width) of the boards in the table.
+        :param processes: The number of processes to use.  Defaults to the number of CPUs.
+        :param logger: The logger to report progress to.
+        """
+        bits = size[0] * size[1]
+        if not 3 <= bits <= 32:
+            raise ValueError(f"Cannot build a solution table for {bits} squares.")
+
+        chunk_bits = min(_CHUNK_BITS, bits)
+        chunk_count = 1 << (bits - chunk_bits)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with open(path, "wb") as f, multiprocessing.Pool(processes) as pool:
+            f.write(_HEADER.pack(_MAGIC, size[0], size[1], bits))
+            tasks = ((size, chunk_bits, high) for high in range(chunk_count))
+            for i, packed in enumerate(pool.imap(_generate_chunk, tasks)):
+                f.write(packed)
+                if (i + 1) % 64 == 0 or i + 1 == chunk_count:
+                    logger(f"Wrote {i + 1}/{chunk_count} chunks", heading="SolutionTable", level=LogLevel.VERBOSE)
+
+
+# Per-process cache of the solutions and syndromes of every combination of the low bits of a chunk
+_low_tables: Dict[Tuple[Tuple[int, int], int], Tuple[List[int], List[int]]] = dict()
+
+
+def _generate_chunk(task: Tuple[Tuple[int, int], int, int]) -> bytes:
+    size, chunk_bits, high = task
+    system = LinearSystem.get(size, CrossFormation)
+    bits = system.cell_count
+    unsolvable = (1 << bits) - 1
+
+    # Both the particular solution and the consistency checks are linear in the board, so they are
+    # computed once for the high bits of the chunk and combined with a table covering the low bits
+    particular = system.particular_solutions
+    checks = system.consistency_checks
+    null_space = _span(system.null_basis)
+
+    def _syndrome(board_mask: int) -> int:
+        return sum(1 << i for i, check in enumerate(checks) if BitUtils.popcount(check & board_mask) & 1)
+
+    def _solution(board_mask: int) -> int:
+        solution = 0
+        for k in BitUtils.iterate_bits(board_mask):
+            solution ^= particular[k]
+        return solution
+
+    if (size, chunk_bits) not in _low_tables:
+        low_solutions: List[int] = [0] * (1 << chunk_bits)
+        low_syndromes: List[int] = [0] * (1 << chunk_bits)
+        for low in range(1, 1 << chunk_bits):
+            k = (low & -low).bit_length() - 1
+            rest = low & (low - 1)
+            low_solutions[low] = low_solutions[rest] ^ particular[k]
+            low_syndromes[low] = low_syndromes[rest] ^ _syndrome(1 << k)
+        _low_tables[(size, chunk_bits)] = (low_solutions, low_syndromes)
+    low_solutions, low_syndromes = _low_tables[(size, chunk_bits)]
+
+    high_mask = high << chunk_bits
+    high_solution = _solution(high_mask)
+    high_syndrome = _syndrome(high_mask)
+
+    entries: List[int] = []
+    for low in range(1 << chunk_bits):
+        if low_syndromes[low] != high_syndrome:
+            entries.append(unsolvable)
+            continue
+        solution = high_solution ^ low_solutions[low]
+        entries.append(min((solution ^ n for n in null_space), key=BitUtils.popcount))
+
+    return _pack(entries, bits)
+
+
+def _span(basis: Iterable[int]) -> List[int]:
+    span = [0]
+    for vector in basis:
+        span += [v ^ vector for v in span]
+    return span
+
+
+def _pack(entries: List[int], bits: int) -> bytes:
+    # Groups of 8 entries always occupy a whole number of bytes
+    entries = entries + [0] * (-len(entries) % 8)
+    packed = bytearray()
+    for i in range(0, len(entries), 8):
+        group = 0
+        for j in range(8):
+            group |= entries[i + j] << (bits * j)
+        packed += group.to_bytes(bits, "little")
+    return bytes(packed)
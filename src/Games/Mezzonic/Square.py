@@ -1,16 +1,31 @@
 from __future__ import annotations
 
 from enum import Enum
+from typing import Dict, Tuple
 
 
 class Square:
+    """
+    A single square of a Mezzonic board.  Squares are immutable, so there is only ever one Square per value.
+    """
 
     class Value(Enum):
         OFF = 0
         ON = 1
 
-    def __init__(self, value: Square.Value):
-        self._value = value
+    __slots__ = ("_value",)
+
+    _instances: Dict[Square.Value, Square] = dict()
+
+    def __new__(cls, value: Square.Value) -> Square:
+        instance = cls._instances.get(value)
+        if instance is None:
+            instance = cls._instances[value] = super(Square, cls).__new__(cls)
+            instance._value = value
+        return instance
+
+    def __getnewargs__(self) -> Tuple[Square.Value]:
+        return self._value,
 
     def __eq__(self, other) -> bool:
         return isinstance(other, Square) and other.value == self.value
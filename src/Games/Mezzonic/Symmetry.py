@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from PathFinding import StateSymmetry
+
+from typing import Tuple, Dict, Callable, List, Optional
+
+
+class BoardSymmetry(StateSymmetry):
+    """
+    A rotation or reflection of a Mezzonic board.  Since the formations are symmetric, a set of moves that clears
+    a board also clears the rotated or reflected board once the moves are rotated or reflected in the same way.
+
+    A square board has 8 symmetries, while any other board has the 4 that preserve its shape.  Symmetries are
+    computed once per board size (see BoardSymmetry.all()), and apply to board masks with one table lookup per
+    byte of the mask.
+    """
+
+    _cache: Dict[Tuple[int, int], Tuple[BoardSymmetry, ...]] = dict()
+
+    def __init__(self, name: str, size: Tuple[int, int], mapping: Callable[[int, int], Tuple[int, int]]):
+        self.name = name
+        self.size = size
+        height, width = size
+        self._mapping = mapping
+        # Bit i of a mask is moved to bit permutation[i]
+        self.permutation: Tuple[int, ...] = tuple(
+            row * width + col for row, col in (mapping(i // width, i % width) for i in range(height * width)))
+        self._tables: List[List[int]] = []
+        for j in range(0, len(self.permutation), 8):
+            table = [0] * 256
+            for value in range(1, 256):
+                k = (value & -value).bit_length() - 1
+                bit = j + k
+                table[value] = table[value & (value - 1)] | \
+                    ((1 << self.permutation[bit]) if bit < len(self.permutation) else 0)
+            self._tables.append(table)
+        self._inverse: Optional[BoardSymmetry] = None
+
+    def __str__(self) -> str:
+        return self.name
+
+    def __repr__(self) -> str:
+        return str(self)
+
+    @classmethod
+    def all(cls, size: Tuple[int, int]) -> Tuple[BoardSymmetry, ...]:
+        """
+        Gets every symmetry of boards of the given size.  The identity is always first.
+
+        :param size: The (height, width) of the board.
+        :return: The symmetries of the board.
+        """
+        symmetries = cls._cache.get(size)
+        if symmetries is None:
+            h, w = size
+            mappings: List[Tuple[str, Callable[[int, int], Tuple[int, int]]]] = [
+                ("identity", lambda r, c: (r, c)),
+                ("rotate_180", lambda r, c: (h - 1 - r, w - 1 - c)),
+                ("flip_vertical", lambda r, c: (h - 1 - r, c)),
+                ("flip_horizontal", lambda r, c: (r, w - 1 - c)),
+            ]
+            if h == w:
+                mappings += [
+                    ("rotate_90", lambda r, c: (c, h - 1 - r)),
+                    ("rotate_270", lambda r, c: (w - 1 - c, r)),
+                    ("transpose", lambda r, c: (c, r)),
+                    ("anti_transpose", lambda r, c: (w - 1 - c, h - 1 - r)),
+                ]
+            symmetries = tuple(BoardSymmetry(name, size, mapping) for name, mapping in mappings)
+            for symmetry in symmetries:
+                symmetry._inverse = next(s for s in symmetries
+                                         if all(s.permutation[p] == i for i, p in enumerate(symmetry.permutation)))
+            cls._cache[size] = symmetries
+        return symmetries
+
+    @classmethod
+    def canonical(cls, size: Tuple[int, int], mask: int) -> Tuple[int, BoardSymmetry]:
+        """
+        Finds the representative of the given board mask among all of its rotations and reflections, which is the
+        one with the lowest mask.
+
+        :param size: The (height, width) of the board.
+        :param mask: The board's mask.
+        :return: The representative mask, and the symmetry that maps the given mask onto it.
+        """
+        best, best_symmetry = mask, None
+        for symmetry in cls.all(size):
+            mapped = symmetry.apply_mask(mask)
+            if best_symmetry is None or mapped < best:
+                best, best_symmetry = mapped, symmetry
+        return best, best_symmetry
+
+    @classmethod
+    def stabilizer(cls, size: Tuple[int, int], mask: int) -> Tuple[BoardSymmetry, ...]:
+        """
+        Gets the symmetries that map the given board mask onto itself.  The identity is always first.
+        """
+        return tuple(s for s in cls.all(size) if s.apply_mask(mask) == mask)
+
+    @property
+    def is_identity(self) -> bool:
+        return self.name == "identity"
+
+    def map_position(self, pos: Tuple[int, int]) -> Tuple[int, int]:
+        return self._mapping(*pos)
+
+    def apply_mask(self, mask: int) -> int:
+        result = 0
+        for table in self._tables:
+            result |= table[mask & 0xFF]
+            mask >>= 8
+        return result
+
+    def apply(self, board: Board) -> Board:
+        return type(board).from_mask(board.size, self.apply_mask(board.mask))
+
+    def apply_transition(self, transition: BoardTransition) -> BoardTransition:
+        return type(transition)(self.map_position(transition.value))
+
+    def inverse(self) -> BoardSymmetry:
+        return self._inverse
@@ -1,4 +1,5 @@
 from Games.Mezzonic.Square import Square
 from Games.Mezzonic.Board import Board, BoardTransition
 from Games.Mezzonic.Formation import Formation, CrossFormation, PointFormation
+from Games.Mezzonic.Symmetry import BoardSymmetry
 from Games.Mezzonic.MezzonicGame import MezzonicGame
\ No newline at end of file
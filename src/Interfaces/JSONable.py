@@ -2,16 +2,34 @@ from __future__ import annotations
 
 
 from abc import ABC, abstractmethod
+from typing import Iterable
+import json
 
 
 class JSONable(ABC):
 
+    __slots__ = ()
+
     @abstractmethod
     def to_json(self) -> dict: ...
 
 
 class JSONExchangeable(JSONable, ABC):
 
+    __slots__ = ()
+
     @staticmethod
     @abstractmethod
     def from_json(o: dict): ...
+
+
+class JSONStreamable(JSONable, ABC):
+    """
+    An object whose JSON text can be produced in pieces, so that it can be written out before all of it has been
+    built.  Joining the chunks must give valid JSON for to_json().
+    """
+
+    __slots__ = ()
+
+    def json_chunks(self) -> Iterable[str]:
+        yield json.dumps(self.to_json())
@@ -1,3 +1,3 @@
 from Interfaces.Comparable import Comparable, ComparableType, CompareAndHashable, CompareAndHashableType
-from Interfaces.JSONable import JSONable, JSONExchangeable
+from Interfaces.JSONable import JSONable, JSONExchangeable, JSONStreamable
 from Interfaces.LogMethod import LogMethod, LogLevel
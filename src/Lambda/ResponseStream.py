@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+import time
+
+
+class ResponseStream(ABC):
+    """
+    A sink that a response body can be written to in pieces, as it is produced, rather than all at once.  The
+    status code and headers are sent first (see start()), followed by any number of body chunks, and the response
+    ends when the stream is closed.
+
+    The Python Lambda runtime cannot stream responses itself, so implementations of this adapt whatever the
+    response is actually being sent through (eg. a custom runtime, or a local HTTP server).
+    """
+
+    def __init__(self):
+        self._started = False
+        self._closed = False
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def start(self, status_code: int, headers: Dict[str, str]):
+        if self._started:
+            raise RuntimeError("Response stream has already been started.")
+        self._started = True
+        self._start(status_code, headers)
+
+    def write(self, chunk: str):
+        if not self._started:
+            raise RuntimeError("Response stream must be started before writing.")
+        if self._closed:
+            raise RuntimeError("Response stream has been closed.")
+        if chunk:
+            self._write(chunk.encode("utf-8"))
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._close()
+
+    @abstractmethod
+    def _start(self, status_code: int, headers: Dict[str, str]): ...
+
+    @abstractmethod
+    def _write(self, data: bytes): ...
+
+    def _close(self):
+        pass
+
+
+class LocalResponseStream(ResponseStream):
+    """
+    A stand-in for a real response stream, which keeps everything written to it in memory, along with when each
+    chunk arrived.  Useful for running and testing the streaming handler without AWS.
+    """
+
+    def __init__(self):
+        super(LocalResponseStream, self).__init__()
+        self.status_code: Optional[int] = None
+        self.headers: Dict[str, str] = dict()
+        # Each chunk, and the time.perf_counter() at which it was written
+        self.chunks: List[Tuple[bytes, float]] = []
+        self.started_at: Optional[float] = None
+
+    @property
+    def body(self) -> str:
+        return b"".join(chunk for chunk, _ in self.chunks).decode("utf-8")
+
+    @property
+    def time_to_first_byte(self) -> Optional[float]:
+        """
+        The time between the stream being started and its first body chunk being written, in seconds.
+        """
+        return self.chunks[0][1] - self.started_at if self.chunks else None
+
+    def _start(self, status_code: int, headers: Dict[str, str]):
+        self.status_code = status_code
+        self.headers = dict(headers)
+        self.started_at = time.perf_counter()
+
+    def _write(self, data: bytes):
+        self.chunks.append((data, time.perf_counter()))
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-from Interfaces import JSONable
+from Interfaces import JSONable, JSONStreamable
+from Lambda.ResponseStream import ResponseStream
 from Errors import APIError, AWSError, ExecutionError
 from Utilty import DictUtils, TimeUtils
 
 import json
-from typing import Optional, Union, Dict, Any, Type, List
+from typing import Optional, Union, Dict, Any, Type, List, Iterable
 from datetime import datetime
 
 _QueryValue = Union[str, int, float, bool, datetime, dict]
@@ -14,11 +15,20 @@ QueryValue = Union[_QueryValue, Type[_QueryValue]]
 
 class Wrapper:
 
-    def __init__(self, event: dict, context: dict, verbose: bool = False):
-        self._result: Optional[dict] = None
+    def __init__(self, event: dict, context: dict, verbose: bool = False, stream: Optional[ResponseStream] = None):
+        """
+        :param event: The Lambda event.
+        :param context: The Lambda context.
+        :param verbose: Whether to log the event, the arguments and the result.
+        :param stream: Optional.  If given, the response is written to this stream as it is serialized, in chunks,
+        instead of being returned as a single body string (see ResponseStream).
+        """
+        self._result: Optional[Union[dict, JSONStreamable]] = None
         self._status_code: Optional[int] = None
         self.args: LambdaArguments = LambdaArguments.parse_event(event)
+        self.context = context
         self._verbose = verbose
+        self._stream = stream
         self.response_headers = {"Content-Type": "application/json"}
         if verbose:
             print("EVENT = " + json.dumps(event))
@@ -28,9 +38,19 @@ class Wrapper:
     def result(self) -> dict:
         return self._result
 
+    @property
+    def is_streaming(self) -> bool:
+        return self._stream is not None
+
     def set_result(self, result: Union[dict, JSONable], status_code: int = 200):
-        self._result = result.to_json() if isinstance(result, JSONable) else result
         self._status_code = status_code
+        if self.is_streaming and isinstance(result, JSONStreamable):
+            # Serialized piece by piece when the response is written
+            self._result = result
+            if self._verbose:
+                print(f"Set result ({self._status_code}): streaming {type(result).__name__}")
+            return
+        self._result = result.to_json() if isinstance(result, JSONable) else result
         if self._verbose:
             print(f"Set result ({self._status_code}): {json.dumps(self._result)}")
 
@@ -42,53 +62,68 @@ class Wrapper:
 
     def __exit__(self, exc_type, exc_value, tb):
         if exc_type == ExecutionError:
-            self._result = {
-                "statusCode": exc_value.http_status_code,
-                "headers": self.response_headers,
-                "body": json.dumps(exc_value.to_json())
-            }
-            print(f"ERROR: {json.dumps(exc_value.to_json())}")
+            status_code, chunks = exc_value.http_status_code, [json.dumps(exc_value.to_json())]
+            print(f"ERROR: {chunks[0]}")
         elif exc_type is not None:
             e = ExecutionError.wrap(exc_value)
-            self._result = {
-                "statusCode": e.http_status_code,
-                "headers": self.response_headers,
-                "body": json.dumps(e.to_json())
-            }
-            print(f"ERROR: {json.dumps(e.to_json())}")
+            status_code, chunks = e.http_status_code, [json.dumps(e.to_json())]
+            print(f"ERROR: {chunks[0]}")
+        elif isinstance(self._result, JSONStreamable):
+            status_code, chunks = self._status_code if self._status_code is not None else 200, \
+                                  self._result.json_chunks()
         elif self._result is not None:
+            status_code, chunks = self._status_code if self._status_code is not None else 200, \
+                                  [json.dumps(self._result)]
+        else:
+            status_code, chunks = 204, ["{}"]
+
+        if self.is_streaming:
+            self._write_stream(status_code, chunks)
             self._result = {
-                "statusCode": self._status_code if self._status_code is not None else 200,
-                "headers": self.response_headers,
-                "body": json.dumps(self._result)
+                "statusCode": status_code,
+                "headers": self.response_headers
             }
         else:
             self._result = {
-                "statusCode": 204,
+                "statusCode": status_code,
                 "headers": self.response_headers,
-                "body": "{}"
+                "body": "".join(chunks)
             }
         if self._verbose:
             print(f"Result = {json.dumps(self._result)}")
         return True
 
+    def _write_stream(self, status_code: int, chunks: Iterable[str]):
+        self._stream.start(status_code, self.response_headers)
+        try:
+            for chunk in chunks:
+                self._stream.write(chunk)
+        except Exception as e:
+            # The status has already been sent, so all that can be done is to cut the response short
+            print(f"ERROR: Response stream interrupted: {json.dumps(ExecutionError.wrap(e).to_json())}")
+        finally:
+            self._stream.close()
+
 
 class LambdaArguments:
 
     def __init__(self, path_params: Dict[str, str],
                  query_params: Dict[str, str],
                  headers: Dict[str, str],
-                 body: dict):
+                 body: dict,
+                 batch: Optional[List[Any]] = None):
         self.path_params = path_params if path_params else dict()
         self.query_params = query_params if query_params else dict()
         self.headers = headers if headers else dict()
         self.body = body if body else dict()
+        self.batch = batch
 
     def __str__(self) -> str:
         return f"Path params ({len(self.path_params)}): [{','.join(self.path_params.keys())}] | " \
                f"Query params ({len(self.query_params)}): [{','.join(self.query_params.keys())}] | " \
                f"Headers ({len(self.headers)}): [{','.join(self.headers.keys())}] | " \
-               f"Body ({len(self.body)}): [{','.join(self.body.keys())}]"
+               f"Body ({len(self.body)}): [{','.join(self.body.keys())}]" + \
+               (f" | Batch ({len(self.batch)})" if self.batch is not None else "")
 
     @staticmethod
     def parse_event(event: dict) -> LambdaArguments:
@@ -99,7 +134,27 @@ class LambdaArguments:
             path_params=DictUtils.get_or_default(event, "pathParameters", default=dict()),
             query_params=DictUtils.get_or_default(event, "queryStringParameters", default=dict()),
             headers=DictUtils.get_or_default(event, "headers", default=dict()),
-            body=body,
+            body=body if not isinstance(body, list) else dict(),
+            batch=body if isinstance(body, list) else None
+        )
+
+    @property
+    def is_batch(self) -> bool:
+        return self.batch is not None
+
+    def for_batch_item(self, item: dict) -> LambdaArguments:
+        """
+        Builds the arguments for a single item of a batch request.  All keys of the item except "args" override the
+        query parameters of this request, and "args" (if present) is used as the body.
+
+        :param item: The batch item.
+        :return: The arguments of the item, as if it had been requested on its own.
+        """
+        return LambdaArguments(
+            path_params=self.path_params,
+            query_params={**self.query_params, **{k: str(v) for k, v in item.items() if k != "args"}},
+            headers=self.headers,
+            body=DictUtils.get_or_default(item, "args", default=dict())
         )
 
     def get_only_path_param(self) -> str:
@@ -107,6 +162,11 @@ class LambdaArguments:
             return list(self.path_params.values())[0]
         raise APIError(f"Must have exactly one path parameter, has {len(self.path_params)}.")
 
+    def get_header(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        # Header names are case-insensitive, and API Gateway may pass them in either case
+        key = key.lower()
+        return next((v for k, v in self.headers.items() if k.lower() == key), default)
+
     def get_query(self, key: str, val_type: Type[QueryValue] = str,
                   delimiter: str = None,
                   default: QueryValue = None) -> Union[QueryValue, List[QueryValue], None]:
@@ -1 +1,2 @@
+from Lambda.ResponseStream import ResponseStream, LocalResponseStream
 from Lambda.Wrapper import Wrapper, LambdaArguments
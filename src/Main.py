@@ -1,46 +1,261 @@
-from Lambda import Wrapper
+from Lambda import Wrapper, LambdaArguments, ResponseStream
 from Games.Mezzonic import MezzonicGame
 from Games import *
 from Errors import *
+from PathFinding import Solution, SearchBudget
+from Interfaces import JSONable
 from ResultsCache import RESULTS_CACHE
 
-from typing import Dict, Type
+from typing import Dict, Type, List, Union, Optional, Any, Callable
+import os
 
 SUPPORTED_GAMES: Dict[str, Type[Game]] = {
     g.name(): g for g in [MezzonicGame]
 }
 
+BATCH_LIMIT = 1000
 
-def main(event, context):
+VERBOSE_FORMAT = "verbose"
+COMPACT_FORMAT = "compact"
+PACKED_FORMAT = "packed"
+RESPONSE_FORMATS = [VERBOSE_FORMAT, COMPACT_FORMAT, PACKED_FORMAT]
+FORMAT_MEDIA_TYPES: Dict[str, str] = {
+    COMPACT_FORMAT: "application/vnd.protolock.compact+json",
+    PACKED_FORMAT: "application/vnd.protolock.packed+json"
+}
+
+# Searches stop this many seconds before the Lambda would time out, leaving time to respond
+BUDGET_RESERVE_SECONDS = float(os.environ.get("SEARCH_BUDGET_RESERVE_SECONDS", 1))
+# Server-wide limits on every search, which requests may lower but not raise
+MAX_SEARCH_SECONDS = float(os.environ["SEARCH_MAX_SECONDS"]) if os.environ.get("SEARCH_MAX_SECONDS") else None
+MAX_SEARCH_NODES = int(os.environ["SEARCH_MAX_NODES"]) if os.environ.get("SEARCH_MAX_NODES") else None
+MAX_SEARCH_MEMORY_MB = float(os.environ["SEARCH_MAX_MEMORY_MB"]) if os.environ.get("SEARCH_MAX_MEMORY_MB") else None
+
+# Runs a game's algorithm within a budget
+Solver = Callable[[Game, Optional[SearchBudget]], Solution]
+
+
+def run_game(game: Game, budget: Optional[SearchBudget]) -> Solution:
+    return game.solve(budget)
+
+
+def main(event, context, solver: Solver = run_game):
+    """
+    :param solver: Optional.  Runs the algorithm when a result is not already known (eg. a server may run it in
+    another process).  Defaults to running it here.
+    """
     with Wrapper(event, context, verbose=True) as w:
+        respond(w, solver)
+
+    return w.result
 
-        w.add_cors_header()
 
-        game_name: str = w.args.get_query("game", val_type=str)
-        if not game_name or game_name not in SUPPORTED_GAMES:
-            raise ExecutionError(ErrorType.BAD_REQUEST,
-                                 f"Unsupported game '{game_name}'.", {})
+def main_streaming(event, stream: ResponseStream, context, solver: Solver = run_game):
+    """
+    The same as main(), but writes the response to the given stream as it is serialized, so that the client
+    starts receiving a long solution before all of it has been built.
 
-        game = SUPPORTED_GAMES[game_name].prepare(w.args)
+    :return: The status code and headers of the response.
+    """
+    with Wrapper(event, context, verbose=True, stream=stream) as w:
+        respond(w, solver)
 
-        conditions = game.conditions()
+    return w.result
 
-        if conditions in RESULTS_CACHE:
-            print(f"RESULT FOUND IN CACHE!")
 
-        else:
-            RESULTS_CACHE[conditions] = game.solve()
+def respond(w: Wrapper, solver: Solver = run_game):
+    w.add_cors_header()
 
-        result = RESULTS_CACHE[conditions]
+    if w.args.is_batch:
+        w.set_result({"results": solve_batch(w.args, w.context, solver)})
 
-        #
+    else:
+        response_format = get_response_format(w.args)
+        include_stats = w.args.get_query("stats", val_type=bool, default=False)
+        game = prepare_game(w.args)
+        game.algorithm.stats.enabled = include_stats
+        result = solve(game, prepare_budget(w.args, w.context),
+                       fallback=w.args.get_query("fallback", val_type=bool, default=False), solver=solver)
 
         print(f"Found solution: "
-              f"{' -> '.join(str(transition.value) for state, transition in result if transition is not None)}")
+              f"{' -> '.join(str(transition.value) for transition in result.transitions())} "
+              f"[{game.algorithm.stats}]")
 
-        w.set_result(result)
+        if game.algorithm.stats.source is not None:
+            w.response_headers["X-Solution-Source"] = game.algorithm.stats.source
+        if include_stats:
+            result = result.with_stats(game.algorithm.stats.to_json())
+        if response_format in FORMAT_MEDIA_TYPES:
+            w.response_headers["Content-Type"] = FORMAT_MEDIA_TYPES[response_format]
+        w.set_result(format_solution(result, response_format))
 
-    return w.result
+
+def get_response_format(args: LambdaArguments) -> str:
+    """
+    Gets the format the solution should be sent in:  the 'format' query parameter if given, otherwise the first of
+    FORMAT_MEDIA_TYPES found in the Accept header, otherwise the verbose format.
+    """
+    response_format = args.get_query("format", val_type=str)
+    if response_format is None:
+        accepted = [media_type.split(";")[0].strip() for media_type in args.get_header("Accept", "").split(",")]
+        response_format = next((f for media_type in accepted
+                                for f, t in FORMAT_MEDIA_TYPES.items() if media_type == t), VERBOSE_FORMAT)
+
+    if response_format not in RESPONSE_FORMATS:
+        raise ExecutionError(ErrorType.BAD_REQUEST, f"Unsupported response format '{response_format}'.",
+                             {"given": response_format, "supported": RESPONSE_FORMATS})
+    return response_format
+
+
+def format_solution(solution: Solution, response_format: str) -> JSONable:
+    """
+    The verbose format includes every intermediate state of the solution.  The compact format includes only the
+    initial state and the moves to make, and the packed format also encodes both as densely as possible.
+    """
+    if response_format == VERBOSE_FORMAT:
+        return solution
+    return solution.compact(packed=response_format == PACKED_FORMAT)
+
+
+def prepare_game(args: LambdaArguments) -> Game:
+    game_name: str = args.get_query("game", val_type=str)
+    if not game_name or game_name not in SUPPORTED_GAMES:
+        raise ExecutionError(ErrorType.BAD_REQUEST,
+                             f"Unsupported game '{game_name}'.", {})
+
+    return SUPPORTED_GAMES[game_name].prepare(args)
+
+
+def prepare_budget(args: LambdaArguments, context: Any) -> SearchBudget:
+    """
+    Creates the budget for solving a request:  the time the Lambda has left, and the server-wide limits, lowered
+    by the 'max_seconds' and 'max_nodes' query parameters if given.
+    """
+    max_seconds = args.get_query("max_seconds", val_type=float)
+    max_nodes = args.get_query("max_nodes", val_type=int)
+    for key, value in [("max_seconds", max_seconds), ("max_nodes", max_nodes)]:
+        if value is not None and value <= 0:
+            raise ExecutionError(ErrorType.BAD_REQUEST, f"Invalid '{key}'.", {"given": {key: value}})
+
+    return SearchBudget.from_context(context, reserve_seconds=BUDGET_RESERVE_SECONDS,
+                                     max_seconds=_lowest(max_seconds, MAX_SEARCH_SECONDS),
+                                     max_nodes=_lowest(max_nodes, MAX_SEARCH_NODES),
+                                     max_memory_mb=MAX_SEARCH_MEMORY_MB)
+
+
+def solve(game: Game, budget: Optional[SearchBudget] = None, fallback: bool = False,
+          solver: Solver = run_game) -> Solution:
+    """
+    Solves the game from the solution table or the results cache if possible, otherwise by running its algorithm
+    within the given budget.  If the budget runs out, the error (which holds the best partial path found) is
+    raised, unless 'fallback' is set and the game has a fallback algorithm, whose solution is returned instead.
+    Neither is cached, since they depend on the budget.
+    """
+    stats = game.algorithm.stats
+
+    with stats.phase("precomputed"):
+        result = game.precomputed_solution()
+
+    if result is not None:
+        print(f"RESULT FOUND IN SOLUTION TABLE!")
+        stats.source = "table"
+        return result
+
+    with stats.phase("cache"):
+        # Results are cached for the canonical form of the game, so that they are shared by all equivalent games
+        conditions, symmetry = game.canonical_conditions()
+
+        try:
+            result = RESULTS_CACHE.get(conditions)
+        except ExecutionError:
+            print(f"FAILURE FOUND IN CACHE! {RESULTS_CACHE.stats()}")
+            stats.source = "cache"
+            raise
+
+    if result is not None:
+        print(f"RESULT FOUND IN CACHE! {RESULTS_CACHE.stats()}")
+        stats.source = "cache"
+        return result.transformed(symmetry.inverse() if symmetry is not None else None)
+
+    stats.source = "search"
+    try:
+        with stats.phase("solve"):
+            result = solver(game, budget)
+    except ExecutionError as e:
+        if e.type != ErrorType.BUDGET_EXCEEDED:
+            RESULTS_CACHE.put_failure(conditions, e)
+            raise
+
+        algorithm = game.fallback_algorithm() if fallback else None
+        if algorithm is None:
+            raise
+        print(f"BUDGET EXCEEDED, FALLING BACK TO '{algorithm.name()}': {e}")
+        stats.source = "fallback"
+        with stats.phase("fallback"):
+            return algorithm.solve(game.initial_state)
+
+    RESULTS_CACHE.put(conditions, result.transformed(symmetry))
+    return result
+
+
+def solve_batch(args: LambdaArguments, context: Any = None, solver: Solver = run_game) -> List[dict]:
+    """
+    Solves every board of a batch request.  Each item of the batch is either a board string, or an object whose
+    keys override the request's query parameters (eg. "board", "algorithm") and whose "args" are the algorithm
+    arguments.  Identical conditions are only solved once, and a failure only affects the items it belongs to.
+
+    :param args: The arguments of the batch request.
+    :param context: Optional.  The Lambda context, whose remaining time bounds each item's search.
+    :param solver: Optional.  Runs the algorithm of each item whose result is not already known.
+    :return: One result per item, in the order given.  Each contains either the solution or the error.
+    """
+    if len(args.batch) > BATCH_LIMIT:
+        raise ExecutionError(ErrorType.BAD_REQUEST, "Too many boards in batch.",
+                             {"given": {"count": len(args.batch)}, "limit": BATCH_LIMIT})
+
+    solved: Dict[Conditions, Union[Solution, ExecutionError]] = dict()
+    results: List[dict] = []
+
+    for item in args.batch:
+        try:
+            if isinstance(item, str):
+                item = {"board": item}
+            if not isinstance(item, dict):
+                raise ExecutionError(ErrorType.BAD_REQUEST, "Invalid batch item.", {"given": item})
+
+            item_args = args.for_batch_item(item)
+            response_format = get_response_format(item_args)
+            game = prepare_game(item_args)
+            conditions = game.conditions()
+
+            if conditions not in solved:
+                try:
+                    solved[conditions] = solve(game, prepare_budget(item_args, context),
+                                               fallback=item_args.get_query("fallback", val_type=bool, default=False),
+                                               solver=solver)
+                except ExecutionError as e:
+                    solved[conditions] = e
+
+            result = solved[conditions]
+            if isinstance(result, ExecutionError):
+                raise result
+
+            results.append({"solution": format_solution(result, response_format).to_json()})
+
+        except ExecutionError as e:
+            results.append({"error": e.to_json()})
+        except Exception as e:
+            results.append({"error": ExecutionError.wrap(e).to_json()})
+
+    print(f"Solved batch of {len(results)} boards "
+          f"({len(solved)} distinct, {sum(1 for r in results if 'error' in r)} failed)")
+
+    return results
+
+
+def _lowest(*values: Optional[float]) -> Optional[float]:
+    given = [v for v in values if v is not None]
+    return min(given) if given else None
 
 
 if __name__ == '__main__':
@@ -1,5 +1,7 @@
 from PathFinding.PathFindingState import PathFindingState, StateTransition
 from PathFinding.Solution import Solution
+from PathFinding.SearchStats import SearchStats
+from PathFinding.SearchBudget import SearchBudget
 from Errors import ExecutionError, ErrorType
 from Interfaces import Comparable, ComparableType
 from Utilty import IterableUtils
@@ -15,13 +17,27 @@ class Algorithm(ABC, Generic[TState, TTransition, ComparableType]):
 
     def __init__(self, **kwargs):
         self.kwargs = kwargs
+        self.stats = SearchStats()
 
     @classmethod
     @abstractmethod
     def name(cls) -> str: ...
 
     @abstractmethod
-    def solve(self, initial_state: TState) -> Solution: ...
+    def solve(self, initial_state: TState, budget: Optional[SearchBudget] = None) -> Solution:
+        """
+        :param initial_state: The state to find a path to the goal from.
+        :param budget: Optional.  The limits the search must stay within.  Once they are exceeded, the search stops
+        and raises an ExecutionError (see SearchBudget.error()) holding the best partial path it found.
+        """
+        ...
+
+    @property
+    def complete(self) -> bool:
+        """
+        :return: Whether the algorithm only fails to find a path (within any limit it is given) when none exists.
+        """
+        return False
 
     def get_score(self, state: TState) -> Comparable:
         return state.score
@@ -1,9 +1,11 @@
-from PathFinding.PathFindingState import PathFindingState, StateTransition
+from PathFinding.PathFindingState import PathFindingState, StateTransition, Successor
 from PathFinding.Solution import Solution
 from PathFinding.Algorithms.Algorithm import Algorithm
 from Errors import ExecutionError, ErrorType
 from Interfaces import Comparable, ComparableType
-from Utilty import IterableUtils
+from PathFinding.StateTable import StateTable
+from PathFinding.SearchBudget import SearchBudget
+from Utilty.Frontier import IdBucketFrontier
 
 from abc import ABC, abstractmethod
 from typing import Optional, Iterable, Tuple, Collection, List, Type, Dict, Generic, TypeVar, Hashable, Set, Callable
@@ -12,10 +14,16 @@ TState = TypeVar('TState', bound=PathFindingState)
 TTransition = TypeVar('TTransition', bound=StateTransition)
 
 
-class StateMapValue(Generic[TState]):
+class StateMapValue(Generic[TTransition]):
+    """
+    The best known route to a state:  the id of the state before it, the move that led to it, and its distance
+    from the initial state.
+    """
 
-    def __init__(self, state: TState, previous: Optional[TState], move: Optional[StateTransition], distance: int):
-        self.state = state
+    __slots__ = ("state_id", "previous", "move", "distance")
+
+    def __init__(self, state_id: int, previous: int, move: Optional[TTransition], distance: int):
+        self.state_id = state_id
         self.previous = previous
         self.move = move
         self.distance = distance
@@ -24,98 +32,128 @@ class StateMapValue(Generic[TState]):
 class BasicAlgorithm(Algorithm[TState, TTransition, Tuple[int, int]], Generic[TState, TTransition]):
     """
     Basically A*
+
+    Every state found is interned in a StateTable, which gives it an integer id and keeps its route in compact
+    columns.  The open list holds only state ids, and each state is rebuilt from its key when it is popped, so
+    no state is kept as an object beyond the one being expanded.  Adjacent states are found as successors, which are
+    ranked and interned by their scores and keys without being built at all.
     """
 
     def __init__(self, **kwargs):
         super(BasicAlgorithm, self).__init__(**kwargs)
-        self._visited: Set[TState] = set()
-        self._open_list: List[Tuple[TState, Tuple[int, int]]] = []
-        self._state_map: Dict[TState, StateMapValue] = dict()
+        self._states: StateTable[TState, TTransition] = StateTable()
+        self._open_list: IdBucketFrontier = self._create_open_list()
+        self._initial_state: Optional[TState] = None
 
     @classmethod
     def name(cls) -> str:
         return "basic"
 
-    def solve(self, initial_state: TState) -> Solution:
-        self._add_to_open_list(initial_state)
-        self._add_to_state_map(initial_state, None, None, 0)
+    def solve(self, initial_state: TState, budget: Optional[SearchBudget] = None) -> Solution:
+        try:
+            with self.stats.phase("search"):
+                goal_id = self._search(initial_state, budget if budget is not None else SearchBudget())
+        finally:
+            self.stats.peak_visited = self._states.closed_count()
 
-        while len(self._open_list) > 0:
-            current = self._pop_item_from_open_list()
+        with self.stats.phase("path"):
+            return self._construct_path(goal_id)
 
-            if self._check_for_goal(current):
-                return self._construct_path(current)
+    def _search(self, initial_state: TState, budget: SearchBudget) -> int:
+        stats = self.stats
+        counting = stats.enabled
 
-            if self._has_been_visited(current):
-                continue
+        self._initial_state = initial_state
+        initial_id = self._add_to_state_map(initial_state.state_key(), StateTable.NONE, None, 0)
+        self._add_to_open_list(initial_id, Successor.of(initial_state))
+        # The expanded state closest to the goal, reported if the budget runs out
+        best_id, best_score = initial_id, initial_state.score
 
-            # print(current.render() + "\n")
+        while self._open_list:
+            current_id, current = self._pop_item_from_open_list()
 
-            self._add_to_visited(current)
-            state_value = self._get_state_value(current)
+            if self._check_for_goal(current):
+                return current_id
 
-            # TODO: REMOVE ME
-            # if state_value.distance >= 5:
-            #     continue
+            if self._has_been_visited(current_id):
+                if counting:
+                    stats.skipped += 1
+                continue
 
-            for state, transition in self._get_adjacent_states(current):
-                # print(state.render() + "\n")
-                self._add_to_state_map(state, current, transition, state_value.distance + 1)
-                if self._has_been_visited(state):
+            if budget.spend():
+                raise budget.error(self._construct_path(best_id), best_score)
+
+            self._add_to_visited(current_id)
+            distance = self._states.distance(current_id)
+            if counting:
+                stats.expanded += 1
+            if current.score < best_score:
+                best_id, best_score = current_id, current.score
+
+            for successor in self._get_successors(current, current_id):
+                state_id = self._add_to_state_map(successor.key, current_id, successor.transition, distance + 1)
+                if self._has_been_visited(state_id):
+                    if counting:
+                        stats.skipped += 1
                     continue
-                self._add_to_open_list(state)
+                self._add_to_open_list(state_id, successor)
+
+            if counting:
+                stats.observe_frontier(len(self._open_list))
 
         raise ExecutionError(ErrorType.NO_PATH_FOUND, "Unable to find path for the given initial state.")
 
-    def _add_to_state_map(self, state: TState, previous: Optional[TState],
-                          transition: Optional[TTransition], value: int):
-        if state not in self._state_map or self._get_state_value(state).distance > value:
-            self._state_map[state] = StateMapValue(state, previous, transition, value)
+    def _add_to_state_map(self, key: Hashable, previous: int, transition: Optional[TTransition], value: int) -> int:
+        state_id = self._states.intern(key, previous, transition, value)
+        if self._states.distance(state_id) > value:
+            self._states.update(state_id, previous, transition, value)
+        return state_id
 
-    def _add_to_open_list(self, state: TState):
-        score = self.get_score(state)
-        i = IterableUtils.binary_search_by(self._open_list, score,
-                                           lambda x: x[1])
-        if i < 0:
-            i = ~i
-        self._open_list.insert(i, (state, score))
+    def _create_open_list(self) -> IdBucketFrontier:
+        # Scores are small integers, and equal scores favour the most recently found state
+        return IdBucketFrontier(lifo=True)
 
-    def _add_to_visited(self, state: TState):
-        self._visited.add(state)
+    def _add_to_open_list(self, state_id: int, successor: Successor):
+        priority = self._get_priority(state_id, successor)
+        existing = self._open_list.priority(state_id)
+        if existing is None or priority < existing:
+            self._open_list.push(state_id, priority, key=state_id)
+
+    def _add_to_visited(self, state_id: int):
+        self._states.close(state_id)
 
     def _check_for_goal(self, state: TState) -> bool:
         return state.is_goal()
 
-    def _get_adjacent_states(self, state: TState) -> Iterable[Tuple[TState, TTransition]]:
-        yield from state.get_adjacent_states()
+    def _get_successors(self, state: TState, state_id: int) -> Iterable[Successor]:
+        successors = state.get_successors()
+        if self.stats.enabled:
+            successors = list(successors)
+            self.stats.generated += len(successors)
+        return successors
 
-    def _pop_item_from_open_list(self) -> TState:
-        return self._open_list.pop(0)[0]
+    def _pop_item_from_open_list(self) -> Tuple[int, TState]:
+        state_id = self._open_list.pop()
+        return state_id, self._initial_state.state_from_key(self._states.key(state_id))
 
     def _get_state_value(self, state: TState) -> StateMapValue:
-        try:
-            return self._state_map[state]
-        except KeyError:
-            return StateMapValue(state, None, None, 0)
+        state_id = self._states.id_of(state.state_key())
+        if state_id is None:
+            return StateMapValue(StateTable.NONE, StateTable.NONE, None, 0)
+        return StateMapValue(state_id, self._states.parent(state_id), self._states.move(state_id),
+                             self._states.distance(state_id))
 
-    def _has_been_visited(self, state: TState) -> bool:
-        return state in self._visited
+    def _has_been_visited(self, state_id: int) -> bool:
+        return self._states.is_closed(state_id)
 
     #
 
-    def _construct_path(self, state: TState) -> Solution:
-        path: List[Tuple[TState, TTransition]] = []
-        current: TState = state
-        while current is not None:
-            state_value = self._get_state_value(current)
-            path.append((current, state_value.move))
-            current = state_value.previous
-
-        return Solution(reversed(path))
-
-    def get_score(self, state: TState) -> Tuple[int, int]:
-        try:
-            return state.score + self._get_state_value(state).distance
-        except KeyError:
-            return state.score
+    def _construct_path(self, state_id: int) -> Solution:
+        return Solution.follow(self._initial_state, self._states.path(state_id))
 
+    def _get_priority(self, state_id: int, successor: Successor) -> int:
+        """
+        Gets the priority to push the given (interned) successor onto the open list with:  its score plus its
+        distance from the initial state.
+        """
+        return successor.score + self._states.distance(state_id)
@@ -1,4 +1,4 @@
-from PathFinding.PathFindingState import PathFindingState, StateTransition
+from PathFinding.PathFindingState import PathFindingState, StateTransition, Successor
 from PathFinding.Algorithms.BasicAlgorithm import BasicAlgorithm
 
 from typing import Optional, Iterable, Tuple, Collection, List, Type, Dict, Generic, TypeVar
@@ -13,55 +13,56 @@ class LookaheadAlgorithm(BasicAlgorithm, Generic[TState]):
     evaluating the score of any particular state.  This results in many more states to be calculated,
     but it may lead to better results where a transition leads to a temporary increase in score, but is
     still optimal because of better subsequent scores.
+
+    States along the lookahead are only built when their own successors are needed, so the last level of the
+    lookahead (the bulk of it) is scored without building any states.  Successors are cheap enough to find again
+    that they aren't cached; only each state's lookahead score is.
     """
 
     def __init__(self, lookahead_steps: int = 1, **kwargs):
         super(LookaheadAlgorithm, self).__init__(lookahead_steps=lookahead_steps, **kwargs)
         self._lookahead = lookahead_steps
-        self._adjacency_cache: Dict[TState, List[Tuple[TState, TTransition]]] = dict()
-        self._score_cache: Dict[TState, int] = dict()
+        # Keyed by state id
+        self._score_cache: Dict[int, int] = dict()
 
     @classmethod
     def name(cls) -> str:
         return "lookahead"
 
-    def get_score(self, state: TState) -> int:
-
-        def _score(current: TState, depth: int) -> int:
-            if current in self._score_cache:
-                return self._score_cache[current]
-
-            state_value = self._get_state_value(current)
+    def _get_priority(self, state_id: int, successor: Successor) -> int:
+        return self._lookahead_score(successor, state_id, self._lookahead)
 
-            if current.score == 0:
-                return state_value.distance
+    def _lookahead_score(self, current: Successor, current_id: int, depth: int) -> int:
+        if current_id in self._score_cache:
+            if self.stats.enabled:
+                self.stats.cache_hit("score")
+            return self._score_cache[current_id]
 
-            if depth <= 0:
-                if current not in self._score_cache:
-                    self._score_cache[current] = current.score + state_value.distance
-                return self._score_cache[current]
+        distance = self._states.distance(current_id)
 
-            best: Optional[TState] = None
-            for s, transition in self._get_adjacent_states(current):
-                if s == state_value.previous:
-                    continue
-                if s not in self._state_map or self._get_state_value(s).distance > state_value.distance + 1:
-                    self._add_to_state_map(s, current, transition, state_value.distance + 1)
-                if self._has_been_visited(s):
-                    continue
-                # RECURSIVE STEP FOR ITERATING THROUGH LOOKAHEAD
-                if best is None or best.score + state_value.distance > _score(s, depth - 1):
-                    best = s
+        if current.score == 0:
+            return distance
 
-            self._score_cache[current] = best.score + self._get_state_value(best).distance
-            return self._score_cache[current]
+        if depth <= 0:
+            self._score_cache[current_id] = current.score + distance
+            return self._score_cache[current_id]
 
-        try:
-            return _score(state, self._lookahead)
-        except Exception as e:
-            raise e
+        previous = self._states.parent(current_id)
+        # The score and id of the best successor found
+        best: Optional[Tuple[int, int]] = None
+        for s in self._get_successors(current.state, current_id):
+            s_id = self._add_to_state_map(s.key, current_id, s.transition, distance + 1)
+            if s_id == previous:
+                continue
+            if self._has_been_visited(s_id):
+                continue
+            # RECURSIVE STEP FOR ITERATING THROUGH LOOKAHEAD
+            if best is None or best[0] + distance > self._lookahead_score(s, s_id, depth - 1):
+                best = (s.score, s_id)
 
-    def _get_adjacent_states(self, state: TState) -> Iterable[Tuple[TState, TTransition]]:
-        if state not in self._adjacency_cache:
-            self._adjacency_cache[state] = list(state.get_adjacent_states())
-        return self._adjacency_cache[state]
+        if best is None:
+            # Every adjacent state has already been visited
+            self._score_cache[current_id] = current.score + distance
+        else:
+            self._score_cache[current_id] = best[0] + self._states.distance(best[1])
+        return self._score_cache[current_id]
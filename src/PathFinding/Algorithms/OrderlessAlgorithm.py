@@ -2,30 +2,17 @@ from __future__ import annotations
 
 from PathFinding.Solution import Solution
 from PathFinding.PathFindingState import PathFindingState, StateTransition, ComparableStateTransition
-from PathFinding.Algorithms.BasicAlgorithm import BasicAlgorithm, StateMapValue
+from PathFinding.Algorithms.BasicAlgorithm import BasicAlgorithm
 from PathFinding.Algorithms.LookaheadAlgorithm import LookaheadAlgorithm
+from Utilty import BitUtils
 
-from typing import Optional, Iterable, Tuple, Collection, List, Type, Dict, Generic, TypeVar, Set
+from typing import Optional, Iterable, Tuple, Collection, List, Type, Dict, Generic, TypeVar, Set, Hashable
 
 TState = TypeVar('TState', bound=PathFindingState)
 TTransition = TypeVar('TTransition', bound=StateTransition)
 TCompTransition = TypeVar('TCompTransition', bound=ComparableStateTransition)
 
 
-class OrderlessStateMapValue(StateMapValue, Generic[TCompTransition]):
-
-    def __init__(self, state: TState, previous: Optional[TState], moves: Tuple[TCompTransition, ...]):
-        super(OrderlessStateMapValue, self).__init__(
-            state, previous, moves[-1] if len(moves) > 0 else None, len(moves))
-        self.ordered_moves = moves
-        self.moves = tuple(sorted(moves))
-
-    def append(self, state: TState, move: TCompTransition) -> OrderlessStateMapValue:
-        if move in self.ordered_moves:
-            return OrderlessStateMapValue(state, self.state, tuple(m for m in self.ordered_moves if m != move))
-        return OrderlessStateMapValue(state, self.state, self.ordered_moves + (move,))
-
-
 class OrderlessAlgorithm(BasicAlgorithm[TState, TCompTransition], Generic[TState, TCompTransition]):
     """
     This algorithm treats all combinations of transitions as identical, regardless of the order they are in.
@@ -35,55 +22,45 @@ class OrderlessAlgorithm(BasicAlgorithm[TState, TCompTransition], Generic[TState
     To accomplish this, this algorithm only replaces how interactions occur with the list of visited states and the
     mapping of states to their optimal route from the starting state.  Otherwise, everything else is leveraged
     as-is from BasicAlgorithm.
+
+    The combination of transitions leading to each state is kept as a mask of the ids the state table gives each
+    transition, so that adding a transition is a single XOR, which also cancels out a repeated transition.
     """
 
     def __init__(self, **kwargs):
         super(OrderlessAlgorithm, self).__init__(**kwargs)
-        self._visited_combinations: Dict[Tuple[TCompTransition, ...], TState] = dict()
+        # Indexed by state id
+        self._combinations: List[int] = []
+        self._visited_combinations: Set[int] = set()
 
     @classmethod
     def name(cls) -> str:
         return "orderless"
 
-    def _has_been_visited(self, state: TState) -> bool:
-        return super()._has_been_visited(state) or \
-               self._get_path_combination(state) in self._visited_combinations
-        # return self._get_path_combination(state) in self._visited_combinations
-
-    def _add_to_visited(self, state: TState):
-        super()._add_to_visited(state)
-        self._visited_combinations[self._get_path_combination(state)] = state
-
-    def _get_path_combination(self, state: TState) -> Tuple[TCompTransition]:
-        return self._get_state_value(state).moves
-
-    def _add_to_state_map(self, state: TState, previous: Optional[TState],
-                          transition: Optional[TCompTransition], value: int):
-        # if state in self._state_map:
-        #     return
-        if transition is None:
-            self._state_map[state] = OrderlessStateMapValue(state, None, tuple())
-        else:
-            state_value = self._get_state_value(previous)
-            if state not in self._state_map or state_value.distance > value:
-                self._state_map[state] = state_value.append(state, transition)
-
-    def _get_state_value(self, state: TState) -> OrderlessStateMapValue[TCompTransition]:
-        try:
-            return self._state_map[state]
-        except KeyError:
-            return OrderlessStateMapValue(state, None, tuple())
-
-    def _construct_path(self, state: TState) -> Solution:
-        def _path() -> Iterable[Tuple[TState, Optional[TCompTransition]]]:
-            steps = self._get_state_value(state).moves
-            current = state
-            for step in reversed(steps):
-                yield current, step
-                current = current.transition(step)
-            yield current, None
-
-        return Solution(reversed(list(_path())))
+    def _has_been_visited(self, state_id: int) -> bool:
+        return super()._has_been_visited(state_id) or \
+               self._combinations[state_id] in self._visited_combinations
+
+    def _add_to_visited(self, state_id: int):
+        super()._add_to_visited(state_id)
+        self._visited_combinations.add(self._combinations[state_id])
+
+    def _add_to_state_map(self, key: Hashable, previous: int, transition: Optional[TCompTransition],
+                          value: int) -> int:
+        state_id = self._states.intern(key, previous, transition, value)
+        # Only the first combination found for each state is kept
+        if state_id == len(self._combinations):
+            combination = 0
+            if transition is not None:
+                combination = self._combinations[previous] ^ (1 << self._states.move_id(transition))
+                self._states.update(state_id, previous, transition, BitUtils.popcount(combination))
+            self._combinations.append(combination)
+        return state_id
+
+    def _construct_path(self, state_id: int) -> Solution:
+        combination = self._combinations[state_id]
+        return Solution.follow(self._initial_state,
+                               sorted(self._states.move_value(i) for i in BitUtils.iterate_bits(combination)))
 
 
 #
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+from PathFinding.PathFindingState import PathFindingState, StateTransition
+from PathFinding.Solution import Solution
+from PathFinding.SearchBudget import SearchBudget
+from PathFinding.Algorithms.Algorithm import Algorithm
+from Errors import ExecutionError, ErrorType
+from Utilty import ProcessUtils
+
+from abc import ABC, abstractmethod
+from multiprocessing.connection import wait, Connection
+from typing import Optional, List, Type, Dict, Tuple, Union, Any, TypeVar
+import multiprocessing
+import time
+
+TState = TypeVar('TState', bound=PathFindingState)
+TTransition = TypeVar('TTransition', bound=StateTransition)
+
+MemberSpec = Union[str, Dict[str, Any]]
+
+
+class PortfolioAlgorithm(Algorithm, ABC):
+    """
+    Runs several algorithms on the same state at once, each in its own process, and returns the first solution
+    found.  If a grace period is given, the members still running are given that long after the first solution to
+    find a shorter one, and the shortest is returned.  The members left running are then killed.
+
+    Which algorithm is fastest depends heavily on the state, so this turns spare cores into lower tail latency.
+    Members are given as algorithm names, or as {"algorithm": name, "args": {...}}.  A complete member (see
+    Algorithm.complete) finding that no path exists ends the portfolio too, since every member searches the same
+    state (so members should not be given limits).  An incomplete member failing to find a path is only a failure
+    of that member, and the others are waited for.  Which member won, and how each of them fared, is recorded in
+    the stats.
+
+    Members run in forked processes that report back through pipes (rather than a multiprocessing pool, whose
+    queues need shared memory that Lambda does not provide), so they start with this process's warm caches.
+    """
+
+    def __init__(self, members: Optional[List[MemberSpec]] = None, grace: float = 0, **kwargs):
+        super(PortfolioAlgorithm, self).__init__(**({"members": members} if members is not None else {}),
+                                                 **({"grace": grace} if grace else {}), **kwargs)
+        if grace < 0:
+            raise ValueError("Grace period must not be negative.")
+        self.grace = grace
+        # Each member's algorithm, arguments, and whether it is complete
+        self.members: List[Tuple[Type[Algorithm], dict, bool]] = \
+            [self._load_member(m) for m in (members if members is not None else self.default_members())]
+        if not self.members:
+            raise ValueError("Portfolio must have at least one member.")
+
+    @classmethod
+    def name(cls) -> str:
+        return "portfolio"
+
+    @classmethod
+    @abstractmethod
+    def member_types(cls) -> List[Type[Algorithm]]:
+        """
+        :return: The algorithms that may be members of this portfolio.
+        """
+        ...
+
+    @classmethod
+    @abstractmethod
+    def default_members(cls) -> List[MemberSpec]: ...
+
+    @staticmethod
+    def member_name(algorithm_type: Type[Algorithm], args: dict) -> str:
+        return algorithm_type.name() + (f"({', '.join(f'{k}={v}' for k, v in sorted(args.items()))})" if args else "")
+
+    def solve(self, initial_state: TState, budget: Optional[SearchBudget] = None) -> Solution:
+        budget = budget if budget is not None else SearchBudget()
+        context = ProcessUtils.fork_context()
+
+        running: Dict[Connection, Tuple[str, multiprocessing.Process, bool]] = dict()
+        outcomes: Dict[str, dict] = dict()
+        best: Optional[Tuple[str, List[TTransition]]] = None
+        failure: Optional[ExecutionError] = None
+        start = time.perf_counter()
+        grace_end: Optional[float] = None
+
+        try:
+            with self.stats.phase("portfolio"):
+                for algorithm_type, args, complete in self.members:
+                    receiver, sender = context.Pipe(duplex=False)
+                    process = context.Process(target=_run_member, daemon=True,
+                                              args=(algorithm_type, args, initial_state, budget,
+                                                    self.stats.enabled, sender))
+                    process.start()
+                    sender.close()
+                    running[receiver] = (self.member_name(algorithm_type, args), process, complete)
+
+                while running and failure is None:
+                    timeout = None if grace_end is None else max(0.0, grace_end - time.perf_counter())
+                    ready = wait(list(running.keys()), timeout)
+                    if not ready:
+                        break
+
+                    for receiver in ready:
+                        name, process, complete = running.pop(receiver)
+                        outcome = _receive(receiver)
+                        outcome["seconds"] = round(time.perf_counter() - start, 6)
+                        outcomes[name] = outcome
+                        process.join()
+
+                        if outcome["status"] == "ok":
+                            if best is None or len(outcome["transitions"]) < len(best[1]):
+                                best = (name, outcome["transitions"])
+                            if grace_end is None:
+                                grace_end = time.perf_counter() + self.grace
+                        elif outcome["status"] == ErrorType.NO_PATH_FOUND.name and complete and best is None:
+                            failure = _error(outcome)
+        finally:
+            for name, process, _ in running.values():
+                process.kill()
+                outcomes.setdefault(name, {"status": "cancelled"})
+            for receiver, (_, process, _) in running.items():
+                process.join()
+                receiver.close()
+
+        winner = best[0] if best is not None else None
+        self.stats.notes["portfolio"] = {
+            "winner": winner,
+            "members": {name: {k: v for k, v in outcome.items() if k != "transitions"}
+                        for name, outcome in outcomes.items()}
+        }
+        print(f"Portfolio winner: {winner} "
+              f"({', '.join(n + ': ' + o['status'] for n, o in outcomes.items())})")
+
+        if best is None:
+            raise failure if failure is not None else self._best_failure(outcomes)
+        return Solution.follow(initial_state, best[1])
+
+    @staticmethod
+    def _best_failure(outcomes: Dict[str, dict]) -> ExecutionError:
+        """
+        Picks the error to raise when every member failed:  the member that ran out of budget closest to the goal,
+        so that its partial path is reported, otherwise any member's error.
+        """
+        partial = [o for o in outcomes.values()
+                   if o["status"] == ErrorType.BUDGET_EXCEEDED.name and "partial" in (o.get("details") or {})]
+        if partial:
+            return _error(min(partial, key=lambda o: o["details"]["partial"]["score"]))
+        failed = [o for o in outcomes.values() if o["status"] != "cancelled"]
+        if failed:
+            return _error(failed[0])
+        return ExecutionError(ErrorType.INTERNAL, "No member of the portfolio finished.")
+
+    def _load_member(self, spec: MemberSpec) -> Tuple[Type[Algorithm], dict, bool]:
+        name, args = (spec, dict()) if isinstance(spec, str) else (spec.get("algorithm"), spec.get("args", dict()))
+        algorithm_type = next((a for a in self.member_types() if a.name() == name), None)
+        if algorithm_type is None:
+            raise ValueError(f"Invalid portfolio member '{name}'.  "
+                             f"Supported: {', '.join(a.name() for a in self.member_types())}")
+        # Fail now on bad arguments, rather than in the member's process
+        algorithm = algorithm_type(**args)
+        # Members run in daemonic processes, which may not start processes of their own
+        if algorithm.kwargs.get("workers", 1) != 1:
+            raise ValueError(f"Portfolio member '{name}' can't use workers, since it already runs in a process of "
+                             f"its own.")
+        return algorithm_type, args, algorithm.complete
+
+
+def _run_member(algorithm_type: Type[Algorithm], args: dict, initial_state: TState, budget: SearchBudget,
+                counting: bool, connection: Connection):
+    algorithm: Optional[Algorithm] = None
+    try:
+        algorithm = algorithm_type(**args)
+        algorithm.stats.enabled = counting
+        solution = algorithm.solve(initial_state, budget)
+        outcome = {"status": "ok", "moves": len(solution) - 1, "transitions": list(solution.transitions())}
+    except Exception as e:
+        error = e if isinstance(e, ExecutionError) else ExecutionError.wrap(e)
+        outcome = {"status": error.type.name, "message": error.message, "details": error.details}
+    if algorithm is not None:
+        outcome["stats"] = algorithm.stats.to_json()
+    try:
+        connection.send(outcome)
+    finally:
+        connection.close()
+
+
+def _receive(receiver: Connection) -> Dict[str, Any]:
+    try:
+        return receiver.recv()
+    except EOFError:
+        # The member's process died without reporting, eg. from running out of memory
+        return {"status": ErrorType.INTERNAL.name, "message": "Portfolio member exited unexpectedly."}
+    finally:
+        receiver.close()
+
+
+def _error(outcome: Dict[str, Any]) -> ExecutionError:
+    return ExecutionError(ErrorType[outcome["status"]], outcome["message"], outcome.get("details"))
@@ -2,3 +2,4 @@ from PathFinding.Algorithms.Algorithm import Algorithm
 from PathFinding.Algorithms.BasicAlgorithm import BasicAlgorithm
 from PathFinding.Algorithms.LookaheadAlgorithm import LookaheadAlgorithm
 from PathFinding.Algorithms.OrderlessAlgorithm import OrderlessAlgorithm, OrderlessLookaheadAlgorithm
+from PathFinding.Algorithms.PortfolioAlgorithm import PortfolioAlgorithm
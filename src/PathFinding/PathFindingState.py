@@ -3,13 +3,15 @@ from __future__ import annotations
 from Interfaces import Comparable, ComparableType, JSONable, CompareAndHashableType, CompareAndHashable
 
 from abc import ABC, abstractmethod
-from typing import Generic, Iterable, TypeVar, Tuple, Hashable
+from typing import Generic, Iterable, TypeVar, Tuple, Hashable, Optional, Any
 
 THashable = TypeVar('THashable', bound=Hashable)
 
 
 class StateTransition(JSONable, ABC, Generic[THashable]):
 
+    __slots__ = ("_value",)
+
     def __init__(self, value: THashable):
         self._value = value
 
@@ -29,12 +31,21 @@ class StateTransition(JSONable, ABC, Generic[THashable]):
     def __hash__(self) -> int:
         return hash(self.value)
 
+    def to_compact_json(self) -> Any:
+        """
+        Gets the smallest JSON representation of this transition that a client can still apply.  By default, this
+        is the same as to_json().
+        """
+        return self.to_json()
+
 
 TTransition = TypeVar('TTransition', bound=StateTransition)
 
 
 class PathFindingState(JSONable, ABC, Generic[CompareAndHashableType, TTransition]):
 
+    __slots__ = ()
+
     @property
     @abstractmethod
     def score(self) -> CompareAndHashableType: ...
@@ -48,8 +59,132 @@ class PathFindingState(JSONable, ABC, Generic[CompareAndHashableType, TTransitio
     @abstractmethod
     def transition(self, transition: TTransition) -> PathFindingState: ...
 
+    def to_compact_json(self, packed: bool = False) -> dict:
+        """
+        Gets the smallest JSON representation of this state that a client can rebuild it from.  By default, this is
+        the same as to_json().
+
+        :param packed: Whether to encode the state as densely as possible, at the expense of readability.
+        """
+        return self.to_json()
+
+    def pack_transitions(self, transitions: Iterable[TTransition]) -> Optional[str]:
+        """
+        Encodes the given transitions, applied in order from this state, as a single dense string.  This is only
+        possible if the order of the transitions doesn't matter.  By default, they can't be packed.
+
+        :return: The packed transitions, or None if they can't be packed.
+        """
+        return None
+
+    def state_key(self) -> Hashable:
+        """
+        Gets a compact value that identifies this state among all states of the same search, for algorithms to
+        remember states by without keeping the states themselves.  By default, this is the state itself.
+        """
+        return self
+
+    def state_from_key(self, key: Hashable) -> PathFindingState:
+        """
+        Rebuilds a state of the same search as this one from its state_key().  By default, the key is the state.
+        """
+        return key
+
+    def transitions(self) -> Iterable[TTransition]:
+        """
+        Gets the transitions available from this state, without building the states they lead to.  By default, this
+        builds every adjacent state; override it if the transitions can be found more cheaply.
+        """
+        yield from (transition for _, transition in self.get_adjacent_states())
+
+    def key_after(self, transition: TTransition) -> Hashable:
+        """
+        Gets the state_key() of the state the given transition leads to.  By default, this builds that state;
+        override it if the key can be found more cheaply.
+        """
+        return self.transition(transition).state_key()
+
+    def score_after(self, transition: TTransition) -> CompareAndHashableType:
+        """
+        Gets the score of the state the given transition leads to.  By default, this builds that state; override it
+        if the score can be found more cheaply.
+        """
+        return self.transition(transition).score
+
+    def score_deltas(self) -> Iterable[Tuple[TTransition, CompareAndHashableType]]:
+        """
+        Gets the score of the state each available transition leads to, without building those states if possible.
+        """
+        yield from ((transition, self.score_after(transition)) for transition in self.transitions())
+
+    def get_successors(self) -> Iterable[Successor]:
+        """
+        Gets the adjacent states as successors, whose scores (and keys) are known without building them, and whose
+        states are only built when they are first needed.
+        """
+        yield from (Successor(self, transition, score) for transition, score in self.score_deltas())
+
+
+class Successor(Generic[TTransition]):
+    """
+    A state adjacent to some other state, whose state and key are only found when first accessed (unless the
+    parent already knows the key).
+    """
+
+    __slots__ = ("parent", "transition", "score", "_key", "_state")
+
+    _UNKNOWN = object()
+
+    def __init__(self, parent: Optional[PathFindingState], transition: Optional[TTransition],
+                 score: CompareAndHashableType, key: Hashable = _UNKNOWN):
+        self.parent = parent
+        self.transition = transition
+        self.score = score
+        self._key = key
+        self._state: Optional[PathFindingState] = None
+
+    @staticmethod
+    def of(state: PathFindingState) -> Successor:
+        """
+        Wraps a state that has already been built (eg. the initial state of a search) as a successor.
+        """
+        successor = Successor(None, None, state.score, state.state_key())
+        successor._state = state
+        return successor
+
+    @property
+    def key(self) -> Hashable:
+        if self._key is Successor._UNKNOWN:
+            self._key = self.parent.key_after(self.transition)
+        return self._key
+
+    @property
+    def state(self) -> PathFindingState:
+        if self._state is None:
+            self._state = self.parent.transition(self.transition)
+        return self._state
+
 
 class ComparableStateTransition(StateTransition[CompareAndHashable], ABC, Generic[CompareAndHashableType]):
 
+    __slots__ = ()
+
     def __lt__(self, other) -> bool:
         return self.value < other.value
+
+
+class StateSymmetry(ABC, Generic[TTransition]):
+    """
+    A symmetry of a state space:  a mapping of states and transitions onto others, such that applying a transition
+    to a state and then mapping the result is the same as mapping both and then applying the mapped transition.
+    This means that a path from a state maps onto an equally valid path from the mapped state.
+    """
+
+    @abstractmethod
+    def apply(self, state: PathFindingState) -> PathFindingState: ...
+
+    @abstractmethod
+    def apply_transition(self, transition: TTransition) -> TTransition: ...
+
+    @abstractmethod
+    def inverse(self) -> StateSymmetry: ...
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from PathFinding.Solution import Solution
+from Errors import ExecutionError, ErrorType
+
+from typing import Optional, Any, Callable
+import sys
+import time
+import resource
+
+# How many nodes may be spent between checks of the clock, and of the memory in use (which is slower to check)
+CHECK_INTERVAL = 16
+MEMORY_CHECK_INTERVAL = 1024
+
+
+class SearchBudget:
+    """
+    Limits on the work a single solve may do:  a deadline, a number of nodes expanded, and the memory in use by the
+    process.  Searches call spend() once per node they expand, and stop as soon as it reports that the budget has
+    run out, raising the error given by error() rather than running until they are killed.
+
+    The clock is only read every CHECK_INTERVAL nodes and the memory every MEMORY_CHECK_INTERVAL nodes, so an
+    unlimited budget costs one addition and one comparison per node.
+
+    A search can also be cancelled from outside (eg. by another worker of the same search) through a predicate
+    given to cancel_when(), which is checked along with the clock.
+    """
+
+    NODES = "nodes"
+    TIME = "time"
+    MEMORY = "memory"
+    CANCELLED = "cancelled"
+
+    def __init__(self, seconds: Optional[float] = None, max_nodes: Optional[int] = None,
+                 max_memory_mb: Optional[float] = None):
+        """
+        :param seconds: Optional.  The seconds the search may run for, from now.
+        :param max_nodes: Optional.  The number of nodes the search may expand.
+        :param max_memory_mb: Optional.  The memory the whole process may use, in megabytes.
+        """
+        self.deadline = time.monotonic() + seconds if seconds is not None else None
+        self.max_nodes = max_nodes
+        self.max_memory = int(max_memory_mb * 1024 * 1024) if max_memory_mb is not None else None
+        self.nodes = 0
+        self.exceeded: Optional[str] = None
+        self._cancel: Optional[Callable[[], bool]] = None
+        self._next_check = 0
+        self._next_memory_check = 0
+        self._schedule()
+
+    @staticmethod
+    def from_context(context: Any, reserve_seconds: float = 0, max_nodes: Optional[int] = None,
+                     max_memory_mb: Optional[float] = None, max_seconds: Optional[float] = None) -> SearchBudget:
+        """
+        Creates a budget whose deadline is the time the Lambda has left to run, less the given reserve (left for
+        building and sending the response), or the given maximum seconds if that is sooner.  Contexts without a
+        remaining time (eg. when run locally) only get the maximum seconds.
+        """
+        seconds = max_seconds
+        get_remaining = getattr(context, "get_remaining_time_in_millis", None)
+        if get_remaining is not None:
+            remaining = max(0.0, get_remaining() / 1000 - reserve_seconds)
+            seconds = remaining if seconds is None else min(seconds, remaining)
+        return SearchBudget(seconds=seconds, max_nodes=max_nodes, max_memory_mb=max_memory_mb)
+
+    @property
+    def limited(self) -> bool:
+        return self.deadline is not None or self.max_nodes is not None or self.max_memory is not None or \
+            self._cancel is not None
+
+    def cancel_when(self, predicate: Callable[[], bool]):
+        """
+        Makes the budget run out (as CANCELLED) as soon as the given predicate returns True.
+        """
+        self._cancel = predicate
+        self._schedule()
+
+    def remaining_seconds(self) -> Optional[float]:
+        return max(0.0, self.deadline - time.monotonic()) if self.deadline is not None else None
+
+    def spend(self, nodes: int = 1) -> bool:
+        """
+        Records that the given number of nodes have been expanded.
+
+        :return: True if the budget has run out, and the search should stop.
+        """
+        self.nodes += nodes
+        if self.nodes < self._next_check:
+            return False
+        return self.check()
+
+    def check(self) -> bool:
+        """
+        Checks every limit of the budget, regardless of when they were last checked.
+
+        :return: True if the budget has run out.
+        """
+        if self.exceeded is None:
+            if self.max_nodes is not None and self.nodes > self.max_nodes:
+                self.exceeded = self.NODES
+            elif self.deadline is not None and time.monotonic() >= self.deadline:
+                self.exceeded = self.TIME
+            elif self._cancel is not None and self._cancel():
+                self.exceeded = self.CANCELLED
+            elif self.max_memory is not None and self.nodes >= self._next_memory_check:
+                self._next_memory_check = self.nodes + MEMORY_CHECK_INTERVAL
+                if _memory_in_use() >= self.max_memory:
+                    self.exceeded = self.MEMORY
+        self._schedule()
+        return self.exceeded is not None
+
+    def error(self, partial: Optional[Solution] = None, score: Any = None) -> ExecutionError:
+        """
+        Creates the error to raise when a search runs out of budget.
+
+        :param partial: Optional.  The path to the best state the search found before stopping.
+        :param score: Optional.  The score of the last state of the partial path.
+        """
+        details = {"exceeded": self.exceeded, "budget": self.to_json()}
+        if partial is not None:
+            details["partial"] = {"score": score, "moves": len(partial) - 1, "solution": partial.compact().to_json()}
+        return ExecutionError(ErrorType.BUDGET_EXCEEDED,
+                              f"Search stopped after exceeding its {self.exceeded} budget.", details)
+
+    def to_json(self) -> dict:
+        return {
+            "nodes": self.nodes,
+            **({"max_nodes": self.max_nodes} if self.max_nodes is not None else {}),
+            **({"max_memory_mb": round(self.max_memory / 1024 / 1024, 1)} if self.max_memory is not None else {}),
+            **({"remaining_ms": round(self.remaining_seconds() * 1000)} if self.deadline is not None else {})
+        }
+
+    def _schedule(self):
+        if self.exceeded is not None:
+            self._next_check = 0
+        elif not self.limited:
+            self._next_check = sys.maxsize
+        else:
+            self._next_check = self.nodes + CHECK_INTERVAL
+            if self.max_nodes is not None:
+                self._next_check = min(self._next_check, self.max_nodes + 1)
+
+
+def _memory_in_use() -> int:
+    """
+    :return: The resident memory of this process in bytes, or its peak if the current amount can't be read.
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
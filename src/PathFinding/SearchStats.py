@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from Interfaces import JSONable
+
+from contextlib import contextmanager
+from typing import Dict, Optional, Iterator, Any
+import time
+
+
+class SearchStats(JSONable):
+    """
+    Counters describing the work done by a single solve.  The time spent in each phase of the solve is always
+    recorded, since phases are few and coarse.  The per-node counters are only updated when 'enabled' is set, and
+    algorithms check it once per node, so that they cost next to nothing when disabled:
+
+     - generated:  states (or boards) produced as successors of another
+     - expanded:  states whose successors were generated
+     - skipped:  states discarded because an equivalent one was already visited
+     - peak_frontier:  the largest number of states waiting to be expanded at once (for depth-first searches,
+       the deepest the search went)
+     - peak_visited:  the number of states remembered as visited by the end of the search
+     - cache_hits:  hits on each of the algorithm's internal caches, by name
+
+    Algorithms may also record anything else worth reporting about their solve in 'notes'.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.source: Optional[str] = None
+        self.generated = 0
+        self.expanded = 0
+        self.skipped = 0
+        self.peak_frontier = 0
+        self.peak_visited = 0
+        self.cache_hits: Dict[str, int] = dict()
+        self.phases: Dict[str, float] = dict()
+        self.notes: Dict[str, Any] = dict()
+
+    def __str__(self) -> str:
+        return " ".join(f"{k}={v}" for k, v in self.to_json().items())
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Times the code run inside this context, adding it to the given phase.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0) + (time.perf_counter() - start)
+
+    def merge(self, other: dict):
+        """
+        Adds in the counters of another solve's stats (as given by to_json()), eg. those of a worker process that
+        searched part of this solve.
+        """
+        if not self.enabled or "expanded" not in other:
+            return
+        self.generated += other["generated"]
+        self.expanded += other["expanded"]
+        self.skipped += other["skipped"]
+        self.peak_frontier = max(self.peak_frontier, other["peak_frontier"])
+        self.peak_visited += other["peak_visited"]
+        for cache, hits in other["cache_hits"].items():
+            self.cache_hits[cache] = self.cache_hits.get(cache, 0) + hits
+
+    def observe_frontier(self, size: int):
+        if size > self.peak_frontier:
+            self.peak_frontier = size
+
+    def cache_hit(self, cache: str):
+        self.cache_hits[cache] = self.cache_hits.get(cache, 0) + 1
+
+    def to_json(self) -> dict:
+        return {
+            **({"source": self.source} if self.source is not None else {}),
+            **({
+                "generated": self.generated,
+                "expanded": self.expanded,
+                "skipped": self.skipped,
+                "peak_frontier": self.peak_frontier,
+                "peak_visited": self.peak_visited,
+                "cache_hits": dict(self.cache_hits)
+            } if self.enabled else {}),
+            "phases_ms": {name: round(seconds * 1000, 3) for name, seconds in self.phases.items()},
+            **self.notes
+        }
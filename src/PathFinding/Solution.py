@@ -1,24 +1,149 @@
-from PathFinding import PathFindingState, StateTransition
-from Interfaces import JSONable
+from __future__ import annotations
+
+from PathFinding import PathFindingState, StateTransition, StateSymmetry
+from Interfaces import JSONable, JSONStreamable
 
 from typing import TypeVar, Generic, Iterable, Tuple, List, Dict, Optional, Iterator
+import copy
+import json
 
 TState = TypeVar('TState', bound=PathFindingState)
 TTransition = TypeVar('TTransition', bound=StateTransition)
 
 
-class Solution(JSONable, Generic[TState, TTransition]):
+class Solution(JSONStreamable, Generic[TState, TTransition]):
+    """
+    A path from an initial state to a goal state.  Each step is a state, along with the transition that led to it
+    (None for the initial state).
+
+    A solution made by following transitions from an initial state (see Solution.follow()) only keeps the initial
+    state and the transitions, and builds the intermediate states as they are iterated over, so that a long
+    solution can be streamed out (see json_chunks()) without every state being held in memory at once.
+    """
 
     def __init__(self, steps: Iterable[Tuple[TState, Optional[TTransition]]]):
-        self.steps = list(steps)
+        self._steps: Optional[List[Tuple[TState, Optional[TTransition]]]] = list(steps)
+        self._initial_state: Optional[TState] = None
+        self._transitions: Optional[List[TTransition]] = None
+        # Included in the JSON of the solution if set (see with_stats())
+        self.stats: Optional[dict] = None
+
+    @classmethod
+    def follow(cls, initial_state: TState, transitions: Iterable[TTransition]) -> Solution:
+        """
+        Builds a solution by applying each of the given transitions in order, starting from the given state.  The
+        intermediate states are only built when the solution's steps are iterated over.
+
+        :param initial_state: The state to start from.
+        :param transitions: The transitions to apply, in order.
+        :return: The solution containing every intermediate state.
+        """
+        solution = cls(())
+        solution._steps = None
+        solution._initial_state = initial_state
+        solution._transitions = list(transitions)
+        return solution
+
+    @property
+    def initial_state(self) -> TState:
+        return self._initial_state if self._steps is None else self._steps[0][0]
+
+    @property
+    def steps(self) -> List[Tuple[TState, Optional[TTransition]]]:
+        if self._steps is None:
+            self._steps = list(self.iter_steps())
+        return self._steps
+
+    def iter_steps(self) -> Iterator[Tuple[TState, Optional[TTransition]]]:
+        """
+        Iterates over the steps of this solution, building each state only as it is reached.
+        """
+        if self._steps is not None:
+            yield from self._steps
+            return
+        current = self._initial_state
+        yield current, None
+        for transition in self._transitions:
+            current = current.transition(transition)
+            yield current, transition
+
+    def transitions(self) -> List[TTransition]:
+        if self._transitions is not None:
+            return list(self._transitions)
+        return [transition for _, transition in self._steps if transition is not None]
+
+    def with_stats(self, stats: Optional[dict]) -> Solution:
+        """
+        Gets a copy of this solution, sharing its steps, whose JSON includes the given stats.
+        """
+        solution = copy.copy(self)
+        solution.stats = stats
+        return solution
+
+    def compact(self, packed: bool = False) -> CompactSolution:
+        return CompactSolution(self, packed=packed)
+
+    def transformed(self, symmetry: Optional[StateSymmetry]) -> Solution:
+        """
+        Maps every step of this solution through the given symmetry, giving the equivalent solution of the
+        mapped initial state.
+
+        :param symmetry: The symmetry to apply.  If None, this solution is returned as-is.
+        :return: The mapped solution.
+        """
+        if symmetry is None:
+            return self
+        if self._steps is None:
+            return Solution.follow(symmetry.apply(self._initial_state),
+                                   (symmetry.apply_transition(transition) for transition in self._transitions))
+        return Solution((symmetry.apply(state),
+                         symmetry.apply_transition(transition) if transition is not None else None)
+                        for state, transition in self._steps)
 
     def __len__(self) -> int:
-        return len(self.steps)
+        if self._steps is None:
+            return len(self._transitions) + 1
+        return len(self._steps)
 
     def __iter__(self) -> Iterator[Tuple[TState, TTransition]]:
-        return iter(self.steps)
+        return self.iter_steps()
+
+    def to_json(self) -> dict:
+        return {"steps": [self._step_json(state, transition) for state, transition in self.iter_steps()],
+                **({"stats": self.stats} if self.stats is not None else {})}
+
+    def json_chunks(self) -> Iterable[str]:
+        # Produces the same text as json.dumps(self.to_json()), one step at a time
+        yield '{"steps": ['
+        for i, (state, transition) in enumerate(self.iter_steps()):
+            yield (", " if i > 0 else "") + json.dumps(self._step_json(state, transition))
+        yield ']' + (', "stats": ' + json.dumps(self.stats) if self.stats is not None else '') + '}'
+
+    @staticmethod
+    def _step_json(state: TState, transition: Optional[TTransition]) -> dict:
+        return {"state": state.to_json(),
+                **({"transition": transition.to_json()} if transition is not None else {})}
+
+
+class CompactSolution(JSONable, Generic[TState, TTransition]):
+    """
+    A solution in the form of its initial state and the transitions to apply to it, without any of the intermediate
+    states, for clients that can replay the transitions themselves.  If 'packed', the initial state and (where
+    possible) the transitions are encoded as densely as possible (see PathFindingState.to_compact_json() and
+    PathFindingState.pack_transitions()).
+    """
+
+    def __init__(self, solution: Solution, packed: bool = False):
+        self.solution = solution
+        self.packed = packed
 
     def to_json(self) -> dict:
-        return {"steps": [{"state": state.to_json(),
-                           **({"transition": transition.to_json()} if transition is not None else {})}
-                          for state, transition in self.steps]}
+        initial_state = self.solution.initial_state
+        transitions = self.solution.transitions()
+        pressed = initial_state.pack_transitions(transitions) if self.packed else None
+        return {
+            "initial": initial_state.to_compact_json(packed=self.packed),
+            **({"packed_transitions": pressed} if pressed is not None
+               else {"transitions": [transition.to_compact_json() for transition in transitions]}),
+            **({"stats": self.solution.stats} if self.solution.stats is not None else {})
+        }
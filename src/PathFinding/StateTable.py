@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from PathFinding.PathFindingState import PathFindingState, StateTransition
+
+from array import array
+from typing import Generic, TypeVar, Dict, Hashable, List, Optional
+
+TState = TypeVar('TState', bound=PathFindingState)
+TTransition = TypeVar('TTransition', bound=StateTransition)
+
+
+class StateTable(Generic[TState, TTransition]):
+    """
+    Gives each distinct state found during a search a dense integer id, and records the best known route to each
+    state in columns indexed by that id:  its key, its distance from the initial state, the id of the state before
+    it, the id of the move that led to it, and whether it has been closed (visited).
+
+    States are identified by their state_key(), and only the keys are kept, so a state object can be freed as soon
+    as it has been expanded, a successor can be looked up before its state is ever built (see Successor.key), and a
+    state can be rebuilt from its id (see PathFindingState.state_from_key()).  Paths are rebuilt by walking parent
+    ids back to the initial state.  Each state costs one dictionary entry for its key plus 21 bytes of columns,
+    rather than a state object and a record object.
+    """
+
+    NONE = -1
+
+    def __init__(self):
+        self._ids: Dict[Hashable, int] = dict()
+        self._keys: List[Hashable] = []
+        self._distances = array('i')
+        self._parents = array('i')
+        self._moves = array('i')
+        self._closed = bytearray()
+        self._move_ids: Dict[TTransition, int] = dict()
+        self._move_values: List[TTransition] = []
+
+    def __len__(self) -> int:
+        return len(self._distances)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._ids
+
+    def id_of(self, key: Hashable) -> Optional[int]:
+        return self._ids.get(key)
+
+    def intern(self, key: Hashable, parent: int, move: Optional[TTransition], distance: int) -> int:
+        """
+        Gets the id of the state with the given key, adding it to the table if it has not been seen before.  The
+        route to the state is only recorded if the state is new.
+
+        :param key: The state_key() of the state to look up.
+        :param parent: The id of the state before this one, or StateTable.NONE.
+        :param move: The move that led to this state, or None.
+        :param distance: The distance of this state from the initial state.
+        :return: The id of the state.
+        """
+        state_id = self._ids.get(key)
+        if state_id is None:
+            state_id = self._ids[key] = len(self._distances)
+            self._keys.append(key)
+            self._distances.append(distance)
+            self._parents.append(parent)
+            self._moves.append(self.move_id(move))
+            self._closed.append(0)
+        return state_id
+
+    def update(self, state_id: int, parent: int, move: Optional[TTransition], distance: int):
+        self._distances[state_id] = distance
+        self._parents[state_id] = parent
+        self._moves[state_id] = self.move_id(move)
+
+    def key(self, state_id: int) -> Hashable:
+        return self._keys[state_id]
+
+    def distance(self, state_id: int) -> int:
+        return self._distances[state_id]
+
+    def parent(self, state_id: int) -> int:
+        return self._parents[state_id]
+
+    def move(self, state_id: int) -> Optional[TTransition]:
+        return self.move_value(self._moves[state_id])
+
+    def is_closed(self, state_id: int) -> bool:
+        return self._closed[state_id] != 0
+
+    def close(self, state_id: int):
+        self._closed[state_id] = 1
+
+    def closed_count(self) -> int:
+        return self._closed.count(1)
+
+    def move_id(self, move: Optional[TTransition]) -> int:
+        if move is None:
+            return self.NONE
+        move_id = self._move_ids.get(move)
+        if move_id is None:
+            move_id = self._move_ids[move] = len(self._move_values)
+            self._move_values.append(move)
+        return move_id
+
+    def move_value(self, move_id: int) -> Optional[TTransition]:
+        return self._move_values[move_id] if move_id != self.NONE else None
+
+    def path(self, state_id: int) -> List[TTransition]:
+        """
+        Gets the moves that lead from the initial state to the given state, by walking back through parent ids.
+
+        :param state_id: The id of the state to find the path to.
+        :return: The moves along the path, in order.
+        """
+        moves: List[TTransition] = []
+        while self._parents[state_id] != self.NONE:
+            moves.append(self._move_values[self._moves[state_id]])
+            state_id = self._parents[state_id]
+        moves.reverse()
+        return moves
@@ -1,3 +1,6 @@
-from PathFinding.PathFindingState import PathFindingState, StateTransition, ComparableStateTransition
+from PathFinding.PathFindingState import PathFindingState, StateTransition, ComparableStateTransition, StateSymmetry, \
+    Successor
+from PathFinding.SearchStats import SearchStats
+from PathFinding.SearchBudget import SearchBudget
 from PathFinding.Algorithms import *
-from PathFinding.Solution import Solution
+from PathFinding.Solution import Solution, CompactSolution
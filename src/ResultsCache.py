@@ -1,8 +1,200 @@
+from __future__ import annotations
 
 from Games import Conditions
 from PathFinding import Solution
+from Errors import ExecutionError, ErrorType
 
-from typing import Dict
+from collections import OrderedDict
+from typing import Dict, Optional, Union, Tuple, Hashable
+import os
+import sys
+import time
+import threading
 
 
-RESULTS_CACHE: Dict[Conditions, Solution] = dict()
+class ResultsCache:
+    """
+    A bounded cache of the results of solving a game under particular conditions.  Entries are evicted in
+    least-recently-used order once there are more than 'max_entries' of them, or once their estimated total size
+    exceeds 'max_bytes', and expire 'ttl' seconds after being stored.
+
+    Failures to find a path are cached as well.  Since search limits are monotonic, a failure to find a path with
+    some limit also answers any request with a lower limit, so failures are stored once per set of conditions
+    ignoring the limit, and only the most general failure is kept.  A limit of 0 means no limit.
+
+    The cache may be shared by several threads.
+    """
+
+    LIMIT_ARG = "limit"
+
+    def __init__(self, max_entries: Optional[int] = 1000,
+                 max_bytes: Optional[int] = None,
+                 ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # Values are (result, estimated size, expiry time)
+        self._entries: OrderedDict[Hashable, Tuple[Union[Solution, Tuple[int, ExecutionError]], int, Optional[float]]]\
+            = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, conditions: Conditions) -> bool:
+        with self._lock:
+            return self._get_entry(("+", conditions)) is not None
+
+    def __getitem__(self, conditions: Conditions) -> Solution:
+        result = self.get(conditions)
+        if result is None:
+            raise KeyError(conditions)
+        return result
+
+    def __setitem__(self, conditions: Conditions, result: Solution):
+        self.put(conditions, result)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return self._stats()
+
+    def _stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+    def get(self, conditions: Conditions) -> Optional[Solution]:
+        """
+        Gets the cached result for the given conditions.
+
+        :param conditions: The conditions to look up.
+        :return: The cached solution, or None if there is none.
+        :raises ExecutionError: If the conditions are known to have no path.
+        """
+        with self._lock:
+            solution = self._get_entry(("+", conditions))
+            if solution is not None:
+                self.hits += 1
+                return solution
+
+            failure = self._get_entry(("-", conditions.without_arg(self.LIMIT_ARG)))
+            if failure is not None:
+                failed_limit, error = failure
+                if self._covers(failed_limit, self._limit(conditions)):
+                    self.negative_hits += 1
+                    # A fresh copy, so that raising it doesn't grow a traceback on the shared cached error
+                    raise self._copy_error(error)
+
+            self.misses += 1
+            return None
+
+    def put(self, conditions: Conditions, solution: Solution):
+        size = self._estimate_size(solution)
+        with self._lock:
+            self._put_entry(("+", conditions), solution, size)
+
+    def put_failure(self, conditions: Conditions, error: ExecutionError):
+        """
+        Caches the failure to solve the given conditions.  Only failures to find a path are cached, since other
+        errors may not happen again.
+
+        :param conditions: The conditions that failed.
+        :param error: The error raised.
+        """
+        if error.type != ErrorType.NO_PATH_FOUND:
+            return
+        key = ("-", conditions.without_arg(self.LIMIT_ARG))
+        limit = self._limit(conditions)
+        with self._lock:
+            existing = self._get_entry(key)
+            if existing is not None and self._covers(existing[0], limit):
+                return
+            # Copied without its traceback, whose frames would keep the failed search alive
+            error = self._copy_error(error)
+            self._put_entry(key, (limit, error), sys.getsizeof(error) + sys.getsizeof(error.message) +
+                            sys.getsizeof(error.details))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    #
+
+    @classmethod
+    def _limit(cls, conditions: Conditions) -> int:
+        try:
+            return int(conditions.get_arg(cls.LIMIT_ARG, 0))
+        except (TypeError, ValueError):
+            return 0
+
+    @staticmethod
+    def _covers(failed_limit: int, limit: int) -> bool:
+        return failed_limit == 0 or (limit != 0 and limit <= failed_limit)
+
+    def _get_entry(self, key: Hashable):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, size, expires = entry
+        if expires is not None and expires <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put_entry(self, key: Hashable, value, size: int):
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, size, time.monotonic() + self.ttl if self.ttl is not None else None)
+        self._bytes += size
+        while self._entries and \
+                ((self.max_entries is not None and len(self._entries) > self.max_entries) or
+                 (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, key: Hashable):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    @staticmethod
+    def _copy_error(error: ExecutionError) -> ExecutionError:
+        return ExecutionError(error.type, error.message, error.details)
+
+    @staticmethod
+    def _estimate_size(solution: Solution) -> int:
+        # A rough, shallow estimate:  one state and one step tuple per step, plus each transition.  This avoids
+        # building the states of a solution that has not built them yet.
+        return sys.getsizeof(solution) + \
+            len(solution) * (sys.getsizeof(solution.initial_state) + sys.getsizeof((None, None))) + \
+            sum(sys.getsizeof(transition) for transition in solution.transitions())
+
+
+def _env_number(name: str, default: Optional[float], t: type = int) -> Optional[float]:
+    value = os.environ.get(name)
+    if not value:
+        return default
+    return t(value) if float(value) > 0 else None
+
+
+RESULTS_CACHE: ResultsCache = ResultsCache(max_entries=_env_number("RESULTS_CACHE_MAX_ENTRIES", 1000),
+                                           max_bytes=_env_number("RESULTS_CACHE_MAX_BYTES", 64 * 1024 * 1024),
+                                           ttl=_env_number("RESULTS_CACHE_TTL", None, float))
@@ -0,0 +1,25 @@
+from typing import Iterable
+
+
+def popcount(x: int) -> int:
+    """
+    Counts the number of set bits in the given non-negative integer.
+
+    :param x: The integer to count the bits of.
+    :return: The number of bits set to 1.
+    """
+    return bin(x).count("1")
+
+
+def iterate_bits(x: int) -> Iterable[int]:
+    """
+    Iterates through the indices of all set bits in the given non-negative integer, from least significant
+    to most significant.
+
+    :param x: The integer to iterate the bits of.
+    :return: An iterable of the indices of each bit set to 1.
+    """
+    while x:
+        low = x & -x
+        yield low.bit_length() - 1
+        x ^= low
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+from Interfaces import ComparableType
+
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import TypeVar, Generic, Dict, Hashable, Optional, Tuple, List, Deque
+from array import array
+import heapq
+import itertools
+
+T = TypeVar('T')
+
+
+class Frontier(ABC, Generic[T, ComparableType]):
+    """
+    A priority queue of items to explore, where the item with the lowest priority is popped first.  Items with
+    equal priority are popped in the order they were pushed (FIFO), or in the reverse order if 'lifo' is set.
+
+    Items may optionally be pushed with a key.  Pushing an item with the same key as an item already in the frontier
+    replaces it, and discard() removes it.  Replaced and removed entries are not removed from the underlying
+    structure immediately, but are skipped over when they would be popped (lazy deletion).
+    """
+
+    def __init__(self, lifo: bool = False):
+        self._lifo = lifo
+        self._counter = itertools.count()
+        # Maps the key of each live entry to its entry id and priority
+        self._live: Dict[Hashable, Tuple[int, ComparableType]] = dict()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self._size > 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._live
+
+    def priority(self, key: Hashable) -> Optional[ComparableType]:
+        """
+        Gets the priority of the live entry with the given key.
+
+        :param key: The key to look up.
+        :return: The entry's priority, or None if no entry with this key is in the frontier.
+        """
+        entry = self._live.get(key)
+        return entry[1] if entry is not None else None
+
+    def push(self, item: T, priority: ComparableType, key: Optional[Hashable] = None):
+        """
+        Adds an item to the frontier.
+
+        :param item: The item to add.
+        :param priority: The priority of the item.  Lower priorities are popped first.
+        :param key: Optional.  If given, replaces any entry already in the frontier with the same key.
+        """
+        entry_id = next(self._counter)
+        if key is not None:
+            if key not in self._live:
+                self._size += 1
+            self._live[key] = (entry_id, priority)
+        else:
+            self._size += 1
+        self._push_entry(priority, entry_id, key, item)
+
+    def pop(self) -> T:
+        """
+        Removes and returns the item with the lowest priority.
+
+        :return: The item with the lowest priority.
+        :raises IndexError: If the frontier is empty.
+        """
+        return self.pop_with_priority()[0]
+
+    def pop_with_priority(self) -> Tuple[T, ComparableType]:
+        while True:
+            priority, entry_id, key, item = self._pop_entry()
+            if key is not None:
+                live = self._live.get(key)
+                if live is None or live[0] != entry_id:
+                    continue
+                del self._live[key]
+            self._size -= 1
+            return item, priority
+
+    def discard(self, key: Hashable) -> bool:
+        """
+        Removes the entry with the given key from the frontier, if present.
+
+        :param key: The key of the entry to remove.
+        :return: True if an entry was removed, False otherwise.
+        """
+        if key not in self._live:
+            return False
+        del self._live[key]
+        self._size -= 1
+        return True
+
+    @abstractmethod
+    def _push_entry(self, priority: ComparableType, entry_id: int, key: Optional[Hashable], item: T): ...
+
+    @abstractmethod
+    def _pop_entry(self) -> Tuple[ComparableType, int, Optional[Hashable], T]: ...
+
+
+class BucketFrontier(Frontier[T, int]):
+    """
+    A frontier that keeps one bucket of items per distinct integer priority.  Pushing and popping are O(1), apart
+    from creating or emptying a bucket, which is O(log b) in the number of distinct priorities present.  This is
+    ideal for small integer priorities such as path lengths plus a count of remaining squares.
+    """
+
+    def __init__(self, lifo: bool = False):
+        super(BucketFrontier, self).__init__(lifo=lifo)
+        self._buckets: Dict[int, Deque[Tuple[int, Optional[Hashable], T]]] = dict()
+        self._priorities: List[int] = []
+
+    def _push_entry(self, priority: int, entry_id: int, key: Optional[Hashable], item: T):
+        bucket = self._buckets.get(priority)
+        if bucket is None:
+            bucket = self._buckets[priority] = deque()
+            heapq.heappush(self._priorities, priority)
+        bucket.append((entry_id, key, item))
+
+    def _pop_entry(self) -> Tuple[int, int, Optional[Hashable], T]:
+        if not self._priorities:
+            raise IndexError("pop from an empty frontier")
+        priority = self._priorities[0]
+        bucket = self._buckets[priority]
+        entry_id, key, item = bucket.pop() if self._lifo else bucket.popleft()
+        if not bucket:
+            del self._buckets[priority]
+            heapq.heappop(self._priorities)
+        return priority, entry_id, key, item
+
+
+class IdBucketFrontier:
+    """
+    A bucket frontier (see BucketFrontier) whose items are dense, non-negative integer ids, such as those given by
+    a StateTable, and are their own keys.  It has the same interface as Frontier, but instead of a dictionary of
+    live entries, the priority of each id in the frontier is kept in an array indexed by id, and the buckets hold
+    only the ids themselves.  Each entry costs a bucket slot and (once per id) an array slot, rather than several
+    tuples and dictionary entries.
+
+    Pushing an id again replaces its entry, as with a key.  The replaced entry is skipped when it would be popped,
+    since its bucket no longer matches the id's priority.
+    """
+
+    NONE = -1
+
+    def __init__(self, lifo: bool = False):
+        self._lifo = lifo
+        self._priorities_by_id = array('i')
+        self._buckets: Dict[int, Deque[int]] = dict()
+        self._priorities: List[int] = []
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self._size > 0
+
+    def __contains__(self, item: int) -> bool:
+        return self.priority(item) is not None
+
+    def priority(self, item: int) -> Optional[int]:
+        if item >= len(self._priorities_by_id) or self._priorities_by_id[item] == self.NONE:
+            return None
+        return self._priorities_by_id[item]
+
+    def push(self, item: int, priority: int, key: Optional[int] = None):
+        """
+        Adds an id to the frontier, replacing any entry it already has.
+
+        :param item: The id to add.
+        :param priority: The priority of the id, which must be non-negative.  Lower priorities are popped first.
+        :param key: Optional.  Ignored, since ids are their own keys.
+        """
+        if item >= len(self._priorities_by_id):
+            self._priorities_by_id.extend([self.NONE] * (item + 1 - len(self._priorities_by_id)))
+        if self._priorities_by_id[item] == self.NONE:
+            self._size += 1
+        self._priorities_by_id[item] = priority
+        bucket = self._buckets.get(priority)
+        if bucket is None:
+            bucket = self._buckets[priority] = deque()
+            heapq.heappush(self._priorities, priority)
+        bucket.append(item)
+
+    def pop(self) -> int:
+        return self.pop_with_priority()[0]
+
+    def pop_with_priority(self) -> Tuple[int, int]:
+        while self._priorities:
+            priority = self._priorities[0]
+            bucket = self._buckets[priority]
+            item = bucket.pop() if self._lifo else bucket.popleft()
+            if not bucket:
+                del self._buckets[priority]
+                heapq.heappop(self._priorities)
+            if self._priorities_by_id[item] == priority:
+                self._priorities_by_id[item] = self.NONE
+                self._size -= 1
+                return item, priority
+        raise IndexError("pop from an empty frontier")
+
+    def discard(self, item: int) -> bool:
+        if item not in self:
+            return False
+        self._priorities_by_id[item] = self.NONE
+        self._size -= 1
+        return True
@@ -0,0 +1,14 @@
+import os
+import multiprocessing
+from multiprocessing.context import BaseContext
+
+# The most worker processes a single search may start, since the number comes from the request
+MAX_WORKERS = int(os.environ["SEARCH_MAX_WORKERS"]) if os.environ.get("SEARCH_MAX_WORKERS") else (os.cpu_count() or 1)
+
+
+def fork_context() -> BaseContext:
+    """
+    Gets the context to start worker processes with:  forking where it is available, so that workers start with
+    this process's warm caches and their arguments don't need to be pickled, otherwise the platform's default.
+    """
+    return multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else None)